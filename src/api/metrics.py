@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.core.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get('/',
+            response_class=PlainTextResponse,
+            summary='Метрики',
+            description='Метрики воркера в текстовом формате Prometheus')
+async def get_metrics() -> str:
+    return metrics.render()
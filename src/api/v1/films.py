@@ -1,80 +1,223 @@
+import asyncio
+from collections import defaultdict
 from http import HTTPStatus
+from typing import Any, Union
 import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Response
+from fastapi.responses import StreamingResponse
 
-from src.api.v1.query_params.base import Page, get_page
-from src.api.v1.query_params.films import Filter, get_filter
-from src.api.v1.models.film import FilmList, FilmDetails
+from src.api.v1.query_params.base import (Page, get_fields_param, get_page,
+                                          get_source_fields, select_fields,
+                                          set_next_cursor)
+from src.api.v1.response_cache import cache_response
+from src.api.v1.responses import ndjson_response, trusted_response
+from src.api.v1.query_params.films import (INCLUDE_RELATIONS, Filter,
+                                           get_filter, get_include, get_sort)
+from src.api.v1.models.batch import Batch
+from src.api.v1.models.film import (FilmList, FilmDetails,
+                                    FilmDetailsCompound, FilmListCompound)
+from src.models.film import Film
 from src.models.user import User
 from src.services.film import FilmService, get_film_service
+from src.services.genre import GenreService, get_genre_service
+from src.services.person import PersonService, get_person_service
 from src.services.auth import permission_required
 from src.storages.films import FilmStorageFilter
 from src.core.messages import FILM_NOT_FOUND
 
 router = APIRouter()
 
+LIST_FIELDS = list(FilmList.__fields__)
+"""Поля кинопроизведений, запрашиваемые для списков."""
+
+get_fields = get_fields_param('film', Film)
+"""Зависимость для параметра `fields[film]`."""
+
+
+async def add_included(
+    data: Any,
+    films: list[Film],
+    include: list[str],
+    person_service: PersonService,
+    genre_service: GenreService,
+) -> Any:
+    """Добавить к ответу связанные документы кинопроизведений.
+
+    ID связанных документов собираются со всех кинопроизведений без
+    повторов. Документы каждого типа получаются одним `get_by_ids`
+    (MGET в кэш и `mget` в ES для отсутствующих), типы - параллельно.
+
+    Args:
+        data: ответ
+        films: кинопроизведения ответа
+        include: связи, документы которых включаются в ответ
+        person_service: сервис персон
+        genre_service: сервис жанров
+
+    Returns:
+        Any: ответ как есть, если связи не запрошены,
+             иначе `{"data": ответ, "included": {тип: документы}}`
+
+    """
+    if not include:
+        return data
+
+    ids = defaultdict(list)
+    for film in films:
+        for relation in include:
+            ids[INCLUDE_RELATIONS[relation]].extend(
+                item.id for item in getattr(film, relation) or [])
+    services = {'persons': person_service, 'genres': genre_service}
+    types = list(ids)
+    included = await asyncio.gather(
+        *(services[type_].get_by_ids(ids[type_]) for type_ in types))
+    return {'data': data, 'included': dict(zip(types, included))}
+
 
 @router.get('/search',
-            response_model=list[FilmList],
+            response_model=Union[list[FilmList], FilmListCompound],
             summary='Поиск кинопроизведений',
             description='Полнотекстовый поиск кинопроизведений '
                         'с пагинацией и сортировкой')
+@cache_response()
 async def search(
+    response: Response,
     query: str = Query(..., description='Поисковый запрос'),
     page: Page = Depends(get_page),
-    sort: list[str] = Query(default=[], description='Поле для сортировки'),
+    sort: list[str] = Depends(get_sort),
+    fields: list[str] = Depends(get_fields),
+    include: list[str] = Depends(get_include),
+    film_service: FilmService = Depends(get_film_service),
+    person_service: PersonService = Depends(get_person_service),
+    genre_service: GenreService = Depends(get_genre_service)
+) -> Union[list[FilmList], FilmListCompound]:
+    result = await film_service.search(
+        query=query, page=page, sort=sort,
+        fields=get_source_fields(fields, allowed=LIST_FIELDS, include=include)
+    )
+    set_next_cursor(response, page, result.after)
+    films = result.items
+    return await add_included(
+        [select_fields(film, fields, FilmList) for film in films],
+        films, include, person_service, genre_service
+    )
+
+
+@router.post('/batch',
+             response_model=list[FilmList],
+             response_model_exclude_unset=True,
+             summary='Кинопроизведения по списку ID',
+             description='Список кинопроизведений по списку ID в порядке '
+                         'запроса, ненайденные пропускаются')
+async def batch(
+    batch: Batch,
+    fields: list[str] = Depends(get_fields),
     film_service: FilmService = Depends(get_film_service)
 ) -> list[FilmList]:
-    films = await film_service.search(query=query, page=page, sort=sort)
-    return [FilmList(**film.dict()) for film in films]
+    films = await film_service.get_by_ids(batch.ids)
+    return trusted_response(
+        [select_fields(film, fields, FilmList) for film in films],
+        list[FilmList]
+    )
+
+
+@router.get('/export',
+            summary='Выгрузка кинопроизведений',
+            description='Все кинопроизведения с фильтрацией по актерам, '
+                        'режиссерам, сценаристам и жанрам потоком NDJSON '
+                        '(объект на строку) в обход кэша')
+async def export(
+    filter: Filter = Depends(get_filter),
+    fields: list[str] = Depends(get_fields),
+    film_service: FilmService = Depends(get_film_service)
+) -> StreamingResponse:
+    storage_filter = FilmStorageFilter(**filter.dict())
+    films = film_service.export(filter=storage_filter,
+                                fields=get_source_fields(fields))
+    return ndjson_response(films, fields, FilmDetails)
 
 
 @router.get('/newest',
-            response_model=list[FilmList],
+            response_model=Union[list[FilmList], FilmListCompound],
             summary='Список кинопроизведений-новинок',
             description='Список кинопропроизведений-новинок с фильтрацией '
                         'по актерам, режиссерам, сценаристам и жанрам '
                         'с пагинацией и сортировкой')
+@cache_response(scope='view_newest_movies')
 async def films(
+    response: Response,
     filter: Filter = Depends(get_filter),
     page: Page = Depends(get_page),
-    sort: list[str] = Query(default=[], description='Поле для сортировки'),
+    sort: list[str] = Depends(get_sort),
+    fields: list[str] = Depends(get_fields),
+    include: list[str] = Depends(get_include),
     film_service: FilmService = Depends(get_film_service),
+    person_service: PersonService = Depends(get_person_service),
+    genre_service: GenreService = Depends(get_genre_service),
     user: User = Depends(permission_required('view_newest_movies'))
-) -> list[FilmList]:
+) -> Union[list[FilmList], FilmListCompound]:
     storage_filter = FilmStorageFilter(**filter.dict(), newest=True)
-    films = await film_service.get(filter=storage_filter, page=page, sort=sort)
-    return [FilmList(**film.dict()) for film in films]
+    result = await film_service.get(
+        filter=storage_filter, page=page, sort=sort,
+        fields=get_source_fields(fields, allowed=LIST_FIELDS, include=include)
+    )
+    set_next_cursor(response, page, result.after)
+    films = result.items
+    return await add_included(
+        [select_fields(film, fields, FilmList) for film in films],
+        films, include, person_service, genre_service
+    )
 
 
 @router.get('/{film_id}',
-            response_model=FilmDetails,
+            response_model=Union[FilmDetails, FilmDetailsCompound],
             summary='Информация о кинопроизведении',
             description='Детальная информация о кинопроизведении')
+@cache_response()
 async def film_details(
     film_id: str = Path(..., description='ID кинопроизведения'),
-    film_service: FilmService = Depends(get_film_service)
-) -> FilmDetails:
-    film = await film_service.get_by_id(film_id)
+    fields: list[str] = Depends(get_fields),
+    include: list[str] = Depends(get_include),
+    film_service: FilmService = Depends(get_film_service),
+    person_service: PersonService = Depends(get_person_service),
+    genre_service: GenreService = Depends(get_genre_service)
+) -> Union[FilmDetails, FilmDetailsCompound]:
+    film = await film_service.get_by_id(
+        film_id, fields=get_source_fields(fields, include=include))
     if not film:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail=FILM_NOT_FOUND)
-    return FilmDetails(**film.dict())
+    return await add_included(select_fields(film, fields, FilmDetails),
+                              [film], include, person_service, genre_service)
 
 
 @router.get('/',
-            response_model=list[FilmList],
+            response_model=Union[list[FilmList], FilmListCompound],
             summary='Список кинопроизведений',
             description='Список кинопропроизведений с фильтрацией '
                         'по актерам, режиссерам, сценаристам и жанрам '
                         'с пагинацией и сортировкой')
+@cache_response()
 async def films(
+    response: Response,
     filter: Filter = Depends(get_filter),
     page: Page = Depends(get_page),
-    sort: list[str] = Query(default=[], description='Поле для сортировки'),
-    film_service: FilmService = Depends(get_film_service)
-) -> list[FilmList]:
+    sort: list[str] = Depends(get_sort),
+    fields: list[str] = Depends(get_fields),
+    include: list[str] = Depends(get_include),
+    film_service: FilmService = Depends(get_film_service),
+    person_service: PersonService = Depends(get_person_service),
+    genre_service: GenreService = Depends(get_genre_service)
+) -> Union[list[FilmList], FilmListCompound]:
     storage_filter = FilmStorageFilter(**filter.dict())
-    films = await film_service.get(filter=storage_filter, page=page, sort=sort)
-    return [FilmList(**film.dict()) for film in films]
+    result = await film_service.get(
+        filter=storage_filter, page=page, sort=sort,
+        fields=get_source_fields(fields, allowed=LIST_FIELDS, include=include)
+    )
+    set_next_cursor(response, page, result.after)
+    films = result.items
+    return await add_included(
+        [select_fields(film, fields, FilmList) for film in films],
+        films, include, person_service, genre_service
+    )
@@ -1,50 +1,109 @@
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends, Query, Path, HTTPException
+from fastapi import APIRouter, Depends, Query, Path, HTTPException, Response
+from fastapi.responses import StreamingResponse
 
-from src.api.v1.query_params.base import Page, get_page
+from src.api.v1.query_params.base import (Page, get_fields_param, get_page,
+                                          get_source_fields, select_fields,
+                                          set_next_cursor)
+from src.api.v1.query_params.genres import get_sort
+from src.api.v1.response_cache import cache_response
+from src.api.v1.responses import ndjson_response, trusted_response
+from src.api.v1.models.batch import Batch
 from src.api.v1.models.genre import Genre
+from src.models import genre as models
 from src.services.genre import GenreService, get_genre_service
 from src.core.messages import GENRE_NOT_FOUND
 
 router = APIRouter()
 
+get_fields = get_fields_param('genre', models.Genre)
+"""Зависимость для параметра `fields[genre]`."""
+
 
 @router.get('/search',
             response_model=list[Genre],
             summary='Поиск жанров',
             description='Полнотекстовый поиск жанров с пагинацией')
+@cache_response()
 async def search(
+        response: Response,
         query: str = Query(..., description='Поисковый запрос'),
         page: Page = Depends(get_page),
-        sort: list[str] = Query(default=[],
-                                description='Поле для сортировки'),
+        sort: list[str] = Depends(get_sort),
+        fields: list[str] = Depends(get_fields),
         genre_service: GenreService = Depends(get_genre_service)
 ) -> list[Genre]:
-    return await genre_service.search(query=query, page=page, sort=sort)
+    result = await genre_service.search(
+        query=query, page=page, sort=sort,
+        fields=get_source_fields(fields)
+    )
+    set_next_cursor(response, page, result.after)
+    genres = result.items
+    return [select_fields(genre, fields) for genre in genres]
+
+
+@router.post('/batch',
+             response_model=list[Genre],
+             response_model_exclude_unset=True,
+             summary='Жанры по списку ID',
+             description='Список жанров по списку ID в порядке запроса, '
+                         'ненайденные пропускаются')
+async def batch(
+    batch: Batch,
+    fields: list[str] = Depends(get_fields),
+    genre_service: GenreService = Depends(get_genre_service)
+) -> list[Genre]:
+    genres = await genre_service.get_by_ids(batch.ids)
+    return trusted_response(
+        [select_fields(genre, fields, Genre) for genre in genres],
+        list[Genre]
+    )
+
+
+@router.get("/export",
+            summary='Выгрузка жанров',
+            description='Все жанры потоком NDJSON (объект на строку) '
+                        'в обход кэша')
+async def export(
+        fields: list[str] = Depends(get_fields),
+        genre_service: GenreService = Depends(get_genre_service)
+) -> StreamingResponse:
+    genres = genre_service.export(fields=get_source_fields(fields))
+    return ndjson_response(genres, fields)
 
 
 @router.get("/",
             response_model=list[Genre],
             summary='Список жанров',
             description='Список жанров с пагинацией')
+@cache_response()
 async def genres(
+    response: Response,
     page: Page = Depends(get_page),
+    fields: list[str] = Depends(get_fields),
     genre_service: GenreService = Depends(get_genre_service),
 ) -> list[Genre]:
-    return await genre_service.get(page=page)
+    result = await genre_service.get(page=page,
+                                     fields=get_source_fields(fields))
+    set_next_cursor(response, page, result.after)
+    genres = result.items
+    return [select_fields(genre, fields) for genre in genres]
 
 
 @router.get("/{genre_id}",
             response_model=Genre,
             summary='Информация о жанре',
             description='Детальная информация о жанре')
+@cache_response()
 async def genre_details(
     genre_id: str = Path(..., description='ID жанра'),
+    fields: list[str] = Depends(get_fields),
     genre_service: GenreService = Depends(get_genre_service)
 ) -> Genre:
-    genre = await genre_service.get_by_id(genre_id)
+    genre = await genre_service.get_by_id(genre_id,
+                                          fields=get_source_fields(fields))
     if not genre:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail=GENRE_NOT_FOUND)
-    return genre
+    return select_fields(genre, fields)
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+from src.core.config import elastic_settings
+
+
+class Batch(BaseModel):
+    """Модель запроса объектов по списку ID."""
+    ids: list[str] = Field(...,
+                           min_items=1,
+                           max_items=elastic_settings.ELASTIC_MGET_MAX_IDS,
+                           description='Список ID')
@@ -2,6 +2,8 @@ import datetime
 
 from pydantic import BaseModel, FileUrl
 
+from src.api.v1.models import genre, person
+
 
 class Person(BaseModel):
     """Модель персоны в фильме."""
@@ -36,3 +38,21 @@ class FilmList(BaseModel):
     description: str = None
     imdb_rating: float = None
     creation_date: datetime.date = None
+
+
+class Included(BaseModel):
+    """Связанные документы (без повторов)."""
+    persons: list[person.Person] = None
+    genres: list[genre.Genre] = None
+
+
+class FilmDetailsCompound(BaseModel):
+    """Детальная модель фильма со связанными документами."""
+    data: FilmDetails
+    included: Included
+
+
+class FilmListCompound(BaseModel):
+    """Список фильмов со связанными документами."""
+    data: list[FilmList]
+    included: Included
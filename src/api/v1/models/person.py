@@ -1,3 +1,5 @@
+from pydantic import BaseModel
+
 from src.models.mixin import OrjsonMixin
 
 
@@ -8,3 +10,11 @@ class Person(OrjsonMixin):
     full_name: str = None
     roles: list = None
     film_ids: list = None
+
+
+class PersonFilm(BaseModel):
+    """Модель фильма в фильмографии персоны."""
+
+    id: str
+    title: str
+    imdb_rating: float = None
@@ -1,53 +1,143 @@
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends, Query, Path, HTTPException
+from fastapi import APIRouter, Depends, Query, Path, HTTPException, Response
+from fastapi.responses import StreamingResponse
 
-from src.api.v1.query_params.base import Page, get_page
-from src.api.v1.query_params.persons import Filter, get_filter
-from src.api.v1.models.person import Person
+from src.api.v1.query_params.base import (Page, get_fields_param,
+                                          get_numbered_page, get_page,
+                                          get_source_fields, select_fields,
+                                          set_next_cursor)
+from src.api.v1.response_cache import cache_response
+from src.api.v1.responses import ndjson_response, trusted_response
+from src.api.v1.query_params.persons import Filter, get_filter, get_sort
+from src.api.v1.models.batch import Batch
+from src.api.v1.models.person import Person, PersonFilm
+from src.models import person as models
+from src.services.film import FilmService, get_film_service
 from src.services.person import PersonService, get_person_service
 from src.core.messages import PERSON_NOT_FOUND
 
 router = APIRouter()
 
+get_fields = get_fields_param('person', models.Person)
+"""Зависимость для параметра `fields[person]`."""
+
+FILM_FIELDS = list(PersonFilm.__fields__)
+"""Поля кинопроизведений в фильмографии."""
+
 
 @router.get('/search',
             response_model=list[Person],
             summary='Поиск персоналий',
             description='Полнотекстовый поиск по персоналиям '
                         'с пагинацией и сортировкой')
+@cache_response()
 async def search(
+        response: Response,
         query: str = Query(..., description='Поисковый запрос'),
         page: Page = Depends(get_page),
-        sort: list[str] = Query(None, description='Поле для сортировки'),
+        sort: list[str] = Depends(get_sort),
+        fields: list[str] = Depends(get_fields),
         genre_service: PersonService = Depends(get_person_service)
 ) -> list[Person]:
-    return await genre_service.search(query=query, page=page, sort=sort)
+    result = await genre_service.search(
+        query=query, page=page, sort=sort,
+        fields=get_source_fields(fields)
+    )
+    set_next_cursor(response, page, result.after)
+    persons = result.items
+    return [select_fields(person, fields) for person in persons]
+
+
+@router.post('/batch',
+             response_model=list[Person],
+             response_model_exclude_unset=True,
+             summary='Персоны по списку ID',
+             description='Список персон по списку ID в порядке запроса, '
+                         'ненайденные пропускаются')
+async def batch(
+        batch: Batch,
+        fields: list[str] = Depends(get_fields),
+        person_service: PersonService = Depends(get_person_service)
+) -> list[Person]:
+    persons = await person_service.get_by_ids(batch.ids)
+    return trusted_response(
+        [select_fields(person, fields, Person) for person in persons],
+        list[Person]
+    )
+
+
+@router.get("/export",
+            summary='Выгрузка персоналий',
+            description='Все персоналии с фильтрацией потоком NDJSON '
+                        '(объект на строку) в обход кэша')
+async def export(
+        filter: Filter = Depends(get_filter),
+        fields: list[str] = Depends(get_fields),
+        person_service: PersonService = Depends(get_person_service)
+) -> StreamingResponse:
+    persons = person_service.export(filter=filter,
+                                    fields=get_source_fields(fields))
+    return ndjson_response(persons, fields)
 
 
 @router.get("/{person_id}",
             response_model=Person,
             summary='Информация о персоне',
             description='Детальная информация о персоне')
+@cache_response()
 async def person_details(
         person_id: str = Path(..., description='ID персоны'),
+        fields: list[str] = Depends(get_fields),
         person_service: PersonService = Depends(get_person_service)
 ) -> Person:
+    person = await person_service.get_by_id(person_id,
+                                            fields=get_source_fields(fields))
+    if not person:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
+                            detail=PERSON_NOT_FOUND)
+    return select_fields(person, fields)
+
+
+@router.get("/{person_id}/film",
+            response_model=list[PersonFilm],
+            summary='Фильмография персоны',
+            description='Кинопроизведения персоны с пагинацией')
+@cache_response()
+async def person_films(
+        person_id: str = Path(..., description='ID персоны'),
+        page: Page = Depends(get_numbered_page),
+        person_service: PersonService = Depends(get_person_service),
+        film_service: FilmService = Depends(get_film_service)
+) -> list[PersonFilm]:
     person = await person_service.get_by_id(person_id)
     if not person:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail=PERSON_NOT_FOUND)
-    return person
+    films = await film_service.get_page_by_ids(
+        method=f'persons/{person_id}/film', ids=person.film_ids or [],
+        page=page, fields=FILM_FIELDS
+    )
+    return [select_fields(film, None, PersonFilm) for film in films]
 
 
 @router.get("/",
             response_model=list[Person],
             summary='Список персоналий',
             description='Список персоналий с пагинацией и сортировкой')
+@cache_response()
 async def persons(
+        response: Response,
         filter: Filter = Depends(get_filter),
         page: Page = Depends(get_page),
-        sort: list[str] = Query(None, description='Поле для сортировки'),
+        sort: list[str] = Depends(get_sort),
+        fields: list[str] = Depends(get_fields),
         person_service: PersonService = Depends(get_person_service),
 ) -> list[Person]:
-    return await person_service.get(page=page, sort=sort, filter=filter)
+    result = await person_service.get(
+        page=page, sort=sort, filter=filter,
+        fields=get_source_fields(fields)
+    )
+    set_next_cursor(response, page, result.after)
+    persons = result.items
+    return [select_fields(person, fields) for person in persons]
@@ -1,7 +1,67 @@
-from fastapi import Query
+import base64
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any, Callable, Optional, Type
+
+import orjson
+from fastapi import HTTPException, Query, Request, Response
 from pydantic import BaseModel
 
 from src.core import config
+from src.core.messages import (CURSOR_NOT_SUPPORTED, EMPTY_SORT,
+                               INVALID_CURSOR, INVALID_FIELDS,
+                               INVALID_INCLUDE, INVALID_SORT)
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+"""Заголовок ответа с курсором следующей страницы."""
+
+
+class Cursor(BaseModel):
+    """Курсор постраничного просмотра (`search_after`).
+
+    Курсор содержит значения сортировки последнего документа страницы
+    и не зависит от состояния экземпляра API, поэтому его можно
+    кэшировать и передавать между экземплярами.
+
+    Args:
+        after: значения сортировки последнего документа страницы
+        pit_id: ID point-in-time ElasticSearch
+
+    """
+    after: list[Any]
+    pit_id: Optional[str] = None
+
+    def encode(self) -> str:
+        """Закодировать курсор в непрозрачную строку.
+
+        Returns:
+            str: курсор
+
+        """
+        data = orjson.dumps({'a': self.after, 'p': self.pit_id})
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    @classmethod
+    def decode(cls, value: str) -> 'Cursor':
+        """Раскодировать курсор.
+
+        Args:
+            value: курсор
+
+        Returns:
+            Cursor: курсор
+
+        Raises:
+            ValueError: курсор некорректен
+
+        """
+        try:
+            data = orjson.loads(
+                base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+            )
+            return cls(after=data['a'], pit_id=data.get('p'))
+        except Exception as e:
+            raise ValueError(INVALID_CURSOR) from e
 
 
 class Page(BaseModel):
@@ -10,10 +70,44 @@ class Page(BaseModel):
     Args:
         number: номер страницы
         size: размер страницы
+        cursor: курсор (`search_after`), при его наличии номер
+                страницы не используется
 
     """
     number: int
     size: int
+    cursor: Optional[Cursor] = None
+
+
+@dataclass
+class PageResult:
+    """Страница результатов поиска.
+
+    Args:
+        items: объекты (или ID) страницы
+        after: значения сортировки последнего документа полной страницы
+               из ответа ES (None - следующей страницы по курсору нет)
+
+    """
+    items: list[Any]
+    after: Optional[list[Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+@dataclass(frozen=True)
+class SortField:
+    """Поле сортировки ElasticSearch.
+
+    Args:
+        field: поле ES с doc values (keyword, число, дата)
+        type: тип поля: по нему ES сортирует индекс, в маппинге
+              которого поля нет, вместо ответа 400
+
+    """
+    field: str
+    type: str
 
 
 def get_page(
@@ -28,6 +122,12 @@ def get_page(
         ge=1,
         description="Размер страницы",
         alias="page[size]",
+    ),
+    cursor: str = Query(
+        default=None,
+        description="Курсор следующей страницы "
+                    f"(из заголовка {NEXT_CURSOR_HEADER})",
+        alias="page[cursor]",
     )
 ):
     """Получить инстанс пагинации.
@@ -35,6 +135,284 @@ def get_page(
     Args:
         number: номер страницы
         size: размер страницы
+        cursor: курсор следующей страницы
+
+    """
+    if cursor is None:
+        return Page(number=number, size=size)
+    try:
+        return Page(number=1, size=size, cursor=Cursor.decode(cursor))
+    except ValueError:
+        raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                            detail=INVALID_CURSOR)
+
+
+def get_numbered_page(
+    request: Request,
+    number: int = Query(
+        default=1,
+        ge=1,
+        description="Номер страницы",
+        alias="page[number]"
+    ),
+    size: int = Query(
+        default=config.elastic_settings.ELASTIC_DEFAULT_PAGE_SIZE,
+        ge=1,
+        description="Размер страницы",
+        alias="page[size]",
+    ),
+):
+    """Получить инстанс пагинации для списков без курсора.
+
+    Переданный курсор не игнорируется молча (клиент снова получил бы
+    первую страницу), а приводит к ошибке 422.
+
+    Args:
+        request: запрос
+        number: номер страницы
+        size: размер страницы
 
     """
+    if 'page[cursor]' in request.query_params:
+        raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                            detail=CURSOR_NOT_SUPPORTED)
     return Page(number=number, size=size)
+
+
+def normalize_sort(sort: Optional[list[str]]) -> list[str]:
+    """Нормализовать сортировку.
+
+    Убираются повторные сортировки по одному полю (в ES они ни на что
+    не влияют). Порядок полей сохраняется.
+
+    Args:
+        sort: сортировка, например ['-imdb_rating', 'title']
+
+    Returns:
+        list[str]: нормализованная сортировка
+
+    Raises:
+        ValueError: в сортировке есть пустое поле
+
+    """
+    result = []
+    fields = set()
+    for item in sort or []:
+        item = item.strip()
+        field = item.lstrip('-+')
+        if not field:
+            raise ValueError(EMPTY_SORT)
+        if field in fields:
+            continue
+        fields.add(field)
+        result.append(f'-{field}' if item.startswith('-') else field)
+    return result
+
+
+def get_sort_param(sort_fields: dict[str, SortField]) -> Callable:
+    """Получить зависимость для параметра `sort`.
+
+    Args:
+        sort_fields: реестр сортировок: публичное имя -> поле ES
+
+    Returns:
+        Callable: зависимость, возвращающая сортировку
+
+    """
+    def get_sort(
+        sort: list[str] = Query(
+            default=[],
+            description=f"Поле для сортировки (`-` - по убыванию): "
+                        f"{', '.join(sort_fields)}",
+        )
+    ) -> list[str]:
+        if any(not item.strip().lstrip('-+') for item in sort):
+            raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                                detail=EMPTY_SORT)
+        unknown = [item for item in sort
+                   if item.strip().lstrip('-+') not in sort_fields]
+        if unknown:
+            raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                                detail=f'{INVALID_SORT}: '
+                                       f'{", ".join(unknown)}')
+        return sort
+
+    return get_sort
+
+
+def get_stable_sort(sort: list[str] = None, query: str = None) -> list[str]:
+    """Дополнить сортировку полем `id` для однозначного порядка.
+
+    Без однозначного порядка невозможна пагинация курсором. Поиск
+    по релевантности (запрос без сортировки) не дополняется.
+
+    Args:
+        sort: сортировка
+        query: поисковый запрос
+
+    Returns:
+        list[str]: сортировка
+
+    """
+    sort = list(sort or [])
+    if query is not None and not sort:
+        return sort
+    if 'id' not in (item.lstrip('-') for item in sort):
+        sort.append('id')
+    return sort
+
+
+def set_next_cursor(
+    response: Response,
+    page: Page,
+    after: Optional[list[Any]],
+):
+    """Выставить заголовок с курсором следующей страницы.
+
+    Курсор строится по значениям сортировки последнего документа
+    страницы из ответа ES. Если их нет (страница неполная или поиск
+    по релевантности), заголовок не выставляется.
+
+    Args:
+        response: ответ
+        page: пагинация
+        after: значения сортировки последнего документа страницы
+
+    """
+    if not after:
+        return
+
+    cursor = Cursor(
+        after=after,
+        pit_id=page.cursor.pit_id if page.cursor else None
+    )
+    response.headers[NEXT_CURSOR_HEADER] = cursor.encode()
+
+
+def get_fields_param(name: str, model: Type[BaseModel]) -> Callable:
+    """Получить зависимость для параметра `fields[<name>]`
+    (sparse fieldsets JSON:API).
+
+    Args:
+        name: тип объектов в имени параметра (film, person, genre)
+        model: модель, по которой проверяются поля
+
+    Returns:
+        Callable: зависимость, возвращающая список полей
+                  или None, если параметр не передан
+
+    """
+    def get_fields(
+        fields: str = Query(
+            default=None,
+            description=f"Поля объектов через запятую, "
+                        f"например: {','.join(list(model.__fields__)[:2])}",
+            alias=f"fields[{name}]",
+        )
+    ) -> Optional[list[str]]:
+        if fields is None:
+            return None
+        result = list(dict.fromkeys(
+            item.strip() for item in fields.split(',') if item.strip()
+        ))
+        unknown = [item for item in result if item not in model.__fields__]
+        if unknown:
+            raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                                detail=f'{INVALID_FIELDS}: '
+                                       f'{", ".join(unknown)}')
+        return result
+
+    return get_fields
+
+
+def get_include_param(relations: list[str]) -> Callable:
+    """Получить зависимость для параметра `include`
+    (составные документы JSON:API).
+
+    Args:
+        relations: связи, документы которых можно включить в ответ
+
+    Returns:
+        Callable: зависимость, возвращающая список связей
+
+    """
+    def get_include(
+        include: str = Query(
+            default=None,
+            description=f"Связанные документы через запятую: "
+                        f"{','.join(relations)}",
+        )
+    ) -> list[str]:
+        if include is None:
+            return []
+        result = list(dict.fromkeys(
+            item.strip() for item in include.split(',') if item.strip()
+        ))
+        unknown = [item for item in result if item not in relations]
+        if unknown:
+            raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                                detail=f'{INVALID_INCLUDE}: '
+                                       f'{", ".join(unknown)}')
+        return result
+
+    return get_include
+
+
+def get_source_fields(
+    fields: Optional[list[str]],
+    allowed: list[str] = None,
+    include: list[str] = None,
+) -> Optional[list[str]]:
+    """Получить поля, запрашиваемые из хранилища.
+
+    Кроме запрошенных полей всегда запрашиваются `id` и поля включаемых
+    связей. Поля сортировки не нужны: курсор следующей страницы строится
+    по значениям сортировки из ответа ES.
+
+    Args:
+        fields: запрошенные поля или None, если нужны все
+        allowed: поля, доступные в ответе (по умолчанию - все)
+        include: связи, документы которых включаются в ответ
+
+    Returns:
+        Optional[list[str]]: поля или None, если нужны все
+
+    """
+    include = include or []
+    if fields is None:
+        if allowed is None:
+            return None
+        return list(dict.fromkeys([*allowed, *include]))
+    if allowed is not None:
+        fields = [item for item in fields if item in allowed]
+    return list(dict.fromkeys(['id', *fields, *include]))
+
+
+def select_fields(obj: BaseModel,
+                  fields: Optional[list[str]],
+                  model: Type[BaseModel] = None) -> Any:
+    """Оставить в объекте только запрошенные поля.
+
+    Незапрошенные поля не сериализуются. Объект из собственного
+    хранилища не валидируется повторно моделью ответа, если не включен
+    `STRICT_VALIDATION`.
+
+    Args:
+        obj: объект
+        fields: запрошенные поля или None, если нужны все
+        model: модель ответа (ограничивает поля)
+
+    Returns:
+        Any: объект модели ответа или словарь с запрошенными полями и `id`
+
+    """
+    if fields is None:
+        if model is None:
+            return obj
+        if config.project_settings.STRICT_VALIDATION:
+            return model(**obj.dict())
+        return obj.dict(include=set(model.__fields__))
+    include = {'id', *fields}
+    if model is not None:
+        include &= set(model.__fields__)
+    return obj.dict(include=include)
@@ -3,6 +3,31 @@ import uuid
 from pydantic import BaseModel
 from fastapi import Query
 
+from src.api.v1.query_params.base import (SortField, get_include_param,
+                                          get_sort_param)
+
+SORT_FIELDS: dict[str, SortField] = {
+    'id': SortField('id', 'keyword'),
+    'title': SortField('title.raw', 'keyword'),
+    'imdb_rating': SortField('imdb_rating', 'float'),
+    'creation_date': SortField('creation_date', 'date'),
+}
+"""Реестр сортировок кинопроизведений: публичное имя -> поле ES и его тип."""
+
+get_sort = get_sort_param(SORT_FIELDS)
+"""Зависимость для параметра сортировки кинопроизведений."""
+
+INCLUDE_RELATIONS: dict[str, str] = {
+    'actors': 'persons',
+    'directors': 'persons',
+    'writers': 'persons',
+    'genres': 'genres',
+}
+"""Связи кинопроизведений: поле -> тип связанных документов."""
+
+get_include = get_include_param(list(INCLUDE_RELATIONS))
+"""Зависимость для параметра `include` кинопроизведений."""
+
 
 class Filter(BaseModel):
     """Модель фильтрации кинопроизведения.
@@ -0,0 +1,9 @@
+from src.api.v1.query_params.base import SortField, get_sort_param
+
+SORT_FIELDS: dict[str, SortField] = {
+    'id': SortField('id', 'keyword'),
+}
+"""Реестр сортировок жанров: публичное имя -> поле ES и его тип."""
+
+get_sort = get_sort_param(SORT_FIELDS)
+"""Зависимость для параметра сортировки жанров."""
@@ -3,6 +3,17 @@ from enum import Enum
 from pydantic import BaseModel
 from fastapi import Query
 
+from src.api.v1.query_params.base import SortField, get_sort_param
+
+SORT_FIELDS: dict[str, SortField] = {
+    'id': SortField('id', 'keyword'),
+    'full_name': SortField('full_name.raw', 'keyword'),
+}
+"""Реестр сортировок персон: публичное имя -> поле ES и его тип."""
+
+get_sort = get_sort_param(SORT_FIELDS)
+"""Зависимость для параметра сортировки персон."""
+
 
 class RolesEnum(str, Enum):
     """Перечисление ролей."""
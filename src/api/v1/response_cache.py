@@ -0,0 +1,299 @@
+import functools
+import hashlib
+import inspect
+import time
+from http import HTTPStatus
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import orjson
+from fastapi import Depends, Request, Response
+from pydantic.json import pydantic_encoder
+
+from src.api.v1.responses import validate_content
+from src.core.config import project_settings, redis_settings
+from src.core.metrics import metrics
+from src.services.cache_keys import build_response_key, keyspace_generation
+from src.storages.base import CacheStorage
+from src.storages.cache import get_cache_storage
+from src.storages.entry import CacheEntry
+
+REQUEST_PARAM = '_response_cache_request'
+"""Имя параметра, через который декоратор получает запрос."""
+STORAGE_PARAM = '_response_cache_storage'
+"""Имя параметра, через который декоратор получает хранилище кэша."""
+
+
+def get_etag(body: bytes) -> str:
+    """Получить сильный ETag тела ответа.
+
+    Args:
+        body: тело ответа
+
+    Returns:
+        str: ETag в кавычках
+
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Проверить заголовок `If-None-Match` (слабое сравнение).
+
+    Args:
+        if_none_match: значение заголовка
+        etag: ETag ответа
+
+    Returns:
+        bool: ETag совпадает, можно ответить 304
+
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    etag = etag.removeprefix('W/')
+    return any(item.strip().removeprefix('W/') == etag
+               for item in if_none_match.split(','))
+
+
+def get_cache_control(max_age: float, scope: str = None) -> str:
+    """Получить заголовок `Cache-Control` по срокам жизни кэша.
+
+    Args:
+        max_age: сколько секунд ответ можно считать свежим
+        scope: область видимости ответа (ответ только для пользователя)
+
+    Returns:
+        str: значение заголовка
+
+    """
+    visibility = 'private' if scope else 'public'
+    return (f'{visibility}, max-age={max(int(max_age), 0)}, '
+            f'stale-while-revalidate='
+            f'{redis_settings.CACHE_STALE_GRACE_IN_SECONDS}')
+
+
+def not_modified(etag: str, cache_control: str = None) -> Response:
+    """Получить ответ 304 без тела.
+
+    Args:
+        etag: ETag ответа
+        cache_control: значение заголовка `Cache-Control`
+
+    Returns:
+        Response: ответ
+
+    """
+    metrics.inc('response_not_modified_total')
+    headers = {'etag': etag}
+    if cache_control:
+        headers['cache-control'] = cache_control
+    return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+
+@dataclass
+class CachedResponse:
+    """Закодированный HTTP-ответ.
+
+    Args:
+        body: тело ответа
+        headers: заголовки ответа
+        status_code: код ответа
+        media_type: тип содержимого
+
+    """
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+    status_code: int = 200
+    media_type: str = 'application/json'
+
+    @classmethod
+    def from_content(cls,
+                     content: Any,
+                     headers: dict[str, str] = None) -> 'CachedResponse':
+        """Закодировать результат эндпоинта.
+
+        Args:
+            content: ответ или данные (модели, списки моделей)
+            headers: дополнительные заголовки ответа
+
+        Returns:
+            CachedResponse: закодированный ответ
+
+        """
+        if isinstance(content, Response):
+            response = cls(body=content.body,
+                           headers={k: v for k, v in content.headers.items()
+                                    if k not in ('content-length',
+                                                 'content-type')},
+                           status_code=content.status_code,
+                           media_type=content.media_type)
+        else:
+            response = cls(
+                body=orjson.dumps(content, default=pydantic_encoder)
+            )
+        for name, value in (headers or {}).items():
+            response.headers.setdefault(name, value)
+        if response.status_code == HTTPStatus.OK:
+            response.headers.setdefault('etag', get_etag(response.body))
+        return response
+
+    def to_response(self,
+                    if_none_match: str = None,
+                    cache_control: str = None) -> Response:
+        """Получить HTTP-ответ.
+
+        Если ETag совпадает с `If-None-Match`, возвращается 304 без тела.
+
+        Args:
+            if_none_match: значение заголовка `If-None-Match` запроса
+            cache_control: значение заголовка `Cache-Control`
+
+        Returns:
+            Response: ответ
+
+        """
+        headers = dict(self.headers)
+        if cache_control and self.status_code == HTTPStatus.OK:
+            headers['cache-control'] = cache_control
+
+        etag = headers.get('etag')
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, headers.get('cache-control'))
+
+        return Response(content=self.body,
+                        status_code=self.status_code,
+                        headers=headers,
+                        media_type=self.media_type)
+
+    def pack(self) -> bytes:
+        """Упаковать ответ для хранения в кэше.
+
+        Returns:
+            bytes: метаданные в json, перевод строки, тело ответа
+
+        """
+        meta = orjson.dumps({'headers': self.headers,
+                             'status_code': self.status_code,
+                             'media_type': self.media_type})
+        return meta + b'\n' + self.body
+
+    @classmethod
+    def unpack(cls, data: bytes) -> 'CachedResponse':
+        """Распаковать ответ из кэша.
+
+        Args:
+            data: упакованный ответ
+
+        Returns:
+            CachedResponse: ответ
+
+        """
+        meta, body = data.split(b'\n', 1)
+        return cls(body=body, **orjson.loads(meta))
+
+
+async def _call(func: Callable, model: Any,
+                *args, **kwargs) -> CachedResponse:
+    """Вызвать эндпоинт и закодировать ответ.
+
+    Заголовки, выставленные эндпоинтом через параметр `Response`
+    (например, курсор следующей страницы), сохраняются в ответе.
+    FastAPI не проверяет готовый ответ по `response_model`, поэтому
+    при `STRICT_VALIDATION` содержимое проверяется здесь, до кэширования.
+
+    Args:
+        func: эндпоинт
+        model: модель ответа (аннотация возвращаемого значения)
+        args: позиционные аргументы эндпоинта
+        kwargs: именованные аргументы эндпоинта
+
+    Returns:
+        CachedResponse: закодированный ответ
+
+    """
+    content = await func(*args, **kwargs)
+    if (project_settings.STRICT_VALIDATION
+            and not isinstance(content, Response)):
+        validate_content(content, model)
+    headers = {}
+    for value in kwargs.values():
+        if isinstance(value, Response):
+            headers.update((k, v) for k, v in value.headers.items()
+                           if k != 'content-length')
+    return CachedResponse.from_content(content, headers)
+
+
+def cache_response(scope: str = None) -> Callable:
+    """Декоратор кэширования ответа GET-эндпоинта целиком.
+
+    В кэше хранится готовое тело ответа с заголовками, поэтому при
+    попадании не создаются и не сериализуются модели. Ключ строится
+    по пути и параметрам запроса. Зависимости эндпоинта (в том числе
+    проверка прав) выполняются до обращения к кэшу. Кэширование
+    включается настройкой `RESPONSE_CACHE_ENABLED`.
+
+    Ответ получает сильный ETag (хэш тела, хранится вместе с ответом)
+    и `Cache-Control` по срокам жизни кэша. На условный запрос
+    с совпадающим `If-None-Match` отдается 304 без обращения к ES
+    и без сериализации. При выключенном кэше ответов ETag вычисляется
+    по телу каждого ответа и нигде не хранится: 304 экономит только
+    передачу тела.
+
+    Args:
+        scope: область видимости ответа, например требуемое право
+
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        model = signature.return_annotation
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            request: Request = kwargs.pop(REQUEST_PARAM)
+            cache_storage: CacheStorage = kwargs.pop(STORAGE_PARAM)
+            if_none_match = request.headers.get('if-none-match')
+            if not redis_settings.RESPONSE_CACHE_ENABLED:
+                cached = await _call(func, model, *args, **kwargs)
+                return cached.to_response(if_none_match, get_cache_control(
+                    redis_settings.CACHE_SOFT_EXPIRE_IN_SECONDS, scope))
+
+            key = build_response_key(
+                generation=await keyspace_generation.get(cache_storage),
+                path=request.url.path,
+                params=request.query_params.multi_items(),
+                scope=scope
+            )
+
+            entry = await cache_storage.get_entry(key)
+            if entry and not entry.is_expired() and not entry.negative:
+                metrics.inc('response_cache_total', result='hit')
+                return CachedResponse.unpack(entry.value).to_response(
+                    if_none_match,
+                    get_cache_control(entry.expires_at - time.time(), scope)
+                )
+
+            metrics.inc('response_cache_total', result='miss')
+            cached = await _call(func, model, *args, **kwargs)
+            expire = redis_settings.RESPONSE_CACHE_EXPIRE_IN_SECONDS
+            if cached.status_code == HTTPStatus.OK:
+                entry = CacheEntry.create(cached.pack(),
+                                          soft_expire=expire, expire=expire)
+                await cache_storage.put_entry(key, entry, expire=expire)
+            return cached.to_response(if_none_match,
+                                      get_cache_control(expire, scope))
+
+        parameters = [
+            inspect.Parameter(REQUEST_PARAM,
+                              inspect.Parameter.KEYWORD_ONLY,
+                              annotation=Request),
+            inspect.Parameter(STORAGE_PARAM,
+                              inspect.Parameter.KEYWORD_ONLY,
+                              annotation=CacheStorage,
+                              default=Depends(get_cache_storage)),
+        ]
+        wrapper.__signature__ = signature.replace(
+            parameters=[*signature.parameters.values(), *parameters])
+        return wrapper
+    return decorator
@@ -0,0 +1,91 @@
+from typing import Any, AsyncIterator, Optional, Type
+
+import orjson
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError, parse_obj_as
+from pydantic.json import pydantic_encoder
+
+from src.api.v1.query_params.base import select_fields
+from src.core.config import project_settings
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+"""Тип содержимого NDJSON (JSON-объект на строку)."""
+
+
+def trusted_response(content: Any, model: Any) -> Response:
+    """Отдать ответ из доверенных данных без валидации `response_model`.
+
+    Готовый `Response` FastAPI не валидирует и не сериализует повторно,
+    тело кодируется orjson. При `STRICT_VALIDATION` содержимое
+    проверяется здесь: ответ с разреженными полями не прошел бы
+    проверку `response_model` (см. `validate_content`).
+
+    Args:
+        content: содержимое ответа
+        model: модель ответа (тип, как в `response_model`)
+
+    Returns:
+        Response: ответ
+
+    Raises:
+        ValidationError: содержимое не соответствует модели
+
+    """
+    if project_settings.STRICT_VALIDATION:
+        validate_content(content, model)
+    return Response(orjson.dumps(content, default=pydantic_encoder),
+                    media_type='application/json')
+
+
+def validate_content(content: Any, model: Any):
+    """Проверить содержимое ответа по модели ответа.
+
+    Используется при `STRICT_VALIDATION` там, где FastAPI не проверяет
+    ответ сам (эндпоинт возвращает готовый `Response`). Ответ
+    с разреженными полями (`fields[...]`) не содержит части обязательных
+    полей, поэтому отсутствие поля ошибкой не считается.
+
+    Args:
+        content: содержимое ответа
+        model: модель ответа (тип, как в `response_model`)
+
+    Raises:
+        ValidationError: содержимое не соответствует модели
+
+    """
+    try:
+        parse_obj_as(model, content)
+    except ValidationError as e:
+        if any(error['type'] != 'value_error.missing'
+               for error in e.errors()):
+            raise
+
+
+def ndjson_response(pages: AsyncIterator[list[BaseModel]],
+                    fields: Optional[list[str]],
+                    model: Type[BaseModel] = None) -> StreamingResponse:
+    """Отдать страницы объектов потоком NDJSON.
+
+    Каждая страница кодируется и отправляется одним блоком, следующая
+    читается только после отправки предыдущей, поэтому медленный клиент
+    не накапливает данные в памяти.
+
+    Args:
+        pages: страницы объектов
+        fields: запрошенные поля или None, если нужны все
+        model: модель ответа (ограничивает поля)
+
+    Returns:
+        StreamingResponse: ответ
+
+    """
+    async def encode() -> AsyncIterator[bytes]:
+        async for page in pages:
+            yield b''.join(
+                orjson.dumps(select_fields(obj, fields, model),
+                             default=pydantic_encoder) + b'\n'
+                for obj in page
+            )
+
+    return StreamingResponse(encode(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,119 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from src.core.metrics import metrics
+
+LoadMany = Callable[[list[str]], Awaitable[dict[str, Any]]]
+"""Функция пакетной загрузки: список ключей -> результаты по ключам."""
+
+
+def get_size_bucket(size: int) -> str:
+    """Получить интервал размера пакета для метрик.
+
+    Args:
+        size: размер пакета
+
+    Returns:
+        str: интервал: `1`, `2`, `3-4`, `5-8`, ...
+
+    """
+    upper = 1
+    while upper < size:
+        upper *= 2
+    lower = upper // 2 + 1
+    return str(upper) if lower >= upper else f'{lower}-{upper}'
+
+
+class BatchLoader:
+    """Пакетная загрузка по ключам (в духе DataLoader).
+
+    Ключи, запрошенные в течение окна (или одной итерации цикла событий),
+    собираются в пакет и загружаются одним вызовом, результаты
+    раздаются ожидающим. Пакет отправляется раньше, если набрано
+    `max_size` ключей. Повторные запросы ключа, который уже загружается,
+    присоединяются к его загрузке.
+
+    Args:
+        name: название для метрик
+        window: окно сбора пакета в секундах (0 - одна итерация цикла)
+        max_size: максимальный размер пакета
+
+    """
+    def __init__(self, name: str, window: float, max_size: int) -> None:
+        self.name = name
+        self.window = window
+        self.max_size = max_size
+        self._pending: dict[str, asyncio.Future] = {}
+        self._loading: dict[str, asyncio.Future] = {}
+        self._load_many: Optional[LoadMany] = None
+        self._handle: Optional[asyncio.Handle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: str, load_many: LoadMany) -> Any:
+        """Загрузить значение по ключу в составе пакета.
+
+        Args:
+            key: ключ
+            load_many: функция пакетной загрузки
+
+        Returns:
+            Any: значение или None, если оно не найдено
+
+        """
+        future = self._pending.get(key) or self._loading.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+            self._load_many = load_many
+            if len(self._pending) >= self.max_size:
+                self._dispatch()
+            elif self._handle is None:
+                if self.window:
+                    self._handle = loop.call_later(self.window,
+                                                   self._dispatch)
+                else:
+                    self._handle = loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    def _dispatch(self):
+        """Отправить накопленный пакет на загрузку."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        self._loading.update(batch)
+        metrics.inc('batch_loader_batches_total', name=self.name)
+        metrics.inc('batch_loader_keys_total', len(batch), name=self.name)
+        metrics.inc('batch_loader_batch_sizes_total', name=self.name,
+                    size=get_size_bucket(len(batch)))
+        task = asyncio.ensure_future(self._run(batch, self._load_many))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self,
+                   batch: dict[str, asyncio.Future],
+                   load_many: LoadMany):
+        """Загрузить пакет и раздать результаты.
+
+        Args:
+            batch: ожидающие результатов по ключам
+            load_many: функция пакетной загрузки
+
+        """
+        try:
+            results = await load_many(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(results.get(key))
+        finally:
+            for key, future in batch.items():
+                if self._loading.get(key) is future:
+                    del self._loading[key]
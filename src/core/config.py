@@ -1,4 +1,5 @@
 import os
+from typing import Literal, Optional
 
 from pydantic import BaseSettings
 
@@ -26,6 +27,9 @@ class ProjectSettings(BaseConfig):
     """Описание проекта."""
     PROJECT_VER: str = "1.0.0"
     """Версия проекта."""
+    STRICT_VALIDATION: bool = False
+    """Валидировать данные из собственных хранилищ и ответы API
+    по `response_model`, в том числе кэшируемые (для отладки)."""
 
 
 class RedisSettings(BaseConfig):
@@ -35,10 +39,53 @@ class RedisSettings(BaseConfig):
     """HOST для подклчючения к Redis."""
     REDIS_PORT: int = 6379
     """PORT для подклчючения к Redis."""
+    CACHE_KEY_PREFIX: str = "cache"
+    """Префикс ключей кэша."""
+    CACHE_KEYSPACE_VERSION: int = 3
+    """Версия пространства ключей кэша (меняется при несовместимом деплое)."""
+    CACHE_GENERATION_REFRESH_IN_SECONDS: float = 5
+    """Как часто воркер перечитывает поколение ключей кэша в секундах."""
     CACHE_EXPIRE_IN_SECONDS: int = 60 * 5
     """Кэширование кинопроизведений в секундах."""
+    CACHE_SOFT_EXPIRE_IN_SECONDS: int = 60 * 4
+    """Через сколько секунд запись кэша устаревает и обновляется в фоне."""
+    CACHE_STALE_GRACE_IN_SECONDS: int = 60
+    """Сколько секунд хранить недействительную запись для отдачи,
+    пока другой инстанс заполняет кэш."""
+    CACHE_XFETCH_BETA: float = 1.0
+    """Коэффициент досрочного обновления кэша (0 - отключено)."""
+    NEGATIVE_CACHE_EXPIRE_IN_SECONDS: int = 30
+    """Кэширование отсутствующих объектов и пустых страниц в секундах."""
+    CACHE_LIST_IDS_ONLY: bool = False
+    """Кэшировать в списках только ID, а объекты - отдельными записями."""
+    CACHE_COMPRESSION: Literal["none", "zlib", "lz4", "zstd"] = "zlib"
+    """Кодек сжатия данных кэша."""
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024
+    """Минимальный размер данных кэша для сжатия в байтах."""
+    CACHE_TRUSTED: bool = True
+    """Не валидировать повторно данные из кэша."""
+    RESPONSE_CACHE_ENABLED: bool = False
+    """Кэшировать HTTP-ответы GET-эндпоинтов целиком."""
+    RESPONSE_CACHE_EXPIRE_IN_SECONDS: int = 60
+    """Кэширование HTTP-ответов в секундах."""
     BACKOFF_MAX_TIME: float = 10
     """Максимальное кол-во секунд для backoff"""
+    CACHE_BACKEND: Literal["redis", "tiered"] = "redis"
+    """Хранилище кэша: только Redis или локальный кэш воркера + Redis."""
+    LOCAL_CACHE_MAX_ENTRIES: int = 10_000
+    """Максимальное кол-во записей в локальном кэше воркера."""
+    LOCAL_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    """Максимальный объем локального кэша воркера в байтах."""
+    LOCAL_CACHE_EXPIRE_IN_SECONDS: int = 10
+    """Время жизни записей в локальном кэше воркера в секундах."""
+    CACHE_FILL_LOCK_ENABLED: bool = False
+    """Заполнять кэш под распределенной блокировкой."""
+    CACHE_FILL_LOCK_LEASE_IN_SECONDS: float = 5
+    """Срок аренды блокировки заполнения кэша в секундах."""
+    CACHE_FILL_LOCK_WAIT_IN_SECONDS: float = 1
+    """Сколько секунд ждать заполнения кэша другим инстансом."""
+    CACHE_FILL_LOCK_POLL_IN_SECONDS: float = 0.05
+    """Интервал опроса кэша при ожидании заполнения в секундах."""
 
 
 class ElasticSettings(BaseConfig):
@@ -48,8 +95,70 @@ class ElasticSettings(BaseConfig):
     """HOST для подклчючения к ElasticSearch."""
     ELASTIC_PORT: int = 9200
     """PORT для подклчючения к ElasticSearch."""
+    ELASTIC_HOSTS: list[str] = []
+    """Узлы кластера ElasticSearch `host:port` (по умолчанию -
+    `ELASTIC_HOST:ELASTIC_PORT`)."""
+    ELASTIC_SNIFF_ON_START: bool = False
+    """Получить список узлов кластера при подключении."""
+    ELASTIC_SNIFF_ON_CONNECTION_FAIL: bool = False
+    """Обновить список узлов кластера при ошибке соединения."""
+    ELASTIC_SNIFFER_TIMEOUT_IN_SECONDS: Optional[float] = None
+    """Как часто обновлять список узлов кластера в секундах
+    (по умолчанию - не обновлять)."""
+    ELASTIC_MAXSIZE: int = 10
+    """Размер пула соединений к каждому узлу."""
+    ELASTIC_KEEPALIVE_TIMEOUT_IN_SECONDS: float = 15
+    """Время жизни неиспользуемого соединения в пуле в секундах."""
+    ELASTIC_HTTP_COMPRESS: bool = False
+    """Сжимать запросы и ответы gzip."""
+    ELASTIC_TIMEOUT_IN_SECONDS: float = 10
+    """Таймаут запроса к ElasticSearch в секундах."""
+    ELASTIC_MAX_RETRIES: int = 3
+    """Кол-во повторов запроса на другом узле при ошибке соединения."""
+    ELASTIC_RETRY_ON_TIMEOUT: bool = False
+    """Повторять запрос на другом узле при таймауте."""
     ELASTIC_DEFAULT_PAGE_SIZE: int = 10
     """Размер ES-страницы по умолчанию."""
+    ELASTIC_MGET_MAX_IDS: int = 200
+    """Максимальное кол-во ID в запросе объектов по списку ID."""
+    ELASTIC_BATCH_LOAD_ENABLED: bool = False
+    """Объединять одновременные запросы объектов по ID в пакеты."""
+    ELASTIC_BATCH_LOAD_WINDOW_IN_MS: float = 0
+    """Окно сбора пакета в миллисекундах (0 - одна итерация цикла)."""
+    ELASTIC_BATCH_LOAD_MAX_SIZE: int = 100
+    """Максимальный размер пакета."""
+    ELASTIC_MSEARCH_ENABLED: bool = False
+    """Объединять одновременные поисковые запросы в `_msearch`."""
+    ELASTIC_MSEARCH_WINDOW_IN_MS: float = 0
+    """Окно сбора `_msearch` в миллисекундах (0 - одна итерация цикла)."""
+    ELASTIC_MSEARCH_MAX_SIZE: int = 50
+    """Максимальное кол-во поисковых запросов в `_msearch`."""
+    ELASTIC_EXPORT_PAGE_SIZE: int = 1000
+    """Размер страницы при выгрузке объектов."""
+    ELASTIC_EXPORT_KEEP_ALIVE: str = "1m"
+    """Время жизни point-in-time выгрузки между страницами."""
+    ELASTIC_PIT_KEEP_ALIVE: Optional[str] = None
+    """Время жизни point-in-time при пагинации курсором, например `1m`
+    (по умолчанию point-in-time не используется)."""
+    ELASTIC_BREAKER_ENABLED: bool = False
+    """Размыкать цепь запросов к индексу при ошибках и медленных ответах."""
+    ELASTIC_BREAKER_WINDOW_SIZE: int = 50
+    """Кол-во последних запросов, по которым оценивается доля ошибок."""
+    ELASTIC_BREAKER_MIN_CALLS: int = 10
+    """Минимальное кол-во запросов для размыкания цепи."""
+    ELASTIC_BREAKER_FAILURE_RATE: float = 0.5
+    """Доля ошибок и медленных запросов для размыкания цепи."""
+    ELASTIC_BREAKER_SLOW_CALL_IN_MS: float = 2000
+    """Время в миллисекундах, начиная с которого запрос считается
+    ошибкой."""
+    ELASTIC_BREAKER_RESET_TIMEOUT_IN_SECONDS: float = 5
+    """Через сколько секунд после размыкания выполнить пробный запрос."""
+    ELASTIC_HEDGE_ENABLED: bool = False
+    """Дублировать медленные запросы на чтение."""
+    ELASTIC_HEDGE_QUANTILE: float = 0.95
+    """Квантиль времени ответа, после которого отправляется дубликат."""
+    ELASTIC_HEDGE_MIN_DELAY_IN_MS: float = 10
+    """Минимальная задержка дубликата в миллисекундах."""
     BACKOFF_MAX_TIME: float = 10
     """Максимальное кол-во секунд для backoff"""
 
@@ -59,6 +168,12 @@ class JwtSettings(BaseConfig):
     """Алгоритм шифрования."""
     jwt_public_key_path: str
     """Путь до публичного RSA ключа."""
+    jwt_cache_max_entries: int = 10000
+    """Максимальное кол-во проверенных токенов в кэше воркера
+    (0 - не кэшировать)."""
+    jwt_cache_max_ttl: float = 300
+    """Максимальный срок хранения проверенного токена в секундах
+    (не дольше срока действия токена)."""
 
 
 project_settings = ProjectSettings()
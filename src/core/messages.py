@@ -5,5 +5,21 @@ GENRE_NOT_FOUND: str = 'Жанр не найден'
 PERSON_NOT_FOUND: str = 'Персона не найдена'
 """Сообщение, если персона не найдена."""
 
+INVALID_CURSOR: str = 'Некорректный курсор'
+"""Сообщение, если курсор пагинации некорректен."""
+CURSOR_NOT_SUPPORTED: str = 'Курсор не поддерживается'
+"""Сообщение, если список не поддерживает пагинацию курсором."""
+INVALID_SORT: str = 'Неподдерживаемая сортировка'
+"""Сообщение, если сортировка по полю не поддерживается."""
+EMPTY_SORT: str = 'Пустое поле сортировки'
+"""Сообщение, если в сортировке указано пустое поле."""
+INVALID_FIELDS: str = 'Неизвестные поля'
+"""Сообщение, если в запросе указаны неизвестные поля."""
+INVALID_INCLUDE: str = 'Неизвестные связи'
+"""Сообщение, если в запросе указаны неизвестные связи."""
+
+SERVICE_UNAVAILABLE: str = 'Сервис временно недоступен'
+"""Сообщение, если хранилище данных временно недоступно."""
+
 NO_ACCESS: str = 'No access'
 """Сообщение в отказе доступа."""
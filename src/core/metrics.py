@@ -0,0 +1,78 @@
+from collections import defaultdict
+
+
+class Metrics:
+    """Реестр метрик воркера (счетчики и текущие значения).
+
+    Метрики хранятся в памяти процесса, поэтому каждый воркер
+    отдает только свои значения.
+
+    """
+    def __init__(self) -> None:
+        self._values: dict[str, float] = defaultdict(float)
+
+    @staticmethod
+    def _get_name(name: str, labels: dict) -> str:
+        """Получить полное имя метрики с метками.
+
+        Args:
+            name: имя метрики
+            labels: метки
+
+        Returns:
+            str: имя метрики в формате `name{label="value"}`
+
+        """
+        if not labels:
+            return name
+        labels = ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+        return f'{name}{{{labels}}}'
+
+    def inc(self, name: str, value: float = 1, /, **labels):
+        """Увеличить счетчик.
+
+        Args:
+            name: имя метрики
+            value: приращение
+            labels: метки
+
+        """
+        self._values[self._get_name(name, labels)] += value
+
+    def set(self, name: str, value: float, /, **labels):
+        """Установить текущее значение.
+
+        Args:
+            name: имя метрики
+            value: значение
+            labels: метки
+
+        """
+        self._values[self._get_name(name, labels)] = value
+
+    def get(self, name: str, /, **labels) -> float:
+        """Получить значение метрики.
+
+        Args:
+            name: имя метрики
+            labels: метки
+
+        Returns:
+            float: значение
+
+        """
+        return self._values.get(self._get_name(name, labels), 0)
+
+    def render(self) -> str:
+        """Получить метрики в текстовом формате Prometheus.
+
+        Returns:
+            str: метрики
+
+        """
+        return ''.join(f'{name} {value}\n'
+                       for name, value in sorted(self._values.items()))
+
+
+metrics = Metrics()
+"""Метрики воркера."""
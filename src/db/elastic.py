@@ -1,7 +1,15 @@
+import asyncio
 from typing import Optional
 
-from elasticsearch import AsyncElasticsearch
-from elasticsearch.exceptions import ConnectionError
+import aiohttp
+import orjson
+from elasticsearch import AsyncElasticsearch, AIOHttpConnection
+# приватный класс ответа нужен для копии `_create_aiohttp_session`,
+# см. `ElasticConnection`
+from elasticsearch._async.http_aiohttp import ESClientResponse
+from elasticsearch.compat import string_types
+from elasticsearch.exceptions import ConnectionError, SerializationError
+from elasticsearch.serializer import JSONSerializer
 import backoff
 
 from src.core.config import elastic_settings
@@ -11,6 +19,77 @@ es: Optional[AsyncElasticsearch] = None
 """Соединение с ElasticSearch."""
 
 
+class OrjsonSerializer(JSONSerializer):
+    """Сериализатор тел запросов и ответов ElasticSearch на orjson."""
+
+    def loads(self, s):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError as e:
+            raise SerializationError(s, e)
+
+    def dumps(self, data):
+        if isinstance(data, string_types):
+            return data
+        try:
+            # клиент склеивает строки NDJSON (`_msearch`, `_bulk`),
+            # поэтому возвращаем str
+            return orjson.dumps(data, default=self.default).decode()
+        except TypeError as e:
+            raise SerializationError(data, e)
+
+
+class ElasticConnection(AIOHttpConnection):
+    """Соединение с узлом ElasticSearch с настраиваемым keep-alive.
+
+    Размер пула задается публичным параметром `maxsize`, а keep-alive
+    у `AIOHttpConnection` не настраивается: `TCPConnector` создается
+    внутри приватного `_create_aiohttp_session`. Поэтому метод
+    скопирован из elasticsearch-py 7.9.1 с добавлением
+    `keepalive_timeout`, а версия клиента закреплена в requirements.txt
+    точно. При обновлении клиента метод нужно сверить с исходным.
+
+    Args:
+        keepalive_timeout: время жизни неиспользуемого соединения
+                           в пуле в секундах
+
+    """
+    def __init__(self, *args, keepalive_timeout: float = 15, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.keepalive_timeout = keepalive_timeout
+
+    async def _create_aiohttp_session(self):
+        # копия AIOHttpConnection._create_aiohttp_session (7.9.1),
+        # отличается только `keepalive_timeout` у TCPConnector
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            auto_decompress=True,
+            loop=self.loop,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            response_class=ESClientResponse,
+            connector=aiohttp.TCPConnector(
+                limit=self._limit,
+                use_dns_cache=True,
+                ssl=self._ssl_context,
+                keepalive_timeout=self.keepalive_timeout,
+            ),
+        )
+
+
+def get_hosts() -> list[str]:
+    """Получить узлы кластера ElasticSearch из настроек.
+
+    Returns:
+        list[str]: узлы `host:port`
+
+    """
+    return elastic_settings.ELASTIC_HOSTS or [
+        f'{elastic_settings.ELASTIC_HOST}:{elastic_settings.ELASTIC_PORT}'
+    ]
+
+
 async def get_elastic() -> AsyncElasticsearch:
     """Получить соединение с ElasticSearch.
 
@@ -33,8 +112,20 @@ async def connect_elastic() -> AsyncElasticsearch:
     """
     global es
     es = AsyncElasticsearch(
-        hosts=[f'{elastic_settings.ELASTIC_HOST}:'
-               f'{elastic_settings.ELASTIC_PORT}']
+        hosts=get_hosts(),
+        connection_class=ElasticConnection,
+        serializer=OrjsonSerializer(),
+        maxsize=elastic_settings.ELASTIC_MAXSIZE,
+        keepalive_timeout=(
+            elastic_settings.ELASTIC_KEEPALIVE_TIMEOUT_IN_SECONDS),
+        http_compress=elastic_settings.ELASTIC_HTTP_COMPRESS,
+        timeout=elastic_settings.ELASTIC_TIMEOUT_IN_SECONDS,
+        max_retries=elastic_settings.ELASTIC_MAX_RETRIES,
+        retry_on_timeout=elastic_settings.ELASTIC_RETRY_ON_TIMEOUT,
+        sniff_on_start=elastic_settings.ELASTIC_SNIFF_ON_START,
+        sniff_on_connection_fail=(
+            elastic_settings.ELASTIC_SNIFF_ON_CONNECTION_FAIL),
+        sniffer_timeout=elastic_settings.ELASTIC_SNIFFER_TIMEOUT_IN_SECONDS,
     )
 
 
@@ -1,13 +1,18 @@
 import logging
+import math
+from http import HTTPStatus
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.responses import ORJSONResponse
 
+from src.api import metrics
 from src.api.v1 import films, genres, persons
 from src.core import config
 from src.core.logger import LOGGING
+from src.core.messages import SERVICE_UNAVAILABLE
 from src.db import redis, elastic
+from src.storages.resilience import CircuitOpenError
 
 app = FastAPI(
     title=config.project_settings.PROJECT_NAME,
@@ -31,12 +36,23 @@ async def shutdown():
     await elastic.close_elastic()
 
 
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    return ORJSONResponse(
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        content={'detail': SERVICE_UNAVAILABLE},
+        headers={'Retry-After': str(math.ceil(exc.retry_after))},
+    )
+
+
 app.include_router(films.router, prefix='/api/v1/films',
                    tags=['Кинопроизведения'])
 app.include_router(genres.router, prefix='/api/v1/genres',
                    tags=['Жанры'])
 app.include_router(persons.router, prefix='/api/v1/persons',
                    tags=['Персоналии'])
+app.include_router(metrics.router, prefix='/api/metrics',
+                   tags=['Метрики'])
 
 if __name__ == '__main__':
     uvicorn.run(
@@ -1,5 +1,8 @@
+from typing import Any
+
 import orjson
 from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON
 
 
 def orjson_dumps(v, *, default):
@@ -13,3 +16,33 @@ class OrjsonMixin(BaseModel):
     class Config:
         json_loads = orjson.loads
         json_dumps = orjson_dumps
+
+    @classmethod
+    def construct_trusted(cls, data: dict[str, Any]) -> 'OrjsonMixin':
+        """Создать модель из доверенных данных без валидации.
+
+        В отличие от `construct`, вложенные модели тоже создаются.
+        Использовать только для данных из собственных хранилищ.
+
+        Args:
+            data: данные модели
+
+        Returns:
+            OrjsonMixin: модель
+
+        """
+        values = {}
+        for name, field in cls.__fields__.items():
+            if field.alias not in data:
+                continue
+            value = data[field.alias]
+            type_ = field.type_
+            if (value is not None
+                    and isinstance(type_, type)
+                    and issubclass(type_, OrjsonMixin)):
+                if field.shape == SHAPE_LIST:
+                    value = [type_.construct_trusted(item) for item in value]
+                elif field.shape == SHAPE_SINGLETON:
+                    value = type_.construct_trusted(value)
+            values[name] = value
+        return cls.construct(_fields_set=set(values), **values)
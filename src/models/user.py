@@ -6,4 +6,4 @@ class User(OrjsonMixin):
 
     username: str
     is_superuser: bool
-    permissions: list[str]
+    permissions: frozenset[str]
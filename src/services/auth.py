@@ -1,3 +1,5 @@
+import hashlib
+import time
 from http import HTTPStatus
 
 from fastapi import Depends
@@ -8,10 +10,14 @@ from jwt.exceptions import InvalidTokenError
 
 from src.core.config import jwt_settings
 from src.core.messages import NO_ACCESS
+from src.core.metrics import metrics
 from src.models.user import User
+from src.storages.memory import LRUCache
 
 auth_scheme = HTTPBearer()
 jwt_public_key = open(jwt_settings.jwt_public_key_path).read()
+verified_tokens = LRUCache(max_entries=jwt_settings.jwt_cache_max_entries)
+"""Пользователи проверенных токенов воркера по хэшу токена."""
 
 
 def raise_no_access():
@@ -44,16 +50,33 @@ def login_required(token: HTTPBearer = Depends(auth_scheme)) -> User:
     """Dependency-функция авторизации пользователя.
     В случае ошибки вызывает HTTPException с кодом 403.
 
+    Подпись токена проверяется один раз, затем пользователь берется
+    из кэша воркера до истечения срока действия токена, но не дольше
+    `jwt_cache_max_ttl`. Кэшируются только успешно проверенные токены.
+
     Returns:
         User: пользователь
 
     """
+    key = hashlib.blake2b(token.credentials.encode(),
+                          digest_size=16).hexdigest()
+    user = verified_tokens.get(key)
+    if user is not None:
+        metrics.inc('jwt_cache_total', result='hit')
+        return user
+
+    metrics.inc('jwt_cache_total', result='miss')
     decoded = decode_jwt(token)
     user = User(
         username=decoded["sub"],
         is_superuser=decoded["is_superuser"],
-        permissions=decoded.get("permissions")
+        permissions=decoded.get("permissions") or []
     )
+    expire = jwt_settings.jwt_cache_max_ttl
+    if "exp" in decoded:
+        expire = min(expire, decoded["exp"] - time.time())
+    if expire > 0:
+        verified_tokens.set(key, user, expire=expire)
     return user
 
 
@@ -1,10 +1,50 @@
+import asyncio
+import time
+import zlib
 from dataclasses import dataclass
-from typing import Any, Optional
+from functools import lru_cache, partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
+import orjson
 from pydantic import BaseModel
 
-from src.api.v1.query_params.base import Page
+from src.api.v1.query_params.base import (Page, PageResult, get_stable_sort,
+                                          normalize_sort)
+from src.core.batch_loader import BatchLoader
+from src.core.config import (elastic_settings, project_settings,
+                             redis_settings)
+from src.core.messages import CURSOR_NOT_SUPPORTED
+from src.core.metrics import metrics
+from src.services.cache_keys import (build_obj_key, build_objects_key,
+                                     keyspace_generation, normalize_query)
+from src.services.single_flight import SingleFlight
 from src.storages.base import CacheStorage, DataStorage
+from src.storages.entry import CacheEntry
+
+cache_fills = SingleFlight(name='cache_fill')
+"""Объединение одновременных заполнений кэша при промахах."""
+background_refreshes: set[asyncio.Task] = set()
+"""Фоновые обновления кэша (ссылки нужны, чтобы задачи не были собраны)."""
+batch_loaders: dict[str, BatchLoader] = {}
+"""Пакетные загрузчики объектов по ID по пространствам имен."""
+
+
+@lru_cache
+def get_schema_version(model: type[BaseModel]) -> int:
+    """Получить версию схемы модели для заголовка записи кэша.
+
+    Версия вычисляется по JSON-схеме модели, поэтому после изменения
+    модели записи со старой схемой перестают читаться.
+
+    Args:
+        model: класс модели
+
+    Returns:
+        int: версия схемы
+
+    """
+    schema = orjson.dumps(model.schema(), option=orjson.OPT_SORT_KEYS)
+    return zlib.crc32(schema)
 
 
 @dataclass
@@ -23,13 +63,50 @@ class BaseService:
     cache_storage: CacheStorage = None
     cache_key_prefix: str = None
 
-    def _get_objects_cache_key(
+    async def _get_obj_cache_key(self,
+                                 obj_id: str,
+                                 fields: list[str] = None) -> str:
+        """Получить ключ для объекта.
+
+        Args:
+            obj_id: ID объекта
+            fields: получаемые поля объекта
+
+        Returns:
+            str: ключ
+
+        """
+        generation = await keyspace_generation.get(self.cache_storage)
+        return build_obj_key(namespace=self.cache_key_prefix,
+                             generation=generation,
+                             obj_id=obj_id,
+                             fields=fields)
+
+    async def _get_obj_cache_keys(self, ids: list[str]) -> list[str]:
+        """Получить ключи для списка объектов по ID.
+
+        Args:
+            ids: список ID объектов
+
+        Returns:
+            list[str]: ключи
+
+        """
+        generation = await keyspace_generation.get(self.cache_storage)
+        return [build_obj_key(namespace=self.cache_key_prefix,
+                              generation=generation,
+                              obj_id=obj_id)
+                for obj_id in ids]
+
+    async def _get_objects_cache_key(
         self,
         method: str,
         page: Page,
         sort: list[str] = None,
         query: str = None,
         filter: BaseModel = None,
+        fields: list[str] = None,
+        ids: list[str] = None,
     ) -> str:
         """Получить ключ для списка объектов.
 
@@ -39,20 +116,74 @@ class BaseService:
             filter: фильтр
             page: пагинация
             sort: сортировка
+            fields: получаемые поля объектов
+            ids: список ID, из которого строится страница
 
         Returns:
             str: ключ
 
         """
-        key = (
-            f'{self.cache_key_prefix}/{method}'
-            f'?query={query}'
-            f'&page[size]={page.size}'
-            f'&page[number]={page.number}'
-            f'&sort={"&sort=".join(sort or [])}'
-            f'&filters={filter and filter.json()}'
-        )
-        return key
+        generation = await keyspace_generation.get(self.cache_storage)
+        return build_objects_key(namespace=self.cache_key_prefix,
+                                 generation=generation,
+                                 method=method,
+                                 page=page,
+                                 sort=sort,
+                                 query=query,
+                                 filter=filter,
+                                 fields=fields,
+                                 ids=ids)
+
+    def _get_source_fields(
+        self,
+        fields: Optional[list[str]]
+    ) -> Optional[list[str]]:
+        """Дополнить получаемые поля обязательными полями модели.
+
+        Без них объект с частью полей не пройдет валидацию.
+
+        Args:
+            fields: получаемые поля или None, если нужны все
+
+        Returns:
+            Optional[list[str]]: поля
+
+        """
+        if fields is None:
+            return None
+        required = [name for name, field in self.model.__fields__.items()
+                    if field.required]
+        return list(dict.fromkeys([*fields, *required]))
+
+    async def _get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Получить запись кэша текущей схемы.
+
+        Args:
+            key: ключ кэша
+
+        Returns:
+            Optional[CacheEntry]: запись
+
+        """
+        entry = await self.cache_storage.get_entry(key)
+        if entry and entry.schema != get_schema_version(self.model):
+            return None
+        return entry
+
+    async def _get_entries(self,
+                           keys: list[str]) -> list[Optional[CacheEntry]]:
+        """Получить записи кэша текущей схемы по списку ключей.
+
+        Args:
+            keys: ключи кэша
+
+        Returns:
+            list[Optional[CacheEntry]]: записи в порядке ключей
+
+        """
+        schema = get_schema_version(self.model)
+        return [entry if entry and entry.schema == schema else None
+                for entry in await self.cache_storage.get_entries(keys)]
 
     def _transform_objects_from_data(self, objects: list) -> list[model]:
         """Трансформировать входящие объекты.
@@ -66,7 +197,7 @@ class BaseService:
         """
         if not objects:
             return []
-        return [self.model(**obj) for obj in objects]
+        return [self._parse(obj, trusted=True) for obj in objects]
 
     def _transform_obj_from_data(self, obj: Optional[Any]) -> Optional[model]:
         """Трансформировать входящий объект.
@@ -80,7 +211,42 @@ class BaseService:
         """
         if not obj:
             return None
-        return self.model(**obj)
+        return self._parse(obj, trusted=True)
+
+    def _parse(self, data: dict, trusted: bool) -> model:
+        """Создать объект из данных собственного хранилища.
+
+        Данные доверенного источника не валидируются, если не включен
+        `STRICT_VALIDATION`.
+
+        Args:
+            data: данные объекта
+            trusted: источник данных доверенный
+
+        Returns:
+            model: объект класса model
+
+        """
+        if (trusted
+                and not project_settings.STRICT_VALIDATION
+                and hasattr(self.model, 'construct_trusted')):
+            return self.model.construct_trusted(data)
+        return self.model.parse_obj(data)
+
+    def _parse_cached(self, data: dict) -> model:
+        """Создать объект из данных кэша.
+
+        В кэш попадают только объекты из собственного хранилища,
+        поэтому при `CACHE_TRUSTED` валидация пропускается.
+
+        Args:
+            data: данные объекта
+
+        Returns:
+            model: объект класса model
+
+        """
+        return self._parse(data, trusted=redis_settings.CACHE_TRUSTED)
 
     def _transform_objects_from_cache(self,
                                       objects: Optional[Any]) -> list[model]:
@@ -95,9 +261,7 @@ class BaseService:
         """
         if not objects:
             return []
-        json_loads = self.model.Config.json_loads
-        objects = json_loads(objects)
-        return [self.model.parse_obj(obj) for obj in objects]
+        return [self._parse_cached(obj) for obj in orjson.loads(objects)]
 
     def _transform_obj_from_cache(self, obj: Optional[Any]) -> Optional[model]:
         """Трансформировать объект из кэша.
@@ -111,32 +275,284 @@ class BaseService:
         """
         if not obj:
             return None
-        return self.model.parse_raw(obj)
+        return self._parse_cached(orjson.loads(obj))
 
-    def _transform_objects_to_cache(self, objects: list[model]) -> str:
+    def _transform_objects_to_cache(self, objects: list[model]) -> bytes:
         """Трансформировать объекты в кэш.
 
         Args:
             objects: объекты
 
         Returns:
-            str: json
+            bytes: json
 
         """
-        json_dumps = self.model.Config.json_dumps
-        return json_dumps([obj.dict() for obj in objects], default=str)
+        return orjson.dumps([obj.dict(exclude_unset=True) for obj in objects],
+                            default=str)
 
-    def _transform_obj_to_cache(self, obj: model) -> str:
+    def _transform_obj_to_cache(self, obj: model) -> bytes:
         """Трансформировать объект в кэш.
 
         Args:
             obj: объект
 
         Returns:
-            str: json
+            bytes: json
+
+        """
+        return orjson.dumps(obj.dict(exclude_unset=True), default=str)
+
+    def _transform_page_from_cache(self, page: Optional[Any]) -> PageResult:
+        """Трансформировать страницу объектов из кэша.
+
+        Args:
+            page: страница
+
+        Returns:
+            PageResult: объекты класса model и значения сортировки
+
+        """
+        if not page:
+            return PageResult(items=[])
+        data = orjson.loads(page)
+        return PageResult(items=[self._parse_cached(obj)
+                                 for obj in data['items']],
+                          after=data['after'])
+
+    def _transform_page_to_cache(self, page: PageResult) -> bytes:
+        """Трансформировать страницу объектов в кэш.
+
+        Args:
+            page: страница
+
+        Returns:
+            bytes: json
+
+        """
+        return orjson.dumps({
+            'items': [obj.dict(exclude_unset=True) for obj in page.items],
+            'after': page.after
+        }, default=str)
+
+    def _transform_ids_from_cache(self, ids: Optional[Any]) -> PageResult:
+        """Трансформировать страницу ID из кэша.
+
+        Args:
+            ids: страница ID
+
+        Returns:
+            PageResult: список ID и значения сортировки
+
+        """
+        if not ids:
+            return PageResult(items=[])
+        return PageResult(**orjson.loads(ids))
+
+    def _transform_ids_to_cache(self, ids: PageResult) -> bytes:
+        """Трансформировать страницу ID в кэш.
+
+        Args:
+            ids: страница ID
+
+        Returns:
+            bytes: json
+
+        """
+        return orjson.dumps({'items': ids.items, 'after': ids.after})
+
+    def _refresh_in_background(self, key: str, fill: Callable[[], Any]):
+        """Обновить запись кэша в фоне.
+
+        Args:
+            key: ключ кэша
+            fill: функция заполнения кэша
+
+        """
+        task = asyncio.ensure_future(cache_fills.do(key, fill))
+        background_refreshes.add(task)
+        task.add_done_callback(background_refreshes.discard)
+
+    def _transform_entry(self,
+                         entry: CacheEntry,
+                         transform: Callable[[Any], Any]) -> Any:
+        """Трансформировать запись кэша.
+
+        Args:
+            entry: запись кэша
+            transform: функция трансформации данных из кэша
+
+        Returns:
+            Any: данные (пустые для записи об отсутствии данных)
+
+        """
+        if entry.negative:
+            metrics.inc('cache_negative_hits_total',
+                        namespace=self.cache_key_prefix)
+            return transform(None)
+        return transform(entry.value)
+
+    async def _wait_for_cache(self, key: str) -> Optional[CacheEntry]:
+        """Дождаться заполнения кэша другим инстансом.
+
+        Args:
+            key: ключ кэша
+
+        Returns:
+            Optional[CacheEntry]: запись или None, если кэш не заполнен
+                                  за отведенное время
+
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + redis_settings.CACHE_FILL_LOCK_WAIT_IN_SECONDS
+        while loop.time() < deadline:
+            await asyncio.sleep(redis_settings.CACHE_FILL_LOCK_POLL_IN_SECONDS)
+            entry = await self._get_entry(key)
+            if entry and not entry.is_expired():
+                return entry
+        return None
+
+    def _create_entry(self, value: bytes, delta: float = 0) -> CacheEntry:
+        """Создать запись кэша со сроками жизни из настроек.
+
+        Args:
+            value: данные
+            delta: время получения данных в секундах
+
+        Returns:
+            CacheEntry: запись кэша
+
+        """
+        return CacheEntry.create(
+            value,
+            soft_expire=redis_settings.CACHE_SOFT_EXPIRE_IN_SECONDS,
+            expire=redis_settings.CACHE_EXPIRE_IN_SECONDS,
+            delta=delta,
+            schema=get_schema_version(self.model)
+        )
+
+    def _get_entry_expire(self) -> int:
+        """Получить время хранения записи кэша с учетом хранения
+        недействительных записей.
+
+        Returns:
+            int: время хранения в секундах
+
+        """
+        return (redis_settings.CACHE_EXPIRE_IN_SECONDS
+                + redis_settings.CACHE_STALE_GRACE_IN_SECONDS)
+
+    async def _load(self,
+                    key: str,
+                    load: Callable[[], Awaitable[Any]],
+                    dump: Callable[[Any], Any]) -> Any:
+        """Получить данные из хранилища данных и записать в кэш.
+
+        Отсутствие данных тоже кэшируется, но на меньшее время.
+
+        Args:
+            key: ключ кэша
+            load: функция получения данных
+            dump: функция трансформации данных в кэш
+
+        Returns:
+            Any: данные
+
+        """
+        started = time.monotonic()
+        value = await load()
+        if not value:
+            expire = redis_settings.NEGATIVE_CACHE_EXPIRE_IN_SECONDS
+            entry = CacheEntry.create_negative(
+                expire=expire, schema=get_schema_version(self.model))
+            await self.cache_storage.put_entry(key, entry, expire=expire)
+            return value
+
+        entry = self._create_entry(dump(value),
+                                   delta=time.monotonic() - started)
+        await self.cache_storage.put_entry(key, entry,
+                                           expire=self._get_entry_expire())
+        return value
+
+    async def _fill(self,
+                    key: str,
+                    load: Callable[[], Awaitable[Any]],
+                    dump: Callable[[Any], Any],
+                    transform: Callable[[Any], Any],
+                    stale: Optional[CacheEntry] = None) -> Any:
+        """Заполнить кэш, при необходимости под распределенной блокировкой.
+
+        Данные из хранилища получает только владелец блокировки. Остальные
+        сразу получают устаревшую запись, а если ее нет - ждут появления
+        данных в кэше. Если кэш не заполнен за отведенное время, данные
+        получаются из хранилища без блокировки.
+
+        Args:
+            key: ключ кэша
+            load: функция получения данных
+            dump: функция трансформации данных в кэш
+            transform: функция трансформации данных из кэша
+            stale: устаревшая запись кэша
+
+        Returns:
+            Any: данные
+
+        """
+        if not redis_settings.CACHE_FILL_LOCK_ENABLED:
+            return await self._load(key, load, dump)
+
+        lock_key = f'{key}#lock'
+        token = await self.cache_storage.acquire_lock(
+            lock_key, expire=redis_settings.CACHE_FILL_LOCK_LEASE_IN_SECONDS)
+        if token is None:
+            if stale and not stale.negative:
+                metrics.inc('cache_fill_lock_waits_total', result='stale')
+                return transform(stale.value)
+            entry = await self._wait_for_cache(key)
+            if entry:
+                metrics.inc('cache_fill_lock_waits_total', result='hit')
+                return self._transform_entry(entry, transform)
+            metrics.inc('cache_fill_lock_waits_total', result='timeout')
+            return await self._load(key, load, dump)
+
+        try:
+            return await self._load(key, load, dump)
+        finally:
+            await self.cache_storage.release_lock(lock_key, token)
+
+    async def _get_cached(self,
+                          key: str,
+                          load: Callable[[], Awaitable[Any]],
+                          dump: Callable[[Any], Any],
+                          transform: Callable[[Any], Any]) -> Any:
+        """Получить данные из кэша, а при промахе - из хранилища данных.
+
+        Устаревшая, но еще действительная запись отдается сразу и
+        обновляется в фоне. Одновременные промахи по одному ключу
+        объединяются в одно заполнение кэша.
+
+        Args:
+            key: ключ кэша
+            load: функция получения данных
+            dump: функция трансформации данных в кэш
+            transform: функция трансформации данных из кэша
+
+        Returns:
+            Any: данные
 
         """
-        return obj.json()
+        entry = await self._get_entry(key)
+        fill = partial(self._fill, key=key, load=load, dump=dump,
+                       transform=transform, stale=entry)
+
+        if entry and not entry.is_expired():
+            if not entry.negative and entry.should_refresh(
+                    redis_settings.CACHE_XFETCH_BETA):
+                metrics.inc('cache_refreshes_total',
+                            namespace=self.cache_key_prefix)
+                self._refresh_in_background(key, fill)
+            return self._transform_entry(entry, transform)
+
+        return await cache_fills.do(key, fill)
 
     async def _get_objects(
         self,
@@ -144,102 +560,394 @@ class BaseService:
         page: Page,
         query: str = None,
         sort: list[str] = None,
-        filter: BaseModel = None
-    ) -> list[model]:
+        filter: BaseModel = None,
+        fields: list[str] = None
+    ) -> PageResult:
         """Получить список объектов с учетом поиска и фильтрации.
 
+        В режиме `CACHE_LIST_IDS_ONLY` объекты берутся из кэша объектов
+        целиком, поэтому `fields` не используются. Значения сортировки
+        последнего объекта кэшируются вместе со страницей.
+
         Args:
             method: название метода для ключа кэша
             query: поисковый запрос
             page: пагинация
             sort: сортировка
             filter: фильтрация
+            fields: получаемые поля объектов (по умолчанию - все)
 
         Returns:
-            list[model]: список объектов
+            PageResult: объекты и значения сортировки последнего из них
 
         """
-        key = self._get_objects_cache_key(method=method,
-                                          query=query,
-                                          page=page,
-                                          sort=sort,
-                                          filter=filter)
+        query = normalize_query(query)
+        # в ключ попадает та же сортировка, что и в запрос к хранилищу:
+        # `title` и `title,id` - один запрос
+        sort = get_stable_sort(normalize_sort(sort), query)
+        fields = self._get_source_fields(fields)
+        if redis_settings.CACHE_LIST_IDS_ONLY:
+            key = await self._get_objects_cache_key(method=method,
+                                                    query=query,
+                                                    page=page,
+                                                    sort=sort,
+                                                    filter=filter)
+            load = partial(self._load_object_ids, query=query,
+                           page=page, sort=sort, filter=filter)
+            ids = await self._get_cached(
+                f'{key}#ids', load=load,
+                dump=self._transform_ids_to_cache,
+                transform=self._transform_ids_from_cache
+            )
+            return PageResult(items=await self._hydrate(ids.items),
+                              after=ids.after)
+
+        key = await self._get_objects_cache_key(method=method,
+                                                query=query,
+                                                page=page,
+                                                sort=sort,
+                                                filter=filter,
+                                                fields=fields)
+        load = partial(self._load_objects, query=query, page=page,
+                       sort=sort, filter=filter, fields=fields)
+        return await self._get_cached(
+            key, load=load,
+            dump=self._transform_page_to_cache,
+            transform=self._transform_page_from_cache
+        )
 
-        objects = await self.cache_storage.get(key)
-        objects = self._transform_objects_from_cache(objects)
+    async def _load_objects(
+        self,
+        page: Page,
+        query: str = None,
+        sort: list[str] = None,
+        filter: BaseModel = None,
+        fields: list[str] = None
+    ) -> PageResult:
+        """Получить список объектов из хранилища данных.
 
-        if not objects:
-            objects = await self.data_storage.get_objects(
-                query=query,
-                page=page,
-                sort=sort,
-                filter=filter
-            )
-            objects = self._transform_objects_from_data(objects)
-            if not objects:
-                return []
+        Args:
+            query: поисковый запрос
+            page: пагинация
+            sort: сортировка
+            filter: фильтрация
+            fields: получаемые поля объектов
+
+        Returns:
+            PageResult: объекты и значения сортировки последнего из них
+
+        """
+        objects = await self.data_storage.get_objects(
+            query=query,
+            page=page,
+            sort=sort,
+            filter=filter,
+            fields=fields
+        )
+        return PageResult(
+            items=self._transform_objects_from_data(objects.items),
+            after=objects.after
+        )
+
+    async def _load_object_ids(
+        self,
+        page: Page,
+        query: str = None,
+        sort: list[str] = None,
+        filter: BaseModel = None
+    ) -> PageResult:
+        """Получить список ID объектов из хранилища данных.
+
+        Args:
+            query: поисковый запрос
+            page: пагинация
+            sort: сортировка
+            filter: фильтрация
 
-            cache = self._transform_objects_to_cache(objects)
-            await self.cache_storage.put(key, cache)
+        Returns:
+            PageResult: ID объектов и значения сортировки последнего из них
+
+        """
+        return await self.data_storage.get_object_ids(
+            query=query,
+            page=page,
+            sort=sort,
+            filter=filter
+        )
 
-        return objects
+    async def _hydrate(self, ids: list[str]) -> list[model]:
+        """Получить объекты по списку ID.
+
+        Объекты читаются из кэша одним MGET, из хранилища данных
+        одним запросом получаются только отсутствующие в кэше.
+        Отсутствие объектов в хранилище тоже кэшируется.
+
+        Args:
+            ids: список ID объектов
+
+        Returns:
+            list[model]: объекты в порядке ID (ненайденные пропускаются)
+
+        """
+        if not ids:
+            return []
+
+        keys = await self._get_obj_cache_keys(ids)
+        entries = await self._get_entries(keys)
+
+        objects = {}
+        missing = {}
+        for obj_id, key, entry in zip(ids, keys, entries):
+            if entry and not entry.is_expired():
+                if not entry.negative:
+                    objects[obj_id] = self._transform_obj_from_cache(
+                        entry.value
+                    )
+                    if entry.should_refresh(redis_settings.CACHE_XFETCH_BETA):
+                        metrics.inc('cache_refreshes_total',
+                                    namespace=self.cache_key_prefix)
+                        self._refresh_in_background(key, partial(
+                            self._fill, key=key,
+                            load=partial(self._load_obj, obj_id=obj_id),
+                            dump=self._transform_obj_to_cache,
+                            transform=self._transform_obj_from_cache,
+                            stale=entry
+                        ))
+            else:
+                missing[obj_id] = key
+
+        if missing:
+            metrics.inc('cache_hydrate_misses_total', len(missing),
+                        namespace=self.cache_key_prefix)
+            started = time.monotonic()
+            loaded = await self.data_storage.get_objs(list(missing))
+            delta = time.monotonic() - started
+
+            cache = {}
+            for obj in self._transform_objects_from_data(
+                    [obj for obj in loaded if obj]):
+                objects[obj.id] = obj
+                cache[missing[obj.id]] = self._create_entry(
+                    self._transform_obj_to_cache(obj), delta=delta)
+            await self.cache_storage.put_entries(
+                cache, expire=self._get_entry_expire())
+
+            expire = redis_settings.NEGATIVE_CACHE_EXPIRE_IN_SECONDS
+            negative = CacheEntry.create_negative(
+                expire=expire, schema=get_schema_version(self.model))
+            await self.cache_storage.put_entries(
+                {key: negative for obj_id, key in missing.items()
+                 if obj_id not in objects},
+                expire=expire
+            )
+
+        return [objects[obj_id] for obj_id in ids if obj_id in objects]
 
     async def search(self,
                      query: str,
                      page: Page,
-                     sort: list[str] = None) -> list[model]:
+                     sort: list[str] = None,
+                     fields: list[str] = None) -> PageResult:
         """Найти объекты.
 
         Args:
             query: поисковый запрос
             page: пагинация
             sort: сортировка
+            fields: получаемые поля объектов (по умолчанию - все)
 
         Returns:
-            list[model]: список объектов
+            PageResult: объекты и значения сортировки последнего из них
 
         """
-        return await self._get_objects(method='search',
-                                       page=page, query=query, sort=sort)
+        return await self._get_objects(method='search', page=page,
+                                       query=query, sort=sort, fields=fields)
 
     async def get(self,
                   page: Page,
                   sort: list[str] = None,
-                  filter: BaseModel = None) -> list[model]:
+                  filter: BaseModel = None,
+                  fields: list[str] = None) -> PageResult:
         """Получить список объектов.
 
         Args:
             page: пагинация
             sort: сортировка
             filter: фильтрация
+            fields: получаемые поля объектов (по умолчанию - все)
+
+        Returns:
+            PageResult: объекты и значения сортировки последнего из них
+
+        """
+        return await self._get_objects(method='get', page=page, sort=sort,
+                                       filter=filter, fields=fields)
+
+    async def export(
+        self,
+        filter: BaseModel = None,
+        fields: list[str] = None
+    ) -> AsyncIterator[list[model]]:
+        """Выгрузить все объекты страницами в обход кэша.
+
+        Args:
+            filter: фильтрация
+            fields: получаемые поля объектов (по умолчанию - все)
+
+        Returns:
+            AsyncIterator[list[model]]: страницы объектов
+
+        """
+        objects = self.data_storage.scan(
+            filter=filter, fields=self._get_source_fields(fields))
+        async for page in objects:
+            yield self._transform_objects_from_data(page)
+
+    async def get_page_by_ids(self,
+                              method: str,
+                              ids: list[str],
+                              page: Page,
+                              fields: list[str] = None) -> list[model]:
+        """Получить страницу объектов из списка ID.
+
+        Объекты страницы получаются одним MGET в кэш и одним запросом
+        отсутствующих в хранилище данных, собранная страница кэшируется
+        целиком. Страницы нарезаются из отсортированного списка ID,
+        поэтому один набор ID дает одни страницы и один ключ кэша,
+        а изменение списка - другой ключ.
+
+        Args:
+            method: название метода для ключа кэша
+            ids: список ID объектов (повторы пропускаются)
+            page: пагинация по номеру страницы (без курсора)
+            fields: поля объектов страницы (по умолчанию - все)
 
         Returns:
-            list[model]: список объектов
+            list[model]: объекты страницы (ненайденные пропускаются)
+
+        Raises:
+            ValueError: передан курсор
 
         """
-        return await self._get_objects(method='get',
-                                       page=page, sort=sort, filter=filter)
+        if page.cursor is not None:
+            raise ValueError(CURSOR_NOT_SUPPORTED)
+        fields = self._get_source_fields(fields)
+        ids = sorted(set(ids))
+        key = await self._get_objects_cache_key(method=method, page=page,
+                                                fields=fields, ids=ids)
+        start = (page.number - 1) * page.size
+        load = partial(self._load_page_by_ids,
+                       ids=ids[start:start + page.size], fields=fields)
+        return await self._get_cached(
+            key, load=load,
+            dump=self._transform_objects_to_cache,
+            transform=self._transform_objects_from_cache
+        )
+
+    async def _load_page_by_ids(self,
+                                ids: list[str],
+                                fields: list[str] = None) -> list[model]:
+        """Собрать страницу объектов по списку ID.
+
+        Args:
+            ids: список ID объектов страницы
+            fields: поля объектов страницы (по умолчанию - все)
+
+        Returns:
+            list[model]: объекты страницы
 
-    async def get_by_id(self, obj_id: str) -> Optional[model]:
+        """
+        objects = await self._hydrate(ids)
+        if fields is None:
+            return objects
+        return [self._parse(obj.dict(include=set(fields)), trusted=True)
+                for obj in objects]
+
+    async def get_by_ids(self, ids: list[str]) -> list[model]:
+        """Получить объекты по списку ID.
+
+        Объекты читаются из кэша одним MGET, отсутствующие в кэше
+        получаются из хранилища данных одним запросом.
+
+        Args:
+            ids: список ID объектов
+
+        Returns:
+            list[model]: объекты в порядке ID (ненайденные пропускаются)
+
+        """
+        return await self._hydrate(list(dict.fromkeys(ids)))
+
+    def _get_batch_loader(self) -> BatchLoader:
+        """Получить пакетный загрузчик объектов по ID воркера.
+
+        Returns:
+            BatchLoader: загрузчик
+
+        """
+        loader = batch_loaders.get(self.cache_key_prefix)
+        if loader is None:
+            loader = BatchLoader(
+                name=self.cache_key_prefix,
+                window=elastic_settings.ELASTIC_BATCH_LOAD_WINDOW_IN_MS / 1000,
+                max_size=elastic_settings.ELASTIC_BATCH_LOAD_MAX_SIZE
+            )
+            batch_loaders[self.cache_key_prefix] = loader
+        return loader
+
+    async def _load_batch(self, ids: list[str]) -> dict[str, model]:
+        """Получить пакет объектов по ID.
+
+        Args:
+            ids: список ID объектов
+
+        Returns:
+            dict[str, model]: найденные объекты по ID
+
+        """
+        return {obj.id: obj for obj in await self._hydrate(ids)}
+
+    async def get_by_id(self,
+                        obj_id: str,
+                        fields: list[str] = None) -> Optional[model]:
         """Получить объект по ID.
 
+        При `ELASTIC_BATCH_LOAD_ENABLED` одновременные запросы объектов
+        целиком объединяются в пакеты: один MGET в кэш и один запрос
+        отсутствующих объектов в хранилище данных на пакет.
+
         Args:
             obj_id: ID объекта
+            fields: получаемые поля объекта (по умолчанию - все)
 
         Returns:
             Optional[model]: объект
 
         """
-        obj = await self.cache_storage.get(obj_id)
-        obj = self._transform_obj_from_cache(obj)
+        if fields is None and elastic_settings.ELASTIC_BATCH_LOAD_ENABLED:
+            return await self._get_batch_loader().load(obj_id,
+                                                       self._load_batch)
+
+        fields = self._get_source_fields(fields)
+        return await self._get_cached(
+            await self._get_obj_cache_key(obj_id, fields),
+            load=partial(self._load_obj, obj_id=obj_id, fields=fields),
+            dump=self._transform_obj_to_cache,
+            transform=self._transform_obj_from_cache
+        )
 
-        if not obj:
-            obj = await self.data_storage.get_obj(obj_id)
-            obj = self._transform_obj_from_data(obj)
-            if not obj:
-                return None
+    async def _load_obj(self,
+                        obj_id: str,
+                        fields: list[str] = None) -> Optional[model]:
+        """Получить объект из хранилища данных.
 
-            cache = self._transform_obj_to_cache(obj)
-            await self.cache_storage.put(obj.id, cache)
+        Args:
+            obj_id: ID объекта
+            fields: получаемые поля объекта
 
-        return obj
+        Returns:
+            Optional[model]: объект
+
+        """
+        obj = await self.data_storage.get_obj(obj_id, fields=fields)
+        return self._transform_obj_from_data(obj)
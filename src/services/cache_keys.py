@@ -0,0 +1,232 @@
+import hashlib
+import time
+from enum import Enum
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+import orjson
+from pydantic import BaseModel
+
+from src.api.v1.query_params.base import Page
+from src.core.config import redis_settings
+from src.storages.base import CacheStorage
+
+
+def normalize_query(query: Optional[str]) -> Optional[str]:
+    """Нормализовать поисковый запрос: регистр и пробельные символы.
+
+    Args:
+        query: поисковый запрос
+
+    Returns:
+        Optional[str]: нормализованный запрос
+
+    """
+    if query is None:
+        return None
+    return ' '.join(query.split()).lower()
+
+
+def _normalize_value(value: Any) -> str:
+    """Привести значение фильтра к строке.
+
+    Args:
+        value: значение
+
+    Returns:
+        str: значение
+
+    """
+    if isinstance(value, Enum):
+        value = value.value
+    return str(value).lower()
+
+
+def _get_filter_params(filter: Optional[BaseModel]) -> list[tuple[str, str]]:
+    """Получить параметры фильтра без пустых значений и значений
+    по умолчанию.
+
+    Args:
+        filter: фильтр
+
+    Returns:
+        list[tuple[str, str]]: пары (имя параметра, значение)
+
+    """
+    if filter is None:
+        return []
+    data = filter.dict(exclude_defaults=True, exclude_none=True)
+    return [(f'filter[{name}]', _normalize_value(value))
+            for name, value in sorted(data.items())]
+
+
+class KeyspaceGeneration:
+    """Поколение пространства ключей кэша.
+
+    Поколение входит в каждый ключ, поэтому его увеличение
+    (`INCR <CACHE_KEY_PREFIX>:generation`, например после переиндексации)
+    за O(1) делает недействительным весь кэш. Значение запоминается
+    в воркере на `CACHE_GENERATION_REFRESH_IN_SECONDS`.
+
+    Args:
+        key: ключ, в котором хранится поколение
+        refresh: как часто перечитывать поколение в секундах
+
+    """
+    def __init__(self, key: str, refresh: float) -> None:
+        self.key = key
+        self.refresh = refresh
+        self.value = 0
+        self._fetched_at: Optional[float] = None
+
+    async def get(self, cache_storage: CacheStorage) -> int:
+        """Получить текущее поколение.
+
+        Args:
+            cache_storage: хранилище кэша
+
+        Returns:
+            int: поколение
+
+        """
+        now = time.monotonic()
+        if self._fetched_at is None or now - self._fetched_at >= self.refresh:
+            value = await cache_storage.get(self.key)
+            self.value = int(value) if value else 0
+            self._fetched_at = now
+        return self.value
+
+
+keyspace_generation = KeyspaceGeneration(
+    key=f'{redis_settings.CACHE_KEY_PREFIX}:generation',
+    refresh=redis_settings.CACHE_GENERATION_REFRESH_IN_SECONDS
+)
+"""Поколение пространства ключей кэша."""
+
+
+def _get_keyspace(namespace: str, generation: int) -> str:
+    """Получить префикс ключей пространства имен.
+
+    Args:
+        namespace: пространство имен (movies, genres, persons)
+        generation: поколение пространства ключей
+
+    Returns:
+        str: префикс, например `cache:v1:g0:movies`
+
+    """
+    return (f'{redis_settings.CACHE_KEY_PREFIX}'
+            f':v{redis_settings.CACHE_KEYSPACE_VERSION}'
+            f':g{generation}'
+            f':{namespace}')
+
+
+def build_obj_key(namespace: str,
+                  generation: int,
+                  obj_id: str,
+                  fields: list[str] = None) -> str:
+    """Получить ключ для объекта.
+
+    Args:
+        namespace: пространство имен (movies, genres, persons)
+        generation: поколение пространства ключей
+        obj_id: ID объекта
+        fields: получаемые поля объекта (по умолчанию - все)
+
+    Returns:
+        str: ключ, например `cache:v1:g0:movies:id:<obj_id>`
+
+    """
+    key = f'{_get_keyspace(namespace, generation)}:id:{obj_id}'
+    if fields:
+        key = f'{key}?fields={",".join(sorted(set(fields)))}'
+    return key
+
+
+def build_objects_key(
+    namespace: str,
+    generation: int,
+    method: str,
+    page: Page,
+    sort: list[str] = None,
+    query: str = None,
+    filter: BaseModel = None,
+    fields: list[str] = None,
+    ids: list[str] = None,
+) -> str:
+    """Получить ключ для списка объектов.
+
+    Параметры ожидаются уже нормализованными (`normalize_query`,
+    `normalize_sort`, `get_stable_sort`), фильтр нормализуется здесь.
+
+    Ключ строится по параметрам, а не по телу запроса к ES: сервисы
+    не зависят от языка запросов хранилища, а ключ нужен до обращения
+    к нему. Тело запроса (`ElasticStorage.compile_query`) собирается
+    детерминированно из тех же нормализованных параметров, поэтому
+    одинаковым ключам соответствует одинаковое тело.
+
+    Args:
+        namespace: пространство имен (movies, genres, persons)
+        generation: поколение пространства ключей
+        method: имя метода
+        page: пагинация
+        sort: сортировка
+        query: поисковый запрос
+        filter: фильтр
+        fields: получаемые поля объектов
+        ids: список ID, из которого строится страница (в ключ входит
+             хэш отсортированного списка)
+
+    Returns:
+        str: ключ, например
+             `cache:v1:g0:movies:get?page[number]=1&page[size]=10&sort=title`
+
+    """
+    params = [('page[number]', page.number), ('page[size]', page.size)]
+    if page.cursor is not None:
+        # point-in-time не влияет на ключ: страница после тех же значений
+        # сортировки одинакова для всех клиентов
+        params.append(('page[after]', orjson.dumps(page.cursor.after)))
+    if query is not None:
+        params.append(('query', query))
+    params.extend(('sort', item) for item in sort or [])
+    params.extend(_get_filter_params(filter))
+    if fields:
+        params.append(('fields', ','.join(sorted(set(fields)))))
+    if ids is not None:
+        digest = hashlib.blake2b(','.join(sorted(set(ids))).encode(),
+                                 digest_size=16)
+        params.append(('ids', digest.hexdigest()))
+    keyspace = _get_keyspace(namespace, generation)
+    return f'{keyspace}:{method}?{urlencode(params, safe="[]")}'
+
+
+def build_response_key(
+    generation: int,
+    path: str,
+    params: list[tuple[str, str]],
+    scope: str = None,
+) -> str:
+    """Получить ключ для HTTP-ответа.
+
+    Параметры запроса упорядочиваются по имени, порядок повторяющихся
+    параметров (например, `sort`) сохраняется.
+
+    Args:
+        generation: поколение пространства ключей
+        path: путь запроса
+        params: параметры запроса
+        scope: область видимости ответа (например, требуемое право)
+
+    Returns:
+        str: ключ, например
+             `cache:v2:g0:responses:/api/v1/films?page[size]=5`
+
+    """
+    path = path.rstrip('/') or '/'
+    params = sorted(params, key=lambda item: item[0])
+    key = (f'{_get_keyspace("responses", generation)}'
+           f':{path}?{urlencode(params, safe="[]")}')
+    if scope:
+        key = f'{key}#{scope}'
+    return key
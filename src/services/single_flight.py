@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from src.core.metrics import metrics
+
+
+class SingleFlight:
+    """Объединение одновременных вызовов с одинаковым ключом.
+
+    Пока вызов по ключу выполняется, остальные вызовы с тем же ключом
+    не запускаются повторно, а дожидаются его результата.
+
+    Args:
+        name: название для метрик
+
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: dict[str, asyncio.Task] = {}
+
+    def _forget(self, key: str, task: asyncio.Task):
+        """Удалить завершенный вызов.
+
+        Args:
+            key: ключ
+            task: задача вызова
+
+        """
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Выполнить вызов или присоединиться к уже выполняющемуся.
+
+        Вызов выполняется в отдельной задаче, поэтому отмена одного
+        из ожидающих не прерывает его для остальных.
+
+        Args:
+            key: ключ
+            func: функция вызова
+
+        Returns:
+            Any: результат вызова
+
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            metrics.inc('singleflight_calls_total', name=self.name)
+        else:
+            metrics.inc('singleflight_coalesced_total', name=self.name)
+        return await asyncio.shield(task)
@@ -1,34 +1,52 @@
 from abc import abstractmethod, ABC
-from typing import Optional, Any
+from typing import AsyncIterator, Optional, Any
 
 from pydantic import BaseModel
 
-from src.api.v1.query_params.base import Page
+from src.api.v1.query_params.base import Page, PageResult
+from src.storages.entry import CacheEntry
 
 
 class DataStorage(ABC):
     """Абстрактный класс хранилища данных."""
 
     @abstractmethod
-    async def get_obj(self, id: str) -> Optional[Any]:
+    async def get_obj(self,
+                      id: str,
+                      fields: list[str] = None) -> Optional[Any]:
         """Получить объект по ID.
 
         Args:
             id: ID объекта
+            fields: получаемые поля объекта (по умолчанию - все)
 
         Returns:
             Optional[Any]: объект
         """
         pass
 
+    @abstractmethod
+    async def get_objs(self, ids: list[str]) -> list[Optional[Any]]:
+        """Получить объекты по списку ID.
+
+        Args:
+            ids: список ID объектов
+
+        Returns:
+            list[Optional[Any]]: объекты в порядке ID (None - не найден)
+
+        """
+        pass
+
     @abstractmethod
     async def get_objects(
         self,
         page: Page,
         sort: list[str] = None,
         query: str = None,
-        filter: BaseModel = None
-    ) -> list[Any]:
+        filter: BaseModel = None,
+        fields: list[str] = None
+    ) -> PageResult:
         """Получить объекты.
 
         Args:
@@ -36,9 +54,50 @@ class DataStorage(ABC):
             sort: сортировка
             query: поисковый запрос
             filter: фильтрация
+            fields: получаемые поля объектов (по умолчанию - все)
 
         Returns:
-            list[Any]: список объектов
+            PageResult: объекты и значения сортировки последнего из них
+
+        """
+        pass
+
+    @abstractmethod
+    async def get_object_ids(
+        self,
+        page: Page,
+        sort: list[str] = None,
+        query: str = None,
+        filter: BaseModel = None
+    ) -> PageResult:
+        """Получить ID объектов без самих объектов.
+
+        Args:
+            page: пагинация
+            sort: сортировка
+            query: поисковый запрос
+            filter: фильтрация
+
+        Returns:
+            PageResult: ID объектов и значения сортировки последнего из них
+
+        """
+        pass
+
+    @abstractmethod
+    def scan(
+        self,
+        filter: BaseModel = None,
+        fields: list[str] = None
+    ) -> AsyncIterator[list[Any]]:
+        """Выгрузить все объекты страницами.
+
+        Args:
+            filter: фильтрация
+            fields: получаемые поля объектов (по умолчанию - все)
+
+        Returns:
+            AsyncIterator[list[Any]]: страницы объектов
 
         """
         pass
@@ -59,12 +118,112 @@ class CacheStorage(ABC):
         """
         pass
 
+    async def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        """Получить данные по списку ключей из кэша.
+
+        Args:
+            keys: ключи
+
+        Returns:
+            list[Optional[Any]]: данные в порядке ключей
+
+        """
+        return [await self.get(key) for key in keys]
+
     @abstractmethod
-    async def put(self, key: str, value: Any):
+    async def put(self, key: str, value: Any, expire: float = None):
         """Записать данные в кэш.
 
         Args:
             key: ключ
             value: данные
+            expire: время жизни в секундах (по умолчанию - из настроек)
+        """
+        pass
+
+    async def put_many(self, values: dict[str, Any], expire: float = None):
+        """Записать данные по нескольким ключам в кэш.
+
+        Args:
+            values: данные по ключам
+            expire: время жизни в секундах (по умолчанию - из настроек)
+
+        """
+        for key, value in values.items():
+            await self.put(key, value, expire=expire)
+
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Получить запись с логическим сроком жизни по ключу из кэша.
+
+        Args:
+            key: ключ
+
+        Returns:
+            Optional[CacheEntry]: запись
+
+        """
+        return CacheEntry.unpack(await self.get(key))
+
+    async def get_entries(self,
+                          keys: list[str]) -> list[Optional[CacheEntry]]:
+        """Получить записи с логическим сроком жизни по списку ключей.
+
+        Args:
+            keys: ключи
+
+        Returns:
+            list[Optional[CacheEntry]]: записи в порядке ключей
+
+        """
+        return [CacheEntry.unpack(value)
+                for value in await self.get_many(keys)]
+
+    async def put_entries(self,
+                          entries: dict[str, CacheEntry],
+                          expire: float):
+        """Записать записи с логическим сроком жизни в кэш.
+
+        Args:
+            entries: записи по ключам
+            expire: время хранения в секундах
+
+        """
+        await self.put_many({key: entry.pack()
+                             for key, entry in entries.items()},
+                            expire=expire)
+
+    async def put_entry(self, key: str, entry: CacheEntry, expire: float):
+        """Записать запись с логическим сроком жизни в кэш.
+
+        Args:
+            key: ключ
+            entry: запись
+            expire: время хранения в секундах
+
+        """
+        await self.put(key, entry.pack(), expire=expire)
+
+    @abstractmethod
+    async def acquire_lock(self, key: str, expire: float) -> Optional[str]:
+        """Захватить блокировку с ограниченным сроком аренды.
+
+        Args:
+            key: ключ блокировки
+            expire: срок аренды в секундах
+
+        Returns:
+            Optional[str]: токен владельца или None, если блокировка занята
+
+        """
+        pass
+
+    @abstractmethod
+    async def release_lock(self, key: str, token: str):
+        """Освободить блокировку, если она все еще принадлежит владельцу.
+
+        Args:
+            key: ключ блокировки
+            token: токен владельца
+
         """
         pass
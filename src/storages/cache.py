@@ -1,8 +1,19 @@
+from src.core import config
 from src.db.redis import get_redis
+from src.storages.memory import MemoryStorage
 from src.storages.redis import RedisStorage
+from src.storages.tiered import TieredStorage
 from src.storages.base import CacheStorage
 
 
+local_storage = MemoryStorage(
+    max_entries=config.redis_settings.LOCAL_CACHE_MAX_ENTRIES,
+    max_bytes=config.redis_settings.LOCAL_CACHE_MAX_BYTES,
+    expire=config.redis_settings.LOCAL_CACHE_EXPIRE_IN_SECONDS
+)
+"""Локальный кэш воркера."""
+
+
 async def get_cache_storage() -> CacheStorage:
     """Получить инстанс класса хранилища кеша.
 
@@ -11,4 +22,7 @@ async def get_cache_storage() -> CacheStorage:
 
     """
     redis = await get_redis()
-    return RedisStorage(redis=redis)
+    storage = RedisStorage(redis=redis)
+    if config.redis_settings.CACHE_BACKEND == 'tiered':
+        return TieredStorage(local=local_storage, remote=storage)
+    return storage
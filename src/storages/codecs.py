@@ -0,0 +1,119 @@
+import zlib
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class Codec:
+    """Кодек сжатия данных кэша (без сжатия).
+
+    Args:
+        id: идентификатор кодека в заголовке записи
+        name: название кодека в настройках
+
+    """
+    id: int = 0
+    name: str = 'none'
+
+    def compress(self, data: bytes) -> bytes:
+        """Сжать данные.
+
+        Args:
+            data: данные
+
+        Returns:
+            bytes: сжатые данные
+
+        """
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        """Распаковать данные.
+
+        Args:
+            data: сжатые данные
+
+        Returns:
+            bytes: данные
+
+        """
+        return data
+
+
+class ZlibCodec(Codec):
+    """Кодек zlib (стандартная библиотека)."""
+    id = 1
+    name = 'zlib'
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, 1)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class Lz4Codec(Codec):
+    """Кодек LZ4 (требуется пакет `lz4`)."""
+    id = 2
+    name = 'lz4'
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4.frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4.frame.decompress(data)
+
+
+class ZstdCodec(Codec):
+    """Кодек Zstandard (требуется пакет `zstandard`)."""
+    id = 3
+    name = 'zstd'
+
+    def __init__(self) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+codecs: dict[int, Codec] = {
+    codec.id: codec
+    for codec in (
+        Codec(),
+        ZlibCodec(),
+        Lz4Codec() if lz4 else None,
+        ZstdCodec() if zstandard else None,
+    )
+    if codec is not None
+}
+"""Доступные кодеки по идентификатору."""
+
+
+def get_codec(name: str) -> Codec:
+    """Получить кодек по названию.
+
+    Args:
+        name: название кодека
+
+    Returns:
+        Codec: кодек
+
+    Raises:
+        ValueError: кодек неизвестен или не установлен его пакет
+
+    """
+    for codec in codecs.values():
+        if codec.name == name:
+            return codec
+    raise ValueError(f'Кодек кэша "{name}" недоступен')
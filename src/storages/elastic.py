@@ -1,13 +1,46 @@
-from typing import Optional, Any
+import hashlib
+from typing import Optional, Any, AsyncIterator, Awaitable, Callable
 
+import orjson
 from elasticsearch import AsyncElasticsearch, NotFoundError
 from elasticsearch.exceptions import ConnectionError, TransportError
 from pydantic import BaseModel
 import backoff
 
 from src.storages.base import DataStorage
-from src.api.v1.query_params.base import Page
+from src.api.v1.query_params.base import (Page, PageResult, SortField,
+                                          get_stable_sort)
+from src.core.batch_loader import BatchLoader
 from src.core.config import elastic_settings
+from src.storages.resilience import CircuitBreaker, hedge
+
+msearch_loader = BatchLoader(
+    name='msearch',
+    window=elastic_settings.ELASTIC_MSEARCH_WINDOW_IN_MS / 1000,
+    max_size=elastic_settings.ELASTIC_MSEARCH_MAX_SIZE
+)
+"""Объединение одновременных поисковых запросов воркера в `_msearch`."""
+circuit_breakers: dict[str, CircuitBreaker] = {}
+"""Автоматы защиты воркера по индексу и виду запроса."""
+
+
+def get_hedge_preference(preference: Optional[str], number: int) -> str:
+    """Получить `preference` дублирующего запроса.
+
+    Значение отличается от исходного, поэтому ES выбирает копии шардов
+    заново. Пользовательский `preference` не может начинаться с `_`.
+
+    Args:
+        preference: `preference` исходного запроса
+        number: номер попытки
+
+    Returns:
+        str: `preference`, например `hedge-1` или `<preference>-hedge-1`
+
+    """
+    if preference is None:
+        return f'hedge-{number}'
+    return f'{preference}-hedge-{number}'
 
 
 class ElasticStorage(DataStorage):
@@ -18,6 +51,11 @@ class ElasticStorage(DataStorage):
         index: название индекса
 
     """
+    search_fields: list[str] = ['*']
+    """Поля полнотекстового поиска."""
+    sort_fields: dict[str, SortField] = {'id': SortField('id', 'keyword')}
+    """Реестр сортировок: публичное имя -> поле ES с doc values."""
+
     def __init__(self, es: AsyncElasticsearch, index: str) -> None:
         self.es = es
         self.index = index
@@ -47,12 +85,88 @@ class ElasticStorage(DataStorage):
         """
         return []
 
+    def _get_circuit_breaker(self, endpoint: str) -> CircuitBreaker:
+        """Получить автомат защиты воркера для запросов к индексу.
+
+        Args:
+            endpoint: вид запроса (get, mget, search)
+
+        Returns:
+            CircuitBreaker: автомат защиты
+
+        """
+        name = f'{self.index}:{endpoint}'
+        breaker = circuit_breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name=name,
+                window_size=elastic_settings.ELASTIC_BREAKER_WINDOW_SIZE,
+                min_calls=elastic_settings.ELASTIC_BREAKER_MIN_CALLS,
+                failure_rate=elastic_settings.ELASTIC_BREAKER_FAILURE_RATE,
+                slow_call=(
+                    elastic_settings.ELASTIC_BREAKER_SLOW_CALL_IN_MS / 1000),
+                reset_timeout=(
+                    elastic_settings.ELASTIC_BREAKER_RESET_TIMEOUT_IN_SECONDS),
+                enabled=elastic_settings.ELASTIC_BREAKER_ENABLED
+            )
+            circuit_breakers[name] = breaker
+        return breaker
+
+    async def _request(self, endpoint: str, func: Callable[..., Awaitable],
+                       *args, hedged: bool = True, **kwargs) -> Any:
+        """Выполнить запрос на чтение через автомат защиты.
+
+        При `ELASTIC_HEDGE_ENABLED` запрос, не завершившийся за квантиль
+        `ELASTIC_HEDGE_QUANTILE` времени ответа, дублируется. Дубликат
+        всегда получает свой `preference`, чтобы попасть на другую копию
+        шардов.
+
+        Args:
+            endpoint: вид запроса (get, mget, search)
+            func: функция запроса
+            args: позиционные аргументы
+            hedged: дублировать медленный запрос (запрос в point-in-time
+                    не дублируется: `preference` у него задать нельзя)
+            kwargs: именованные аргументы
+
+        Returns:
+            Any: ответ
+
+        Raises:
+            CircuitOpenError: цепь разомкнута
+
+        """
+        breaker = self._get_circuit_breaker(endpoint)
+        delay = None
+        if hedged and elastic_settings.ELASTIC_HEDGE_ENABLED:
+            latency = breaker.get_latency(
+                elastic_settings.ELASTIC_HEDGE_QUANTILE)
+            if latency is not None:
+                delay = max(latency,
+                            elastic_settings.ELASTIC_HEDGE_MIN_DELAY_IN_MS
+                            / 1000)
+
+        async def attempt(number: int) -> Any:
+            params = kwargs
+            if number:
+                params = dict(params, preference=get_hedge_preference(
+                    params.get('preference'), number))
+            return await breaker.call(func, *args, **params)
+
+        return await hedge(breaker.name, attempt, delay)
+
     @backoff.on_exception(backoff.expo,
                           exception=(ConnectionError, TransportError),
                           max_time=elastic_settings.BACKOFF_MAX_TIME)
-    async def get_obj(self, id: str) -> Optional[Any]:
+    async def get_obj(self,
+                      id: str,
+                      fields: list[str] = None) -> Optional[Any]:
+        params = {}
+        if fields:
+            params['_source_includes'] = fields
         try:
-            doc = await self.es.get(self.index, id)
+            doc = await self._request('get', self.es.get, self.index, id,
+                                      **params)
         except NotFoundError:
             return None
 
@@ -61,45 +175,361 @@ class ElasticStorage(DataStorage):
     @backoff.on_exception(backoff.expo,
                           exception=(ConnectionError, TransportError),
                           max_time=elastic_settings.BACKOFF_MAX_TIME)
-    async def get_objects(
+    async def get_objs(self, ids: list[str]) -> list[Optional[Any]]:
+        if not ids:
+            return []
+
+        try:
+            response = await self._request('mget', self.es.mget,
+                                           body={'ids': ids},
+                                           index=self.index)
+        except NotFoundError:
+            return [None] * len(ids)
+
+        return [doc['_source'] if doc.get('found') else None
+                for doc in response['docs']]
+
+    def compile_query(
         self,
         page: Page,
         sort: list[str] = None,
         query: str = None,
-        filter: BaseModel = None
-    ) -> list[Any]:
-        body = {}
-        filters_query = []
+        filter: BaseModel = None,
+        source: Any = None,
+    ) -> dict:
+        """Собрать тело поискового запроса.
 
-        if filter:
-            filters_query.extend(self.compose_filters(filter))
+        Тело детерминировано: одинаковые запросы дают одинаковое тело
+        (без текущего времени, в одном порядке полей), поэтому его можно
+        использовать как ключ, а ES может отдавать его из request cache.
+        Поисковый запрос передается через `multi_match` по полям
+        `search_fields`, фильтры - в контексте фильтрации.
 
-        if filters_query:
-            body['query'] = {
-                'bool': {
-                    'filter': filters_query
+        Args:
+            page: пагинация
+            sort: сортировка (с `id` для однозначного порядка)
+            query: поисковый запрос
+            filter: фильтрация
+            source: получаемые поля: None - все, False - никакие,
+                    список - перечисленные
+
+        Returns:
+            dict: тело запроса
+
+        """
+        body = {'size': page.size}
+
+        bool_query = {}
+        if query is not None:
+            bool_query['must'] = [{
+                'multi_match': {
+                    'query': query,
+                    'fields': self.search_fields
                 }
-            }
+            }]
+        if filter:
+            filters = self.compose_filters(filter)
+            if filters:
+                bool_query['filter'] = filters
+        if bool_query:
+            body['query'] = {'bool': bool_query}
+
+        if sort:
+            body['sort'] = []
+            for item in sort:
+                sort_field = self.sort_fields[item.lstrip('-')]
+                body['sort'].append({sort_field.field: {
+                    'order': 'desc' if item[0] == '-' else 'asc',
+                    'unmapped_type': sort_field.type
+                }})
+
+        if page.cursor is None:
+            body['from'] = (page.number - 1) * page.size
+        else:
+            body['search_after'] = page.cursor.after
+
+        if source is False:
+            body['_source'] = False
+        elif source:
+            body['_source'] = {'includes': sorted(set(source))}
+
+        return body
+
+    @staticmethod
+    def get_preference(body: dict) -> str:
+        """Получить стабильный `preference` для тела запроса.
+
+        Одинаковые запросы попадают на одни и те же копии шардов,
+        где их результаты уже есть в кэшах.
+
+        Args:
+            body: тело запроса
+
+        Returns:
+            str: значение `preference`
+
+        """
+        data = orjson.dumps(body, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+    async def _search(
+        self,
+        page: Page,
+        sort: list[str] = None,
+        query: str = None,
+        filter: BaseModel = None,
+        source: Any = None,
+    ) -> Optional[list[dict]]:
+        """Выполнить поиск.
+
+        Args:
+            page: пагинация
+            sort: сортировка
+            query: поисковый запрос
+            filter: фильтрация
+            source: получаемые поля (см. `compile_query`)
+
+        Returns:
+            Optional[list[dict]]: найденные документы или None,
+                                  если индекс не найден
+
+        """
+        sort = get_stable_sort(sort, query)
+        if page.cursor is not None and len(page.cursor.after) != len(sort):
+            # курсор выдан для другой сортировки
+            return []
+
+        body = self.compile_query(page=page, sort=sort, query=query,
+                                  filter=filter, source=source)
+        if page.cursor is not None and elastic_settings.ELASTIC_PIT_KEEP_ALIVE:
+            return await self._search_pit(page, body)
+
+        params = {'request_cache': True,
+                  'preference': self.get_preference(body)}
+        if elastic_settings.ELASTIC_MSEARCH_ENABLED:
+            return await self._request('search', self._search_batched,
+                                       body, **params)
+
+        try:
+            search = await self._request('search', self.es.search,
+                                         body=body, index=self.index,
+                                         **params)
+        except NotFoundError:
+            return None
 
-        if sort is None:
-            sort = []
+        return search['hits']['hits']
 
-        sort = [f"{x.lstrip('-')}:{'desc' if x[0] == '-' else 'asc'}"
-                for x in sort]
+    async def _search_batched(
+        self,
+        body: dict,
+        **params,
+    ) -> Optional[list[dict]]:
+        """Выполнить поиск в составе общего `_msearch`.
+
+        Args:
+            body: тело запроса
+            params: параметры запроса (`request_cache`, `preference`)
+
+        Returns:
+            Optional[list[dict]]: найденные документы или None,
+                                  если индекс не найден
 
-        es_size = page.size
-        es_from = (page.number - 1) * es_size
+        """
+        key = orjson.dumps([dict(params, index=self.index), body]).decode()
+        response = await msearch_loader.load(key, self._msearch)
+        if 'error' in response:
+            if response.get('status') == 404:
+                return None
+            raise TransportError(response.get('status', 'N/A'),
+                                 response['error'].get('type'),
+                                 response['error'])
+        return response['hits']['hits']
+
+    async def _msearch(self, keys: list[str]) -> dict[str, dict]:
+        """Выполнить пакет поисковых запросов одним `_msearch`.
 
+        Args:
+            keys: поисковые запросы (JSON `[заголовок, тело]`)
+
+        Returns:
+            dict[str, dict]: ответы по запросам
+
+        """
+        lines = []
+        for key in keys:
+            lines.extend(orjson.loads(key))
+        response = await self.es.msearch(body=lines)
+        return dict(zip(keys, response['responses']))
+
+    async def _open_pit(self, keep_alive: str = None) -> Optional[str]:
+        """Открыть point-in-time индекса.
+
+        Args:
+            keep_alive: время жизни (по умолчанию - `ELASTIC_PIT_KEEP_ALIVE`)
+
+        Returns:
+            Optional[str]: ID point-in-time или None, если индекс не найден
+
+        """
+        keep_alive = keep_alive or elastic_settings.ELASTIC_PIT_KEEP_ALIVE
         try:
-            search = await self.es.search(
-                q=query,
-                body=body,
-                index=self.index,
-                sort=sort,
-                size=es_size,
-                from_=es_from
+            response = await self.es.transport.perform_request(
+                'POST',
+                f'/{self.index}/_pit',
+                params={'keep_alive': keep_alive}
             )
         except NotFoundError:
             return None
+        return response['id']
+
+    async def _close_pit(self, pit_id: str):
+        """Закрыть point-in-time.
+
+        Ошибки не пробрасываются: point-in-time все равно истечет
+        по `keep_alive`.
+
+        Args:
+            pit_id: ID point-in-time
+
+        """
+        try:
+            await self.es.transport.perform_request('DELETE', '/_pit',
+                                                    body={'id': pit_id})
+        except TransportError:
+            pass
+
+    async def _search_pit(
+        self,
+        page: Page,
+        body: dict,
+    ) -> Optional[list[dict]]:
+        """Выполнить поиск в point-in-time курсора.
+
+        Если у курсора еще нет point-in-time или он истек, открывается
+        новый. Актуальный ID point-in-time записывается в курсор.
+
+        Args:
+            page: пагинация с курсором
+            body: тело запроса
+
+        Returns:
+            Optional[list[dict]]: найденные документы или None,
+                                  если индекс не найден
+
+        """
+        for _ in range(2):
+            if page.cursor.pit_id is None:
+                page.cursor.pit_id = await self._open_pit()
+                if page.cursor.pit_id is None:
+                    return None
+
+            body['pit'] = {
+                'id': page.cursor.pit_id,
+                'keep_alive': elastic_settings.ELASTIC_PIT_KEEP_ALIVE
+            }
+            try:
+                search = await self._request('search', self.es.search,
+                                             body=body, hedged=False)
+            except NotFoundError:
+                page.cursor.pit_id = None
+                continue
+
+            page.cursor.pit_id = search.get('pit_id', page.cursor.pit_id)
+            return search['hits']['hits']
+        return None
+
+    @staticmethod
+    def get_after(page: Page, docs: list[dict]) -> Optional[list[Any]]:
+        """Получить значения сортировки последнего документа страницы.
+
+        Значения берутся из ответа ES (`sort` последнего документа),
+        поэтому совпадают с тем, что ожидает `search_after`, даже для
+        отсутствующих в документе полей и сортировки по подполям.
+
+        Args:
+            page: пагинация
+            docs: найденные документы
+
+        Returns:
+            Optional[list[Any]]: значения сортировки или None, если
+                                 страница неполная или не сортировалась
+
+        """
+        if not docs or len(docs) < page.size:
+            return None
+        return docs[-1].get('sort')
 
-        return [doc['_source'] for doc in search['hits']['hits']]
+    @backoff.on_exception(backoff.expo,
+                          exception=(ConnectionError, TransportError),
+                          max_time=elastic_settings.BACKOFF_MAX_TIME)
+    async def get_objects(
+        self,
+        page: Page,
+        sort: list[str] = None,
+        query: str = None,
+        filter: BaseModel = None,
+        fields: list[str] = None
+    ) -> PageResult:
+        docs = await self._search(page=page, sort=sort, query=query,
+                                  filter=filter, source=fields)
+        if docs is None:
+            return PageResult(items=[])
+
+        return PageResult(items=[doc['_source'] for doc in docs],
+                          after=self.get_after(page, docs))
+
+    @backoff.on_exception(backoff.expo,
+                          exception=(ConnectionError, TransportError),
+                          max_time=elastic_settings.BACKOFF_MAX_TIME)
+    async def get_object_ids(
+        self,
+        page: Page,
+        sort: list[str] = None,
+        query: str = None,
+        filter: BaseModel = None
+    ) -> PageResult:
+        docs = await self._search(page=page, sort=sort, query=query,
+                                  filter=filter, source=False)
+        if docs is None:
+            return PageResult(items=[])
+
+        return PageResult(items=[doc['_id'] for doc in docs],
+                          after=self.get_after(page, docs))
+
+    async def scan(
+        self,
+        filter: BaseModel = None,
+        fields: list[str] = None
+    ) -> AsyncIterator[list[Any]]:
+        """Выгрузить все объекты страницами.
+
+        Страницы читаются через `search_after` в point-in-time в порядке
+        `_shard_doc`, без глубоких `from`. Следующая страница запрашивается,
+        только когда потребитель обработал предыдущую, поэтому в памяти
+        не больше одной страницы. Запросы не повторяются через backoff:
+        выгрузка, прерванная ошибкой, начинается заново.
+
+        """
+        keep_alive = elastic_settings.ELASTIC_EXPORT_KEEP_ALIVE
+        pit_id = await self._open_pit(keep_alive)
+        if pit_id is None:
+            return
+
+        page = Page(number=1, size=elastic_settings.ELASTIC_EXPORT_PAGE_SIZE)
+        body = self.compile_query(page=page, filter=filter, source=fields)
+        del body['from']
+        body['sort'] = [{'_shard_doc': 'asc'}]
+        try:
+            while True:
+                body['pit'] = {'id': pit_id, 'keep_alive': keep_alive}
+                search = await self._request('search', self.es.search,
+                                             body=body, hedged=False)
+                pit_id = search.get('pit_id', pit_id)
+                hits = search['hits']['hits']
+                if hits:
+                    yield [hit['_source'] for hit in hits]
+                if len(hits) < page.size:
+                    break
+                body['search_after'] = hits[-1]['sort']
+        finally:
+            await self._close_pit(pit_id)
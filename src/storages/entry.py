@@ -0,0 +1,176 @@
+import math
+import random
+import struct
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.core.config import redis_settings
+from src.storages.codecs import codecs, get_codec
+
+ENTRY_HEADER = struct.Struct('!2sBBBIddf')
+"""Заголовок записи: сигнатура, версия формата, флаги, кодек, версия схемы,
+stale_at, expires_at, delta."""
+ENTRY_MAGIC = b'CE'
+"""Сигнатура записи кэша."""
+ENTRY_FORMAT_VERSION = 1
+"""Версия формата записи."""
+FLAG_NEGATIVE = 0b1
+"""Флаг записи об отсутствии данных."""
+
+default_codec = get_codec(redis_settings.CACHE_COMPRESSION)
+"""Кодек сжатия данных кэша из настроек."""
+
+
+@dataclass
+class CacheEntry:
+    """Запись кэша с логическим сроком жизни.
+
+    Args:
+        value: данные
+        stale_at: момент (unix time), после которого запись устаревает
+        expires_at: момент (unix time), после которого запись недействительна
+        delta: время получения данных в секундах
+        negative: запись об отсутствии данных (404, пустая страница)
+        schema: версия схемы данных
+
+    """
+    value: bytes
+    stale_at: float
+    expires_at: float
+    delta: float = 0
+    negative: bool = False
+    schema: int = 0
+
+    @classmethod
+    def create(cls,
+               value: bytes,
+               soft_expire: float,
+               expire: float,
+               delta: float = 0,
+               schema: int = 0) -> 'CacheEntry':
+        """Создать запись кэша.
+
+        Args:
+            value: данные
+            soft_expire: через сколько секунд запись устареет
+            expire: через сколько секунд запись станет недействительной
+            delta: время получения данных в секундах
+            schema: версия схемы данных
+
+        Returns:
+            CacheEntry: запись кэша
+
+        """
+        now = time.time()
+        return cls(value=value,
+                   stale_at=now + min(soft_expire, expire),
+                   expires_at=now + expire,
+                   delta=delta,
+                   schema=schema)
+
+    @classmethod
+    def create_negative(cls, expire: float, schema: int = 0) -> 'CacheEntry':
+        """Создать запись об отсутствии данных.
+
+        Args:
+            expire: через сколько секунд запись станет недействительной
+            schema: версия схемы данных
+
+        Returns:
+            CacheEntry: запись кэша
+
+        """
+        expires_at = time.time() + expire
+        return cls(value=b'', stale_at=expires_at, expires_at=expires_at,
+                   negative=True, schema=schema)
+
+    def is_expired(self, now: float = None) -> bool:
+        """Проверить, что запись недействительна.
+
+        Args:
+            now: текущий момент (unix time)
+
+        Returns:
+            bool: запись недействительна
+
+        """
+        return (now or time.time()) >= self.expires_at
+
+    def should_refresh(self, beta: float, now: float = None) -> bool:
+        """Проверить, нужно ли обновить запись.
+
+        Запись обновляется, если она устарела, либо досрочно
+        с вероятностью, растущей по мере приближения к устареванию
+        (XFetch). Чем дольше получаются данные, тем раньше начинается
+        досрочное обновление.
+
+        Args:
+            beta: коэффициент досрочного обновления (0 - отключено)
+            now: текущий момент (unix time)
+
+        Returns:
+            bool: нужно обновить
+
+        """
+        now = now or time.time()
+        if now >= self.stale_at:
+            return True
+        if not beta or not self.delta:
+            return False
+        gap = -self.delta * beta * math.log(1.0 - random.random())
+        return now + gap >= self.stale_at
+
+    def pack(self) -> bytes:
+        """Упаковать запись для хранения в кэше.
+
+        Данные больше `CACHE_COMPRESSION_MIN_BYTES` сжимаются кодеком
+        из настроек, идентификатор кодека пишется в заголовок.
+
+        Returns:
+            bytes: упакованная запись
+
+        """
+        value = self.value
+        codec = codecs[0]
+        if len(value) >= redis_settings.CACHE_COMPRESSION_MIN_BYTES:
+            codec = default_codec
+            value = codec.compress(value)
+
+        flags = FLAG_NEGATIVE if self.negative else 0
+        header = ENTRY_HEADER.pack(ENTRY_MAGIC, ENTRY_FORMAT_VERSION, flags,
+                                   codec.id, self.schema, self.stale_at,
+                                   self.expires_at, self.delta)
+        return header + value
+
+    @classmethod
+    def unpack(cls, data: Optional[bytes]) -> Optional['CacheEntry']:
+        """Распаковать запись из кэша.
+
+        Args:
+            data: упакованная запись
+
+        Returns:
+            Optional[CacheEntry]: запись или None, если формат не распознан
+                                  или кодек недоступен
+
+        """
+        if not data or len(data) < ENTRY_HEADER.size:
+            return None
+        if isinstance(data, str):
+            data = data.encode()
+
+        (magic, version, flags, codec_id, schema,
+         stale_at, expires_at, delta) = ENTRY_HEADER.unpack_from(data)
+        codec = codecs.get(codec_id)
+        if (magic != ENTRY_MAGIC
+                or version != ENTRY_FORMAT_VERSION
+                or codec is None):
+            return None
+
+        return cls(value=codec.decompress(data[ENTRY_HEADER.size:]),
+                   stale_at=stale_at,
+                   expires_at=expires_at,
+                   delta=delta,
+                   negative=bool(flags & FLAG_NEGATIVE),
+                   schema=schema)
@@ -1,9 +1,8 @@
-from typing import Any 
-import datetime
+from typing import Any
 
 from elasticsearch import AsyncElasticsearch
 
-from src.api.v1.query_params.films import Filter
+from src.api.v1.query_params.films import SORT_FIELDS, Filter
 from src.db.elastic import get_elastic
 from src.storages.elastic import ElasticStorage
 
@@ -30,6 +29,10 @@ class FilmElasticStorage(ElasticStorage):
         es: соединение с ElasticSearch
 
     """
+    search_fields = ['title^3', 'description', 'director',
+                     'actors_names', 'writers_names']
+    sort_fields = SORT_FIELDS
+
     def __init__(self, es: AsyncElasticsearch) -> None:
         super().__init__(es=es, index='movies')
 
@@ -39,8 +42,8 @@ class FilmElasticStorage(ElasticStorage):
                 'nested': {
                     'path': field_name,
                     'query': {
-                        'match': {
-                            f'{field_name}.id': value
+                        'term': {
+                            f'{field_name}.id': str(value)
                         }
                     }
                 }
@@ -66,13 +69,13 @@ class FilmElasticStorage(ElasticStorage):
 
         if filter.imdb_rating:
             filters.append(_get('imdb_rating', filter.imdb_rating))
-        
+
         if filter.newest:
-            creation_date_gte = datetime.date.today() - datetime.timedelta(weeks=1)
+            # дата округляется до дня, чтобы запрос кэшировался в ES
             filters.append({
                 "range": {
                     "creation_date": {
-                        "gte": creation_date_gte.strftime('%Y-%m-%d')
+                        "gte": "now-1w/d"
                     }
                 }
             })
@@ -1,5 +1,6 @@
 from elasticsearch import AsyncElasticsearch
 
+from src.api.v1.query_params.genres import SORT_FIELDS
 from src.db.elastic import get_elastic
 from src.storages.elastic import ElasticStorage
 
@@ -11,6 +12,9 @@ class GenreElasticStorage(ElasticStorage):
         es: соединение с ElasticSearch
 
     """
+    search_fields = ['name^2', 'description']
+    sort_fields = SORT_FIELDS
+
     def __init__(self, es: AsyncElasticsearch) -> None:
         super().__init__(es=es, index='genres')
 
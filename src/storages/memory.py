@@ -0,0 +1,198 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any
+
+from src.storages.base import CacheStorage
+
+
+class LRUCache:
+    """LRU-кэш в памяти процесса со сроком жизни записей.
+
+    Размер кэша ограничивается количеством записей и суммарным объемом
+    в байтах. При превышении любого из лимитов вытесняются наименее
+    востребованные записи. Операции выполняются под блокировкой, поэтому
+    кэш можно использовать и из потоков (синхронные зависимости FastAPI
+    выполняются в пуле потоков).
+
+    Args:
+        max_entries: максимальное кол-во записей
+        max_bytes: максимальный суммарный объем записей в байтах
+
+    """
+    def __init__(self, max_entries: int, max_bytes: int = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[str, tuple[Any, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def bytes(self) -> int:
+        """Текущий суммарный объем записей в байтах."""
+        return self._bytes
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Получить значение по ключу.
+
+        Args:
+            key: ключ
+            default: значение, если ключ не найден или запись устарела
+
+        Returns:
+            Any: значение
+
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            value, expires_at, _ = item
+            if expires_at <= time.monotonic():
+                self._pop(key)
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, expire: float, size: int = 0):
+        """Записать значение.
+
+        Значение, объем которого превышает `max_bytes`, не сохраняется.
+
+        Args:
+            key: ключ
+            value: значение
+            expire: срок жизни записи в секундах
+            size: объем значения в байтах
+
+        """
+        with self._lock:
+            self._pop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+
+            self._data[key] = (value, time.monotonic() + expire, size)
+            self._bytes += size
+            self._evict()
+
+    def delete(self, key: str):
+        """Удалить значение по ключу.
+
+        Args:
+            key: ключ
+
+        """
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        """Очистить кэш."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _pop(self, key: str):
+        """Удалить значение по ключу (вызывается под блокировкой).
+
+        Args:
+            key: ключ
+
+        """
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[2]
+
+    def _evict(self):
+        """Вытеснить наименее востребованные записи сверх лимитов
+        (вызывается под блокировкой)."""
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._data.popitem(last=False)
+            self._bytes -= size
+
+
+class MemoryStorage(CacheStorage):
+    """Класс кэша в памяти процесса (воркера).
+
+    Args:
+        max_entries: максимальное кол-во записей
+        max_bytes: максимальный суммарный объем записей в байтах
+        expire: срок жизни записей в секундах
+
+    """
+    def __init__(self, max_entries: int, max_bytes: int, expire: int) -> None:
+        self.cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        self.expire = expire
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Получить данные по ключу из кэша.
+
+        Args:
+            key: ключ
+
+        Returns:
+            Optional[Any]: данные
+
+        """
+        return self.cache.get(key)
+
+    async def put(self, key: str, value: Any, expire: float = None):
+        """Записать данные в кэш.
+
+        Время жизни записи не превышает время жизни локального кэша.
+        Данные хранятся в виде bytes, как и в общем хранилище, чтобы
+        объем кэша учитывался по их фактическому размеру.
+
+        Args:
+            key: ключ
+            value: данные
+            expire: время жизни в секундах
+
+        Raises:
+            TypeError: данные не bytes и не str
+
+        """
+        if isinstance(value, str):
+            value = value.encode()
+        if not isinstance(value, bytes):
+            raise TypeError(
+                f'Локальный кэш хранит только bytes, а не '
+                f'{type(value).__name__}')
+        expire = self.expire if expire is None else min(expire, self.expire)
+        self.cache.set(key, value, expire=expire, size=len(value))
+
+    async def acquire_lock(self, key: str, expire: float) -> Optional[str]:
+        """Захватить блокировку с ограниченным сроком аренды.
+
+        Args:
+            key: ключ блокировки
+            expire: срок аренды в секундах
+
+        Returns:
+            Optional[str]: токен владельца или None, если блокировка занята
+
+        """
+        if self.cache.get(key) is not None:
+            return None
+        token = uuid.uuid4().hex
+        self.cache.set(key, token, expire=expire, size=len(token))
+        return token
+
+    async def release_lock(self, key: str, token: str):
+        """Освободить блокировку, если она все еще принадлежит владельцу.
+
+        Args:
+            key: ключ блокировки
+            token: токен владельца
+
+        """
+        if self.cache.get(key) == token:
+            self.cache.delete(key)
@@ -1,6 +1,6 @@
 from elasticsearch import AsyncElasticsearch
 
-from src.api.v1.query_params.persons import Filter
+from src.api.v1.query_params.persons import SORT_FIELDS, Filter
 from src.db.elastic import get_elastic
 from src.storages.elastic import ElasticStorage
 
@@ -12,6 +12,9 @@ class PersonElasticStorage(ElasticStorage):
         es: соединение с ElasticSearch
 
     """
+    search_fields = ['full_name']
+    sort_fields = SORT_FIELDS
+
     def __init__(self, es: AsyncElasticsearch) -> None:
         super().__init__(es=es, index='persons')
 
@@ -22,7 +25,7 @@ class PersonElasticStorage(ElasticStorage):
             filters.append(
                 {
                     'term': {
-                        'roles': filter.role
+                        'roles': filter.role.value
                     }
                 }
             )
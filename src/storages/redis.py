@@ -1,3 +1,5 @@
+import math
+import uuid
 from typing import Optional, Any
 
 from aioredis import Redis
@@ -6,6 +8,14 @@ import backoff
 from src.core import config
 from src.storages.base import CacheStorage
 
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+"""Lua-скрипт освобождения блокировки только ее владельцем."""
+
 
 class RedisStorage(CacheStorage):
     """Класс для работы с кэшом Redis.
@@ -35,14 +45,80 @@ class RedisStorage(CacheStorage):
     @backoff.on_exception(backoff.expo,
                           exception=OSError,
                           max_time=config.redis_settings.BACKOFF_MAX_TIME)
-    async def put(self, key: str, value: Any):
+    async def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        """Получить данные по списку ключей из кэша одним MGET.
+
+        Args:
+            keys: ключи
+
+        Returns:
+            list[Optional[Any]]: данные в порядке ключей
+
+        """
+        if not keys:
+            return []
+        return await self.redis.mget(*keys)
+
+    @backoff.on_exception(backoff.expo,
+                          exception=OSError,
+                          max_time=config.redis_settings.BACKOFF_MAX_TIME)
+    async def put(self, key: str, value: Any, expire: float = None):
         """Записать данные в кэш.
 
         Args:
             key: ключ
             value: данные
+            expire: время жизни в секундах (по умолчанию - из настроек)
+
+        """
+        if expire is None:
+            expire = config.redis_settings.CACHE_EXPIRE_IN_SECONDS
+        await self.redis.set(key, value, expire=math.ceil(expire))
+
+    @backoff.on_exception(backoff.expo,
+                          exception=OSError,
+                          max_time=config.redis_settings.BACKOFF_MAX_TIME)
+    async def put_many(self, values: dict[str, Any], expire: float = None):
+        """Записать данные по нескольким ключам в кэш одним пайплайном.
+
+        Args:
+            values: данные по ключам
+            expire: время жизни в секундах (по умолчанию - из настроек)
+
+        """
+        if not values:
+            return
+        if expire is None:
+            expire = config.redis_settings.CACHE_EXPIRE_IN_SECONDS
+        pipeline = self.redis.pipeline()
+        for key, value in values.items():
+            pipeline.set(key, value, expire=math.ceil(expire))
+        await pipeline.execute()
+
+    async def acquire_lock(self, key: str, expire: float) -> Optional[str]:
+        """Захватить блокировку с ограниченным сроком аренды (SET NX PX).
+
+        Args:
+            key: ключ блокировки
+            expire: срок аренды в секундах
+
+        Returns:
+            Optional[str]: токен владельца или None, если блокировка занята
+
+        """
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(
+            key, token,
+            pexpire=int(expire * 1000),
+            exist=self.redis.SET_IF_NOT_EXIST)
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str):
+        """Освободить блокировку, если она все еще принадлежит владельцу.
+
+        Args:
+            key: ключ блокировки
+            token: токен владельца
 
         """
-        await self.redis.set(
-            key, value,
-            expire=config.redis_settings.CACHE_EXPIRE_IN_SECONDS)
+        await self.redis.eval(RELEASE_LOCK_SCRIPT, keys=[key], args=[token])
@@ -0,0 +1,248 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+from elasticsearch.exceptions import TransportError
+
+from src.core.metrics import metrics
+
+STATES = ('closed', 'half_open', 'open')
+"""Состояния автомата защиты (значение метрики - индекс состояния)."""
+
+
+class CircuitOpenError(Exception):
+    """Автомат защиты разомкнут: запросы к хранилищу временно
+    не выполняются.
+
+    Args:
+        name: название автомата
+        retry_after: через сколько секунд будет пробный запрос
+
+    """
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(name)
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_failure(error: Exception) -> bool:
+    """Проверить, что ошибка говорит о неисправности ElasticSearch.
+
+    Ошибки соединения, таймауты и ответы 5xx - неисправность,
+    ответы 4xx (например, 404) - нет.
+
+    Args:
+        error: ошибка
+
+    Returns:
+        bool: ошибка - признак неисправности
+
+    """
+    if not isinstance(error, TransportError):
+        return False
+    status = error.status_code
+    return not isinstance(status, int) or status >= 500
+
+
+class CircuitBreaker:
+    """Автомат защиты (circuit breaker) для запросов к хранилищу.
+
+    Автомат помнит исходы последних `window_size` запросов. Если среди
+    них набирается доля `failure_rate` ошибок и медленных запросов,
+    цепь размыкается и запросы сразу завершаются `CircuitOpenError`.
+    Через `reset_timeout` пропускается один пробный запрос: успех
+    замыкает цепь, ошибка снова размыкает.
+
+    Заодно автомат собирает время успешных запросов, по которому
+    выбирается задержка дублирующего запроса (`hedge`).
+
+    Args:
+        name: название для метрик
+        window_size: кол-во запоминаемых запросов
+        min_calls: минимальное кол-во запросов для решения о размыкании
+        failure_rate: доля ошибок для размыкания
+        slow_call: время в секундах, начиная с которого запрос
+                   считается ошибкой
+        reset_timeout: через сколько секунд пропустить пробный запрос
+        enabled: размыкать цепь (иначе только собирать время запросов)
+
+    """
+    def __init__(self,
+                 name: str,
+                 window_size: int,
+                 min_calls: int,
+                 failure_rate: float,
+                 slow_call: float,
+                 reset_timeout: float,
+                 enabled: bool = True) -> None:
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.reset_timeout = reset_timeout
+        self.enabled = enabled
+        self.state = STATES[0]
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+        self._latencies: deque[float] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probing = False
+
+    def _set_state(self, state: str):
+        """Перевести автомат в состояние.
+
+        Args:
+            state: состояние
+
+        """
+        self.state = state
+        self._outcomes.clear()
+        self._probing = False
+        if state == 'open':
+            self._opened_at = time.monotonic()
+        metrics.set('circuit_breaker_state', STATES.index(state),
+                    name=self.name)
+        metrics.inc('circuit_breaker_transitions_total',
+                    name=self.name, state=state)
+
+    def _before_call(self):
+        """Проверить, можно ли выполнить запрос.
+
+        Raises:
+            CircuitOpenError: цепь разомкнута или уже идет пробный запрос
+
+        """
+        if not self.enabled:
+            return
+        if self.state == 'open':
+            retry_after = self._opened_at + self.reset_timeout \
+                - time.monotonic()
+            if retry_after > 0:
+                metrics.inc('circuit_breaker_rejected_total', name=self.name)
+                raise CircuitOpenError(self.name, retry_after)
+            self._set_state('half_open')
+        if self.state == 'half_open':
+            if self._probing:
+                metrics.inc('circuit_breaker_rejected_total', name=self.name)
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self._probing = True
+
+    def _record(self, failed: bool, latency: Optional[float] = None):
+        """Учесть исход запроса.
+
+        Args:
+            failed: запрос завершился ошибкой или был медленным
+            latency: время успешного запроса в секундах
+
+        """
+        if latency is not None:
+            self._latencies.append(latency)
+        if not self.enabled:
+            return
+        if self.state == 'half_open':
+            self._set_state('open' if failed else 'closed')
+            return
+
+        self._outcomes.append(failed)
+        if (len(self._outcomes) >= self.min_calls
+                and sum(self._outcomes) >= self.failure_rate
+                * len(self._outcomes)):
+            self._set_state('open')
+
+    def get_latency(self, quantile: float) -> Optional[float]:
+        """Получить квантиль времени успешных запросов.
+
+        Args:
+            quantile: квантиль, например 0.95
+
+        Returns:
+            Optional[float]: время в секундах или None, если запросов
+                             пока недостаточно
+
+        """
+        if len(self._latencies) < self.min_calls:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1,
+                             int(quantile * len(latencies)))]
+
+    async def call(self, func: Callable[..., Awaitable[Any]],
+                   *args, **kwargs) -> Any:
+        """Выполнить запрос через автомат защиты.
+
+        Args:
+            func: функция запроса
+            args: позиционные аргументы
+            kwargs: именованные аргументы
+
+        Returns:
+            Any: результат запроса
+
+        Raises:
+            CircuitOpenError: цепь разомкнута
+
+        """
+        self._before_call()
+        start = time.monotonic()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # проигравший дублирующий запрос - не исход
+            self._probing = False
+            raise
+        except Exception as e:
+            self._record(is_failure(e))
+            raise
+
+        latency = time.monotonic() - start
+        self._record(latency >= self.slow_call, latency)
+        return result
+
+
+async def hedge(name: str,
+                func: Callable[[int], Awaitable[Any]],
+                delay: Optional[float]) -> Any:
+    """Выполнить запрос с дублированием (hedged request).
+
+    Если запрос не завершился за `delay`, параллельно отправляется
+    дубликат, используется первый успешный ответ, второй запрос
+    отменяется.
+
+    Args:
+        name: название для метрик
+        func: функция запроса, принимает номер попытки (0 или 1)
+        delay: задержка дубликата в секундах (None - без дублирования)
+
+    Returns:
+        Any: результат запроса
+
+    """
+    first = asyncio.ensure_future(func(0))
+    if delay is None:
+        return await first
+
+    pending = {first}
+    error = None
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return first.result()
+
+        metrics.inc('hedge_requests_total', name=name)
+        second = asyncio.ensure_future(func(1))
+        pending.add(second)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in (first, second):
+                if task not in done:
+                    continue
+                if task.exception() is None:
+                    if task is second:
+                        metrics.inc('hedge_wins_total', name=name)
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,115 @@
+from typing import Optional, Any
+
+from src.storages.base import CacheStorage
+
+
+class TieredStorage(CacheStorage):
+    """Двухуровневый кэш: локальный кэш воркера перед общим хранилищем.
+
+    Горячие ключи отдаются из памяти процесса без обращения к сети,
+    промахи локального уровня читаются из общего хранилища и
+    сохраняются локально.
+
+    Args:
+        local: локальное хранилище кэша (L1)
+        remote: общее хранилище кэша (L2)
+
+    """
+    def __init__(self, local: CacheStorage, remote: CacheStorage) -> None:
+        self.local = local
+        self.remote = remote
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Получить данные по ключу из кэша.
+
+        Args:
+            key: ключ
+
+        Returns:
+            Optional[Any]: данные
+
+        """
+        value = await self.local.get(key)
+        if value is not None:
+            return value
+
+        value = await self.remote.get(key)
+        if value is not None:
+            await self.local.put(key, value)
+        return value
+
+    async def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        """Получить данные по списку ключей из кэша.
+
+        Общее хранилище запрашивается только для промахов локального кэша.
+
+        Args:
+            keys: ключи
+
+        Returns:
+            list[Optional[Any]]: данные в порядке ключей
+
+        """
+        values = await self.local.get_many(keys)
+        missing = [key for key, value in zip(keys, values) if value is None]
+        if not missing:
+            return values
+
+        found = dict(zip(missing, await self.remote.get_many(missing)))
+        found = {key: value for key, value in found.items()
+                 if value is not None}
+        for key, value in found.items():
+            await self.local.put(key, value)
+        return [found.get(key) if value is None else value
+                for key, value in zip(keys, values)]
+
+    async def put(self, key: str, value: Any, expire: float = None):
+        """Записать данные в кэш.
+
+        Args:
+            key: ключ
+            value: данные
+            expire: время жизни в секундах (по умолчанию - из настроек)
+
+        """
+        # L2 отдает bytes, поэтому и локально храним bytes
+        if isinstance(value, str):
+            value = value.encode()
+        await self.remote.put(key, value, expire=expire)
+        await self.local.put(key, value, expire=expire)
+
+    async def put_many(self, values: dict[str, Any], expire: float = None):
+        """Записать данные по нескольким ключам в кэш.
+
+        Args:
+            values: данные по ключам
+            expire: время жизни в секундах (по умолчанию - из настроек)
+
+        """
+        values = {key: value.encode() if isinstance(value, str) else value
+                  for key, value in values.items()}
+        await self.remote.put_many(values, expire=expire)
+        await self.local.put_many(values, expire=expire)
+
+    async def acquire_lock(self, key: str, expire: float) -> Optional[str]:
+        """Захватить блокировку в общем хранилище.
+
+        Args:
+            key: ключ блокировки
+            expire: срок аренды в секундах
+
+        Returns:
+            Optional[str]: токен владельца или None, если блокировка занята
+
+        """
+        return await self.remote.acquire_lock(key, expire)
+
+    async def release_lock(self, key: str, token: str):
+        """Освободить блокировку в общем хранилище.
+
+        Args:
+            key: ключ блокировки
+            token: токен владельца
+
+        """
+        await self.remote.release_lock(key, token)
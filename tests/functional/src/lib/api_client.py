@@ -14,3 +14,19 @@ class APIClient:
         async with aiohttp.ClientSession() as session:
             async with session.get(self.url + endpoint, params=params) as resp:
                 return await resp.json(), resp.status
+
+    async def get_raw(self, endpoint: str, headers: dict = None, **params):
+        """Выполняет get запрос с заголовками, возвращает тело, статус
+        и заголовки ответа."""
+        async with aiohttp.ClientSession() as session:
+            async with session.get(self.url + endpoint, params=params,
+                                   headers=headers) as resp:
+                return await resp.read(), resp.status, resp.headers
+
+    async def post(self, endpoint: str, json: dict, **params):
+        """Выполняет post запрос на указанный endpoint с телом и
+        параметрами."""
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.url + endpoint, json=json,
+                                    params=params) as resp:
+                return await resp.json(), resp.status
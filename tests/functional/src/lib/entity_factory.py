@@ -70,6 +70,7 @@ def generate_random_film(id: str = None, title: str = None) -> Film:
         title=title or fake.word(),
         description=fake.text(),
         imdb_rating=fake.random_int(0, 10),
+        creation_date=fake.date_object(),
         actors=actors,
         writers=writers,
         directors=directors,
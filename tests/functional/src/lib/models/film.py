@@ -1,3 +1,5 @@
+import datetime
+
 from pydantic import BaseModel
 
 
@@ -19,6 +21,7 @@ class Film(BaseModel):
     title: str
     description: str = None
     imdb_rating: float = None
+    creation_date: datetime.date = None
     actors: list[Person] = None
     writers: list[Person] = None
     directors: list[Person] = None
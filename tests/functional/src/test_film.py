@@ -1,4 +1,5 @@
 import http
+import json
 
 import pytest
 
@@ -108,3 +109,146 @@ class TestFilm:
         assert status == http.HTTPStatus.OK
         assert [obj["id"] for obj in data] == sorted(
             [obj["id"] for obj in data], reverse=reverse)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("reverse", [True, False])
+    async def test_sort_by_date(self, films, reverse, api_client):
+        """Проверка сортировки по дате создания."""
+        perfix = "-" if reverse else ""
+        data, status = await api_client.get(
+            self.endpoint, **{"sort": f"{perfix}creation_date",
+                              "page[size]": len(films)})
+        assert status == http.HTTPStatus.OK
+        assert [obj["creation_date"] for obj in data] == sorted(
+            [film.creation_date.isoformat() for film in films],
+            reverse=reverse)
+
+    @pytest.mark.asyncio
+    async def test_wrong_sort(self, film, api_client):
+        """Проверить ответ на запрос с неподдерживаемой сортировкой."""
+        data, status = await api_client.get(
+            self.endpoint, **{"sort": "-description"})
+        assert status == http.HTTPStatus.UNPROCESSABLE_ENTITY
+        assert data == {"detail": "Неподдерживаемая сортировка: description"}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sort", ["", " ", "-"])
+    async def test_empty_sort(self, film, sort, api_client):
+        """Проверить ответ на запрос с пустым полем сортировки."""
+        data, status = await api_client.get(self.endpoint, sort=sort)
+        assert status == http.HTTPStatus.UNPROCESSABLE_ENTITY
+        assert data == {"detail": "Пустое поле сортировки"}
+
+    @pytest.mark.asyncio
+    async def test_export(self, films, api_client):
+        """Проверить выгрузку всех объектов потоком NDJSON."""
+        body, status, headers = await api_client.get_raw(
+            f"{self.endpoint}/export", **{"fields[film]": "title"})
+        assert status == http.HTTPStatus.OK
+        assert headers["Content-Type"] == "application/x-ndjson"
+        data = [json.loads(line) for line in body.splitlines()]
+        assert sorted(obj["id"] for obj in data) == sorted(
+            film.id for film in films)
+        assert all(obj.keys() == {"id", "title"} for obj in data)
+
+    @pytest.mark.asyncio
+    async def test_include(self, film, api_client):
+        """Проверить ответ со связанными документами."""
+        data, status = await api_client.get(
+            f"{self.endpoint}/{film.id}", include="actors,genres")
+        assert status == http.HTTPStatus.OK
+        assert data["data"]["id"] == film.id
+        assert data["included"].keys() == {"persons", "genres"}
+
+    @pytest.mark.asyncio
+    async def test_wrong_include(self, film, api_client):
+        """Проверить ответ на запрос с неизвестными связями."""
+        data, status = await api_client.get(self.endpoint, include="test")
+        assert status == http.HTTPStatus.UNPROCESSABLE_ENTITY
+        assert data == {"detail": "Неизвестные связи: test"}
+
+    @pytest.mark.asyncio
+    async def test_etag(self, film, api_client):
+        """Проверить ответ 304 на условный запрос с актуальным ETag."""
+        endpoint = f"{self.endpoint}/{film.id}"
+        _, status, headers = await api_client.get_raw(endpoint)
+        assert status == http.HTTPStatus.OK
+        assert "max-age" in headers["Cache-Control"]
+
+        etag = headers["ETag"]
+        body, status, headers = await api_client.get_raw(
+            endpoint, headers={"If-None-Match": etag})
+        assert status == http.HTTPStatus.NOT_MODIFIED
+        assert body == b""
+        assert headers["ETag"] == etag
+
+        _, status, _ = await api_client.get_raw(
+            endpoint, headers={"If-None-Match": '"outdated"'})
+        assert status == http.HTTPStatus.OK
+
+    @pytest.mark.asyncio
+    async def test_cursor_pagination(self, films, api_client):
+        """Проверить, что страница по курсору совпадает со следующей
+        страницей по номеру."""
+        _, status, headers = await api_client.get_raw(
+            self.endpoint, **{"page[size]": 5})
+        assert status == http.HTTPStatus.OK
+        cursor = headers["X-Next-Cursor"]
+
+        data, status = await api_client.get(
+            self.endpoint, **{"page[size]": 5, "page[cursor]": cursor})
+        assert status == http.HTTPStatus.OK
+        expected, _ = await api_client.get(
+            self.endpoint, **{"page[size]": 5, "page[number]": 2})
+        assert data == expected
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sort", ["title", "-imdb_rating"])
+    async def test_cursor_all_pages(self, films, sort, api_client):
+        """Проверить, что курсор обходит все объекты без пропусков
+        и повторов, в том числе без полей сортировки в ответе."""
+        ids = []
+        params = {"page[size]": 5, "sort": sort, "fields[film]": "id"}
+        while True:
+            data, status, headers = await api_client.get_raw(
+                self.endpoint, **params)
+            assert status == http.HTTPStatus.OK
+            ids.extend(obj["id"] for obj in json.loads(data))
+            if "X-Next-Cursor" not in headers:
+                break
+            params["page[cursor]"] = headers["X-Next-Cursor"]
+        assert sorted(ids) == sorted(film.id for film in films)
+
+    @pytest.mark.asyncio
+    async def test_wrong_cursor(self, film, api_client):
+        """Проверить ответ на запрос с некорректным курсором."""
+        data, status = await api_client.get(
+            self.endpoint, **{"page[cursor]": "test"})
+        assert status == http.HTTPStatus.UNPROCESSABLE_ENTITY
+        assert data == {"detail": "Некорректный курсор"}
+
+    @pytest.mark.asyncio
+    async def test_sparse_fields(self, film, api_client):
+        """Проверить, что возвращаются только запрошенные поля."""
+        data, status = await api_client.get(
+            f"{self.endpoint}/{film.id}", **{"fields[film]": "title"})
+        assert status == http.HTTPStatus.OK
+        assert data == {"id": film.id, "title": film.title}
+
+    @pytest.mark.asyncio
+    async def test_batch_sparse_fields(self, film, api_client):
+        """Проверить получение по списку ID только запрошенных полей
+        (в том числе при `STRICT_VALIDATION`)."""
+        data, status = await api_client.post(
+            f"{self.endpoint}/batch", json={"ids": [film.id, "-1"]},
+            **{"fields[film]": "imdb_rating"})
+        assert status == http.HTTPStatus.OK
+        assert data == [{"id": film.id, "imdb_rating": film.imdb_rating}]
+
+    @pytest.mark.asyncio
+    async def test_wrong_fields(self, film, api_client):
+        """Проверить ответ на запрос с неизвестными полями."""
+        data, status = await api_client.get(
+            self.endpoint, **{"fields[film]": "title,test"})
+        assert status == http.HTTPStatus.UNPROCESSABLE_ENTITY
+        assert data == {"detail": "Неизвестные поля: test"}
@@ -79,3 +79,11 @@ class TestGenre:
         data, status = await api_client.get(f"{self.endpoint}/{genre.id}")
         assert status == http.HTTPStatus.OK
         assert data == genre.dict()
+
+    @pytest.mark.asyncio
+    async def test_batch(self, genre, api_client):
+        """Проверить получение объектов по списку ID."""
+        data, status = await api_client.post(f"{self.endpoint}/batch",
+                                             json={"ids": [genre.id, "-1"]})
+        assert status == http.HTTPStatus.OK
+        assert data == [genre.dict()]
@@ -3,6 +3,7 @@ import http
 import pytest
 
 from tests.functional.src.lib.constants import default_values, messages
+from tests.functional.src.lib.entity_factory import generate_random_person
 
 
 class TestGenre:
@@ -102,3 +103,25 @@ class TestGenre:
         assert status == http.HTTPStatus.OK
         assert [obj["id"] for obj in data] == sorted(
             [obj["id"] for obj in data], reverse=reverse)
+
+    @pytest.mark.asyncio
+    async def test_films(self, film, es_data, api_client):
+        """Проверить фильмографию персоны."""
+        person = generate_random_person()
+        person.film_ids = [film.id, "test"]
+        es = es_data(self.index, [person])
+        await es.insert()
+        data, status = await api_client.get(
+            f"{self.endpoint}/{person.id}/film")
+        await es.delete()
+        assert status == http.HTTPStatus.OK
+        assert data == [{"id": film.id, "title": film.title,
+                         "imdb_rating": film.imdb_rating}]
+
+    @pytest.mark.asyncio
+    async def test_films_cursor(self, person, api_client):
+        """Проверить ответ фильмографии на запрос с курсором."""
+        data, status = await api_client.get(
+            f"{self.endpoint}/{person.id}/film", **{"page[cursor]": "test"})
+        assert status == http.HTTPStatus.UNPROCESSABLE_ENTITY
+        assert data == {"detail": "Курсор не поддерживается"}
@@ -0,0 +1,8 @@
+import os
+
+# настройки читаются при импорте src.core.config, подпись токенов
+# в тестах - HS256 с секретом из data/jwt.key
+os.environ["JWT_ALGORITHM"] = "HS256"
+os.environ["JWT_PUBLIC_KEY_PATH"] = os.path.join(
+    os.path.dirname(__file__), "data", "jwt.key"
+)
@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, AsyncIterator, Optional
+
+from src.api.v1.query_params.base import Page, PageResult
+from src.services.genre import GenreService
+from src.storages.base import DataStorage
+from src.storages.memory import MemoryStorage
+
+
+class FakeDataStorage(DataStorage):
+    """Хранилище данных в памяти с учетом запросов.
+
+    Args:
+        docs: документы
+        delay: задержка ответа в секундах
+
+    """
+    def __init__(self, docs: list[dict], delay: float = 0) -> None:
+        self.docs = {doc["id"]: doc for doc in docs}
+        self.delay = delay
+        self.calls = []
+
+    async def _call(self, *call) -> None:
+        self.calls.append(call)
+        await asyncio.sleep(self.delay)
+
+    async def get_obj(self, obj_id: str,
+                      fields: list[str] = None) -> Optional[Any]:
+        await self._call("get", obj_id)
+        return self.docs.get(obj_id)
+
+    async def get_objs(self, ids: list[str]) -> list[Optional[Any]]:
+        await self._call("mget", *ids)
+        return [self.docs.get(obj_id) for obj_id in ids]
+
+    def _get_page(self, page: Page) -> list[dict]:
+        start = (page.number - 1) * page.size
+        return list(self.docs.values())[start:start + page.size]
+
+    async def get_objects(self, page: Page, **params) -> PageResult:
+        await self._call("search", page.number)
+        return PageResult(items=self._get_page(page))
+
+    async def get_object_ids(self, page: Page, **params) -> PageResult:
+        await self._call("ids", page.number)
+        return PageResult(items=[doc["id"] for doc in self._get_page(page)])
+
+    async def scan(self, **params) -> AsyncIterator[list[Any]]:
+        yield list(self.docs.values())
+
+
+def get_cache_storage() -> MemoryStorage:
+    """Хранилище кэша в памяти."""
+    return MemoryStorage(max_entries=1000, max_bytes=None, expire=300)
+
+
+def get_service(docs: list[dict], delay: float = 0) -> GenreService:
+    """Сервис жанров с хранилищами в памяти."""
+    return GenreService(cache_storage=get_cache_storage(),
+                        data_storage=FakeDataStorage(docs, delay=delay))
@@ -0,0 +1,93 @@
+import time
+from http import HTTPStatus
+
+import jwt
+import pytest
+from fastapi.exceptions import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.core.config import jwt_settings
+from src.services import auth
+from src.storages.memory import LRUCache
+
+
+def get_token(exp: float = None, **payload) -> HTTPAuthorizationCredentials:
+    """Подписать токен тестовым ключом."""
+    payload = {"sub": "user", "is_superuser": False,
+               "permissions": ["view_newest_movies"], **payload}
+    if exp is not None:
+        payload["exp"] = int(exp)
+    return HTTPAuthorizationCredentials(
+        scheme="Bearer",
+        credentials=jwt.encode(payload, auth.jwt_public_key,
+                               algorithm=jwt_settings.jwt_algorithm)
+    )
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Пустой кэш токенов и список расшифрованных токенов."""
+    monkeypatch.setattr(auth, "verified_tokens", LRUCache(max_entries=10))
+    calls = []
+    decode_jwt = auth.decode_jwt
+
+    def decode(token):
+        calls.append(token.credentials)
+        return decode_jwt(token)
+
+    monkeypatch.setattr(auth, "decode_jwt", decode)
+    return calls
+
+
+class TestLoginRequired:
+    """Тесты кэша проверенных токенов."""
+
+    def test_hit(self, decodes):
+        """Проверить, что подпись токена проверяется один раз."""
+        token = get_token(exp=time.time() + 60)
+        user = auth.login_required(token)
+        assert auth.login_required(token) is user
+        assert user.permissions == frozenset({"view_newest_movies"})
+        assert len(decodes) == 1
+
+    def test_expire_capped_by_exp(self, decodes):
+        """Проверить, что токен не отдается из кэша после `exp`."""
+        token = get_token(exp=time.time() + 1)
+        auth.login_required(token)
+        time.sleep(max(jwt.decode(token.credentials,
+                                  options={"verify_signature": False})
+                       ["exp"] - time.time(), 0) + 0.1)
+        with pytest.raises(HTTPException) as e:
+            auth.login_required(token)
+        assert e.value.status_code == HTTPStatus.FORBIDDEN
+        assert len(decodes) == 2
+
+    def test_expire_capped_by_max_ttl(self, decodes, monkeypatch):
+        """Проверить, что токен хранится не дольше `jwt_cache_max_ttl`."""
+        monkeypatch.setattr(jwt_settings, "jwt_cache_max_ttl", 0.01)
+        token = get_token(exp=time.time() + 60)
+        auth.login_required(token)
+        time.sleep(0.02)
+        auth.login_required(token)
+        assert len(decodes) == 2
+
+    def test_eviction(self, decodes, monkeypatch):
+        """Проверить вытеснение токенов сверх `jwt_cache_max_entries`."""
+        monkeypatch.setattr(auth, "verified_tokens", LRUCache(max_entries=1))
+        first = get_token(exp=time.time() + 60, sub="first")
+        second = get_token(exp=time.time() + 60, sub="second")
+        auth.login_required(first)
+        auth.login_required(second)
+        assert auth.login_required(first).username == "first"
+        assert decodes == [first.credentials, second.credentials,
+                           first.credentials]
+
+    def test_invalid_token_not_cached(self, decodes):
+        """Проверить, что неверный токен не кэшируется."""
+        token = HTTPAuthorizationCredentials(scheme="Bearer",
+                                             credentials="test")
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                auth.login_required(token)
+        assert len(decodes) == 2
+        assert len(auth.verified_tokens) == 0
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from src.core.config import elastic_settings
+from src.core.batch_loader import BatchLoader, get_size_bucket
+from tests.unit.fakes import get_service
+
+
+class Loader:
+    """Функция пакетной загрузки с учетом пакетов."""
+
+    def __init__(self, error: Exception = None) -> None:
+        self.batches = []
+        self.error = error
+
+    async def __call__(self, keys):
+        self.batches.append(keys)
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        return {key: key.upper() for key in keys if key != "missing"}
+
+
+class TestBatchLoader:
+    """Тесты пакетной загрузки."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("window", [0, 0.01])
+    async def test_batch(self, window):
+        """Проверить, что одновременные запросы загружаются пакетом."""
+        loader, load_many = BatchLoader("test", window, 10), Loader()
+        results = await asyncio.gather(
+            *[loader.load(key, load_many) for key in ("a", "b", "missing")])
+        assert results == ["A", "B", None]
+        assert load_many.batches == [["a", "b", "missing"]]
+
+    @pytest.mark.asyncio
+    async def test_max_size(self):
+        """Проверить, что пакет отправляется при наборе `max_size`."""
+        loader, load_many = BatchLoader("test", 0.05, 2), Loader()
+        results = await asyncio.gather(
+            *[loader.load(key, load_many) for key in "abc"])
+        assert results == ["A", "B", "C"]
+        assert load_many.batches == [["a", "b"], ["c"]]
+
+    @pytest.mark.asyncio
+    async def test_same_key(self):
+        """Проверить, что повторный запрос ключа присоединяется к его
+        загрузке, в том числе уже отправленной."""
+        loader, load_many = BatchLoader("test", 0, 10), Loader()
+        first = asyncio.ensure_future(loader.load("a", load_many))
+        second = asyncio.ensure_future(loader.load("a", load_many))
+        await asyncio.sleep(0.001)
+        third = await loader.load("a", load_many)
+        assert [await first, await second, third] == ["A", "A", "A"]
+        assert load_many.batches == [["a"]]
+
+    @pytest.mark.asyncio
+    async def test_error(self):
+        """Проверить, что ошибку загрузки получают все ожидающие пакета,
+        а следующий запрос загружается заново."""
+        loader, load_many = BatchLoader("test", 0, 10), Loader(ValueError())
+        results = await asyncio.gather(
+            *[loader.load(key, load_many) for key in "ab"],
+            return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+        load_many.error = None
+        assert await loader.load("a", load_many) == "A"
+        assert load_many.batches == [["a", "b"], ["a"]]
+
+    @pytest.mark.parametrize("size, expected", [
+        (1, "1"), (2, "2"), (3, "3-4"), (4, "3-4"), (5, "5-8"), (9, "9-16"),
+    ])
+    def test_size_bucket(self, size, expected):
+        """Проверить интервалы размера пакета для метрик."""
+        assert get_size_bucket(size) == expected
+
+
+class TestServiceBatchLoad:
+    """Тесты пакетной загрузки объектов сервисом."""
+
+    @pytest.mark.asyncio
+    async def test_get_by_id(self, monkeypatch):
+        """Проверить, что одновременные запросы объектов по ID
+        загружаются одним MGET."""
+        monkeypatch.setattr(elastic_settings,
+                            "ELASTIC_BATCH_LOAD_ENABLED", True)
+        service = get_service([{"id": "1", "name": "a"},
+                               {"id": "2", "name": "b"}])
+        service.cache_key_prefix = "batch_test"
+        objects = await asyncio.gather(
+            *[service.get_by_id(obj_id) for obj_id in ("1", "2", "3", "1")])
+        assert [obj and obj.name for obj in objects] == ["a", "b", None, "a"]
+        assert service.data_storage.calls == [("mget", "1", "2", "3")]
@@ -0,0 +1,106 @@
+import uuid
+
+import pytest
+
+from src.api.v1.query_params.base import Cursor, Page
+from src.api.v1.query_params.films import Filter
+from src.core.config import redis_settings
+from src.services.cache_keys import (KeyspaceGeneration, build_obj_key,
+                                     build_objects_key, build_response_key,
+                                     normalize_query)
+from tests.unit.fakes import get_cache_storage
+
+PAGE = Page(number=1, size=10)
+GENRE_ID = uuid.UUID("3d8d9bf5-0d90-4353-88ba-4ccc5d2c07ff")
+
+
+class TestKeys:
+    """Тесты ключей кэша."""
+
+    def test_obj_key(self, monkeypatch):
+        """Проверить пространство имен, версию и поколение в ключе."""
+        monkeypatch.setattr(redis_settings, "CACHE_KEYSPACE_VERSION", 7)
+        assert build_obj_key("movies", 2, "1") == "cache:v7:g2:movies:id:1"
+        assert build_obj_key("movies", 2, "1", ["title", "id", "title"]) \
+            == "cache:v7:g2:movies:id:1?fields=id,title"
+
+    def test_equivalent_params(self):
+        """Проверить, что эквивалентные параметры дают один ключ."""
+        first = build_objects_key(
+            "movies", 0, "search", PAGE,
+            query=normalize_query("  Star   WARS "),
+            filter=Filter(genre=GENRE_ID, imdb_rating=None),
+            fields=["title", "id"])
+        second = build_objects_key(
+            "movies", 0, "search", PAGE,
+            query=normalize_query("star wars"),
+            filter=Filter(genre=str(GENRE_ID).upper()),
+            fields=["id", "title", "id"])
+        assert first == second
+
+    @pytest.mark.parametrize("params", [
+        {"method": "get"},
+        {"page": Page(number=2, size=10)},
+        {"page": Page(number=1, size=10, cursor=Cursor(after=[1, "a"]))},
+        {"sort": ["-title"]},
+        {"query": "star"},
+        {"filter": Filter(genre=GENRE_ID)},
+        {"fields": ["title"]},
+        {"ids": ["1", "2"]},
+        {"generation": 1},
+        {"namespace": "genres"},
+    ])
+    def test_different_params(self, params):
+        """Проверить, что разные параметры дают разные ключи."""
+        base = dict(namespace="movies", generation=0, method="search",
+                    page=PAGE)
+        assert build_objects_key(**base) != build_objects_key(
+            **{**base, **params})
+
+    def test_ids(self):
+        """Проверить, что порядок и повторы ID не влияют на ключ,
+        а состав - влияет."""
+        keys = [build_objects_key("movies", 0, "get", PAGE, ids=ids)
+                for ids in (["1", "2"], ["2", "1", "1"], ["1", "3"])]
+        assert keys[0] == keys[1] != keys[2]
+
+    def test_cursor_pit(self):
+        """Проверить, что point-in-time не входит в ключ."""
+        keys = {
+            build_objects_key("movies", 0, "get", Page(
+                number=1, size=10, cursor=Cursor(after=[1], pit_id=pit_id)))
+            for pit_id in (None, "a", "b")
+        }
+        assert len(keys) == 1
+
+    def test_response_key(self):
+        """Проверить, что порядок разных параметров не влияет на ключ
+        HTTP-ответа, а порядок повторяющихся - влияет."""
+        key = build_response_key(
+            0, "/api/v1/films/", [("sort", "a"), ("page[size]", "5")])
+        assert key == build_response_key(
+            0, "/api/v1/films", [("page[size]", "5"), ("sort", "a")])
+        assert key != build_response_key(
+            0, "/api/v1/films", [("page[size]", "5"), ("sort", "a"),
+                                 ("sort", "b")])
+        assert key != build_response_key(
+            0, "/api/v1/films", [("page[size]", "5"), ("sort", "a")],
+            scope="admin")
+
+
+class TestKeyspaceGeneration:
+    """Тесты поколения пространства ключей."""
+
+    @pytest.mark.asyncio
+    async def test_incr(self):
+        """Проверить, что увеличение поколения в кэше (INCR) меняет
+        поколение после интервала обновления."""
+        storage = get_cache_storage()
+        generation = KeyspaceGeneration(key="cache:generation", refresh=60)
+        assert await generation.get(storage) == 0
+
+        await storage.put("cache:generation", b"1")
+        assert await generation.get(storage) == 0
+
+        generation.refresh = 0
+        assert await generation.get(storage) == 1
@@ -0,0 +1,45 @@
+import pytest
+
+from src.storages import entry as entry_module
+from src.storages.codecs import codecs, get_codec
+from src.storages.entry import ENTRY_HEADER, CacheEntry
+
+DATA = b'{"id": "1", "title": "Star Wars", "imdb_rating": 8.6}' * 100
+
+
+def get_available_codec(name: str):
+    """Получить кодек или пропустить тест, если его пакет
+    не установлен."""
+    try:
+        return get_codec(name)
+    except ValueError:
+        pytest.skip(f"Кодек {name} не установлен")
+
+
+class TestCodecs:
+    """Тесты кодеков сжатия кэша."""
+
+    @pytest.mark.parametrize("name", ["none", "zlib", "lz4", "zstd"])
+    def test_round_trip(self, name):
+        """Проверить, что данные распаковываются без изменений."""
+        codec = get_available_codec(name)
+        assert codec.decompress(codec.compress(DATA)) == DATA
+        assert codec.decompress(codec.compress(b"")) == b""
+        assert codecs[codec.id] is codec
+
+    @pytest.mark.parametrize("name", ["zlib", "lz4", "zstd"])
+    def test_entry(self, name, monkeypatch):
+        """Проверить, что запись сжимается кодеком из настроек
+        и распаковывается по идентификатору из заголовка."""
+        codec = get_available_codec(name)
+        monkeypatch.setattr(entry_module, "default_codec", codec)
+        entry = CacheEntry(value=DATA, stale_at=1, expires_at=2)
+        data = entry.pack()
+        assert ENTRY_HEADER.unpack_from(data)[3] == codec.id
+        assert len(data) < len(DATA)
+        assert CacheEntry.unpack(data) == entry
+
+    def test_unknown(self):
+        """Проверить ошибку для неизвестного кодека."""
+        with pytest.raises(ValueError):
+            get_codec("test")
@@ -0,0 +1,56 @@
+import datetime
+import uuid
+
+import elasticsearch
+import pytest
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.exceptions import SerializationError
+
+from src.db.elastic import ElasticConnection, OrjsonSerializer
+
+
+class TestElasticConnection:
+    """Тесты соединения с узлом ElasticSearch."""
+
+    def test_client_version(self):
+        """Проверить версию клиента, из которой скопирован
+        `_create_aiohttp_session` (при обновлении сверить метод)."""
+        assert elasticsearch.__versionstr__ == "7.9.1"
+
+    @pytest.mark.asyncio
+    async def test_keepalive(self):
+        """Проверить, что пул соединений создается с размером
+        и keep-alive из параметров клиента."""
+        async with AsyncElasticsearch(hosts=["localhost:9200"],
+                                      connection_class=ElasticConnection,
+                                      maxsize=3, keepalive_timeout=7) as es:
+            connection = es.transport.get_connection()
+            assert isinstance(connection, ElasticConnection)
+            await connection._create_aiohttp_session()
+            connector = connection.session.connector
+            assert connector.limit == 3
+            assert connector._keepalive_timeout == 7
+
+
+class TestOrjsonSerializer:
+    """Тесты сериализатора на orjson."""
+
+    def test_dumps(self):
+        """Проверить сериализацию типов, которые не поддерживает
+        стандартный json."""
+        obj_id = uuid.uuid4()
+        data = OrjsonSerializer().dumps(
+            {"id": obj_id, "date": datetime.date(2020, 1, 2)})
+        assert data == f'{{"id":"{obj_id}","date":"2020-01-02"}}'
+
+    def test_dumps_str(self):
+        """Проверить, что строка (готовый NDJSON) не сериализуется
+        повторно."""
+        assert OrjsonSerializer().dumps('{"a":1}\n') == '{"a":1}\n'
+
+    def test_loads(self):
+        """Проверить разбор ответа и ошибку некорректного JSON."""
+        serializer = OrjsonSerializer()
+        assert serializer.loads(b'{"hits": []}') == {"hits": []}
+        with pytest.raises(SerializationError):
+            serializer.loads(b"{")
@@ -0,0 +1,215 @@
+import asyncio
+import uuid
+
+import orjson
+import pytest
+from elasticsearch.exceptions import TransportError
+
+from src.api.v1.query_params.base import (Page, get_source_fields,
+                                          get_stable_sort, normalize_sort)
+from src.core.config import elastic_settings
+from src.services.cache_keys import build_objects_key, normalize_query
+from src.services.film import FilmService
+from src.storages.elastic import ElasticStorage
+from src.storages.films import FilmElasticStorage, FilmStorageFilter
+from tests.unit.fakes import get_service
+
+PAGE = Page(number=1, size=2)
+GENRE_ID = uuid.UUID("3d8d9bf5-0d90-4353-88ba-4ccc5d2c07ff")
+DOCS = [{"id": "1", "title": "a"}, {"id": "2", "title": "b"}]
+
+
+class FakeES:
+    """ElasticSearch с учетом запросов."""
+
+    def __init__(self) -> None:
+        self.requests = []
+
+    async def search(self, body, index=None, **params):
+        self.requests.append(("search", body, params))
+        return {"hits": {"hits": [
+            {"_id": doc["id"], "_source": doc, "sort": [doc["id"]]}
+            for doc in DOCS
+        ]}}
+
+    async def msearch(self, body, **params):
+        self.requests.append(("msearch", body, params))
+        responses = []
+        for header, _ in zip(body[::2], body[1::2]):
+            if header["index"] == "missing":
+                responses.append({"error": {"type": "index_not_found"},
+                                  "status": 404})
+            elif header["index"] == "broken":
+                responses.append({"error": {"type": "search_phase"},
+                                  "status": 500})
+            else:
+                responses.append({"hits": {"hits": [
+                    {"_id": header["index"],
+                     "_source": {"id": header["index"]}}
+                ]}})
+        return {"responses": responses}
+
+    async def get(self, index, id, **params):
+        self.requests.append(("get", id, params))
+        return {"_id": id, "_source": DOCS[0]}
+
+
+class TestSourceFields:
+    """Тесты получения из ES только нужных полей."""
+
+    @pytest.mark.asyncio
+    async def test_objects(self):
+        """Проверить, что в запрос передаются только запрошенные поля."""
+        es = FakeES()
+        storage = FilmElasticStorage(es)
+        await storage.get_objects(PAGE, fields=["title", "id", "title"])
+        _, body, _ = es.requests[0]
+        assert body["_source"] == {"includes": ["id", "title"]}
+
+    @pytest.mark.asyncio
+    async def test_all_fields(self):
+        """Проверить, что без полей документ запрашивается целиком."""
+        es = FakeES()
+        await FilmElasticStorage(es).get_objects(PAGE)
+        _, body, _ = es.requests[0]
+        assert "_source" not in body
+
+    @pytest.mark.asyncio
+    async def test_ids(self):
+        """Проверить, что для списка ID документы не запрашиваются."""
+        es = FakeES()
+        result = await FilmElasticStorage(es).get_object_ids(PAGE)
+        _, body, _ = es.requests[0]
+        assert body["_source"] is False
+        assert result.items == ["1", "2"]
+
+    @pytest.mark.asyncio
+    async def test_obj(self):
+        """Проверить, что поля объекта передаются в `_source_includes`."""
+        es = FakeES()
+        await FilmElasticStorage(es).get_obj("1", fields=["title"])
+        assert es.requests == [("get", "1", {"_source_includes": ["title"]})]
+
+    @pytest.mark.parametrize("fields, allowed, include, expected", [
+        (None, None, None, None),
+        (None, ["id", "title"], ["genres"], ["id", "title", "genres"]),
+        (["title"], None, None, ["id", "title"]),
+        (["title", "actors"], ["id", "title"], None, ["id", "title"]),
+        (["title"], None, ["genres"], ["id", "title", "genres"]),
+    ])
+    def test_api_fields(self, fields, allowed, include, expected):
+        """Проверить поля, запрашиваемые эндпоинтом."""
+        assert get_source_fields(fields, allowed, include) == expected
+
+    def test_required_fields(self):
+        """Проверить, что сервис дополняет поля обязательными полями
+        модели."""
+        service = FilmService()
+        assert service._get_source_fields(None) is None
+        assert service._get_source_fields(["imdb_rating"]) == [
+            "imdb_rating", "id", "title"]
+
+
+class TestMsearch:
+    """Тесты объединения поисковых запросов в `_msearch`."""
+
+    @pytest.fixture(autouse=True)
+    def settings(self, monkeypatch):
+        monkeypatch.setattr(elastic_settings, "ELASTIC_MSEARCH_ENABLED", True)
+
+    @pytest.mark.asyncio
+    async def test_multiplexing(self):
+        """Проверить, что одновременные запросы к разным индексам
+        отправляются одним `_msearch` и получают свои ответы."""
+        es = FakeES()
+        storages = [ElasticStorage(es, index) for index in ("a", "b")]
+        results = await asyncio.gather(
+            *[storage._search(PAGE) for storage in storages],
+            storages[0]._search(PAGE, query="test"))
+        assert [[doc["_id"] for doc in docs] for docs in results] == [
+            ["a"], ["b"], ["a"]]
+
+        msearch = [request for request in es.requests
+                   if request[0] == "msearch"]
+        assert len(msearch) == 1
+        _, lines, _ = msearch[0]
+        assert len(lines) == 6
+        assert all(header["request_cache"] and header["preference"]
+                   for header in lines[::2])
+
+    @pytest.mark.asyncio
+    async def test_errors(self):
+        """Проверить, что ошибка одного запроса пакета не влияет
+        на остальные."""
+        es = FakeES()
+        results = await asyncio.gather(
+            *[ElasticStorage(es, index)._search(PAGE)
+              for index in ("a", "missing", "broken")],
+            return_exceptions=True)
+        assert [doc["_id"] for doc in results[0]] == ["a"]
+        assert results[1] is None
+        assert isinstance(results[2], TransportError)
+        assert results[2].status_code == 500
+
+
+class TestCompileQuery:
+    """Тесты сборки тела поискового запроса."""
+
+    @pytest.mark.parametrize("first, second", [
+        ({"query": normalize_query(" Star  WARS")},
+         {"query": normalize_query("star wars")}),
+        ({"sort": get_stable_sort(normalize_sort(["title", "title"]))},
+         {"sort": get_stable_sort(normalize_sort(["title", "id"]))}),
+        ({"filter": FilmStorageFilter(genre=GENRE_ID, actor=None)},
+         {"filter": FilmStorageFilter(genre=str(GENRE_ID).upper())}),
+        ({"source": ["title", "id", "title"]},
+         {"source": ["id", "title"]}),
+    ])
+    def test_equivalent_params(self, first, second):
+        """Проверить, что эквивалентные параметры дают одинаковое тело
+        запроса, `preference` и ключ кэша."""
+        storage = FilmElasticStorage(FakeES())
+        bodies = [storage.compile_query(page=PAGE, **params)
+                  for params in (first, second)]
+        assert bodies[0] == bodies[1]
+        assert orjson.dumps(bodies[0]) == orjson.dumps(bodies[1])
+        assert storage.get_preference(bodies[0]) \
+            == storage.get_preference(bodies[1])
+
+        keys = [build_objects_key(
+            "movies", 0, "get", PAGE, sort=params.get("sort"),
+            query=params.get("query"), filter=params.get("filter"),
+            fields=params.get("source"))
+            for params in (first, second)]
+        assert keys[0] == keys[1]
+
+    def test_body(self):
+        """Проверить тело запроса со всеми параметрами."""
+        storage = FilmElasticStorage(FakeES())
+        body = storage.compile_query(
+            page=Page(number=2, size=5), sort=["-imdb_rating", "id"],
+            query="star", filter=FilmStorageFilter(newest=True),
+            source=["title"])
+        assert body == {
+            "size": 5,
+            "query": {"bool": {
+                "must": [{"multi_match": {
+                    "query": "star", "fields": storage.search_fields}}],
+                "filter": [{"range": {"creation_date": {"gte": "now-1w/d"}}}],
+            }},
+            "sort": [
+                {"imdb_rating": {"order": "desc", "unmapped_type": "float"}},
+                {"id": {"order": "asc", "unmapped_type": "keyword"}},
+            ],
+            "from": 5,
+            "_source": {"includes": ["title"]},
+        }
+
+    @pytest.mark.asyncio
+    async def test_stable_sort_key(self):
+        """Проверить, что сортировки, дающие один запрос к хранилищу,
+        кэшируются под одним ключом."""
+        service = get_service([{"id": "1", "name": "a"}])
+        for sort in (["name"], ["name", "id"], [" name", "name"]):
+            await service.get(page=PAGE, sort=sort)
+        assert service.data_storage.calls == [("search", 1)]
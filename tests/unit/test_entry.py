@@ -0,0 +1,101 @@
+import pytest
+
+from src.storages import entry as entry_module
+from src.storages.entry import ENTRY_HEADER, CacheEntry
+from tests.unit.fakes import get_service
+
+VALUE = b'{"id": "1", "name": "name"}' * 100
+
+
+class TestCacheEntry:
+    """Тесты записи кэша."""
+
+    @pytest.mark.parametrize("min_bytes", [0, 10 ** 6])
+    def test_pack_unpack(self, min_bytes, monkeypatch):
+        """Проверить, что запись распаковывается без изменений
+        со сжатием и без него."""
+        monkeypatch.setattr(entry_module.redis_settings,
+                            "CACHE_COMPRESSION_MIN_BYTES", min_bytes)
+        entry = CacheEntry(value=VALUE, stale_at=10.5, expires_at=20.5,
+                           delta=0.25, schema=123)
+        data = entry.pack()
+        assert (len(data) < len(VALUE)) == (min_bytes == 0)
+        assert CacheEntry.unpack(data) == entry
+
+    def test_negative(self):
+        """Проверить упаковку записи об отсутствии данных."""
+        entry = CacheEntry.create_negative(expire=30, schema=1)
+        unpacked = CacheEntry.unpack(entry.pack())
+        assert unpacked.negative
+        assert unpacked.value == b""
+        assert unpacked.stale_at == unpacked.expires_at
+
+    @pytest.mark.parametrize("field, value", [
+        (0, b"XX"),
+        (1, 2),
+        (3, 255),
+    ])
+    def test_unknown_format(self, field, value):
+        """Проверить, что запись с чужой сигнатурой, версией формата
+        или неизвестным кодеком считается промахом."""
+        header = list(ENTRY_HEADER.unpack_from(
+            CacheEntry(value=b"1", stale_at=1, expires_at=2).pack()))
+        header[field] = value
+        assert CacheEntry.unpack(ENTRY_HEADER.pack(*header) + b"1") is None
+
+    @pytest.mark.parametrize("data", [None, b"", b"CE", b"1" * 10])
+    def test_not_entry(self, data):
+        """Проверить, что пустые и короткие данные считаются промахом."""
+        assert CacheEntry.unpack(data) is None
+
+    def test_legacy_value(self):
+        """Проверить, что данные в старом формате (JSON) считаются
+        промахом."""
+        data = b'{"id": "1", "name": "name", "description": null}'
+        assert len(data) >= ENTRY_HEADER.size
+        assert CacheEntry.unpack(data) is None
+
+    def test_stale_window(self):
+        """Проверить границы устаревания и недействительности записи."""
+        entry = CacheEntry(value=b"1", stale_at=10, expires_at=20)
+        assert not entry.should_refresh(beta=0, now=9)
+        assert entry.should_refresh(beta=0, now=10)
+        assert not entry.is_expired(now=19)
+        assert entry.is_expired(now=20)
+
+    def test_create(self):
+        """Проверить, что устаревание не наступает позже
+        недействительности."""
+        entry = CacheEntry.create(b"1", soft_expire=60, expire=30)
+        assert entry.stale_at == entry.expires_at
+
+    def test_xfetch(self, monkeypatch):
+        """Проверить, что досрочное обновление зависит от времени
+        получения данных и коэффициента."""
+        # -log(1 - 0.5) ~ 0.69
+        monkeypatch.setattr(entry_module.random, "random", lambda: 0.5)
+        entry = CacheEntry(value=b"1", stale_at=10, expires_at=20, delta=1)
+        assert entry.should_refresh(beta=1, now=9.5)
+        assert not entry.should_refresh(beta=1, now=9)
+        assert not entry.should_refresh(beta=0, now=9.5)
+        assert entry.should_refresh(beta=3, now=8)
+
+        entry.delta = 0
+        assert not entry.should_refresh(beta=1, now=9.99)
+
+
+class TestSchemaVersion:
+    """Тесты версии схемы в записи кэша."""
+
+    @pytest.mark.asyncio
+    async def test_mismatch(self):
+        """Проверить, что запись другой схемы модели считается промахом."""
+        service = get_service([{"id": "1", "name": "name"}])
+        entry = service._create_entry(b'{"id": "1"}')
+        await service.cache_storage.put_entry("key", entry, expire=60)
+        assert await service._get_entry("key") == entry
+
+        entry.schema += 1
+        await service.cache_storage.put_entry("key", entry, expire=60)
+        assert await service._get_entry("key") is None
+        assert await service._get_entries(["key"]) == [None]
@@ -0,0 +1,119 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from src.storages.memory import LRUCache, MemoryStorage
+
+
+class TestLRUCache:
+    """Тесты LRU-кэша в памяти."""
+
+    def test_eviction(self):
+        """Проверить вытеснение наименее востребованной записи."""
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1, expire=60)
+        cache.set("b", 2, expire=60)
+        assert cache.get("a") == 1
+        cache.set("c", 3, expire=60)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_max_bytes(self):
+        """Проверить вытеснение по суммарному объему."""
+        cache = LRUCache(max_entries=10, max_bytes=5)
+        cache.set("a", b"abc", expire=60, size=3)
+        cache.set("b", b"abc", expire=60, size=3)
+        assert cache.get("a") is None
+        assert cache.bytes == 3
+        cache.set("c", b"abcdef", expire=60, size=6)
+        assert cache.get("c") is None
+
+    def test_expire(self):
+        """Проверить, что устаревшая запись не отдается."""
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1, expire=0.01)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_threads(self):
+        """Проверить одновременную работу с кэшем из потоков."""
+        cache = LRUCache(max_entries=2)
+        errors = []
+
+        def work(n):
+            try:
+                for i in range(50000):
+                    cache.get(str((n + i) % 4))
+                    cache.set(str((n * 3 + i) % 4), i, expire=60)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(n,))
+                   for n in range(8)]
+        # частое переключение потоков, чтобы операции перемежались
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        assert errors == []
+        assert len(cache) <= 2
+
+
+class TestMemoryStorage:
+    """Тесты локального хранилища кэша."""
+
+    @pytest.mark.asyncio
+    async def test_max_entries(self):
+        """Проверить вытеснение по кол-ву записей."""
+        storage = MemoryStorage(max_entries=2, max_bytes=100, expire=60)
+        for key in ("a", "b", "c"):
+            await storage.put(key, b"1")
+        assert await storage.get_many(["a", "b", "c"]) == [None, b"1", b"1"]
+
+    @pytest.mark.asyncio
+    async def test_max_bytes(self):
+        """Проверить, что объем считается по размеру данных."""
+        storage = MemoryStorage(max_entries=10, max_bytes=8, expire=60)
+        await storage.put("a", b"abc")
+        # строка хранится в UTF-8 и занимает 6 байт, а не 3
+        await storage.put("b", "где")
+        assert storage.cache.bytes == 6
+        assert await storage.get("a") is None
+        assert await storage.get("b") == "где".encode()
+
+    @pytest.mark.asyncio
+    async def test_wrong_value(self):
+        """Проверить, что данные не в bytes не сохраняются."""
+        storage = MemoryStorage(max_entries=10, max_bytes=100, expire=60)
+        with pytest.raises(TypeError):
+            await storage.put("a", {"id": "1"})
+        assert await storage.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_expire(self):
+        """Проверить, что срок жизни не превышает срок локального кэша."""
+        storage = MemoryStorage(max_entries=10, max_bytes=100, expire=0.01)
+        await storage.put("a", b"1", expire=60)
+        time.sleep(0.02)
+        assert await storage.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_lock(self):
+        """Проверить, что блокировку освобождает только владелец."""
+        storage = MemoryStorage(max_entries=10, max_bytes=100, expire=60)
+        token = await storage.acquire_lock("lock", expire=60)
+        assert token is not None
+        assert await storage.acquire_lock("lock", expire=60) is None
+        await storage.release_lock("lock", "other")
+        assert await storage.acquire_lock("lock", expire=60) is None
+        await storage.release_lock("lock", token)
+        assert await storage.acquire_lock("lock", expire=60) is not None
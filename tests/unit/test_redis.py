@@ -0,0 +1,74 @@
+import pytest
+
+from src.storages.redis import RELEASE_LOCK_SCRIPT, RedisStorage
+
+
+class FakeRedis:
+    """Redis в памяти с поддержкой SET NX и скрипта освобождения
+    блокировки."""
+
+    SET_IF_NOT_EXIST = "SET_IF_NOT_EXIST"
+
+    def __init__(self) -> None:
+        self.data = {}
+        self.expires = {}
+
+    async def set(self, key, value, *, expire=0, pexpire=0, exist=None):
+        if exist == self.SET_IF_NOT_EXIST and key in self.data:
+            return False
+        self.data[key] = value
+        self.expires[key] = pexpire / 1000 if pexpire else expire
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def eval(self, script, keys=(), args=()):
+        assert script == RELEASE_LOCK_SCRIPT
+        if self.data.get(keys[0]) == args[0]:
+            del self.data[keys[0]]
+            return 1
+        return 0
+
+
+class TestLock:
+    """Тесты блокировки заполнения кэша в Redis."""
+
+    @pytest.mark.asyncio
+    async def test_acquire(self):
+        """Проверить, что блокировку получает только первый инстанс,
+        а срок аренды задается в миллисекундах."""
+        redis = FakeRedis()
+        storage = RedisStorage(redis)
+        token = await storage.acquire_lock("lock", expire=1.5)
+        assert token is not None
+        assert redis.data["lock"] == token
+        assert redis.expires["lock"] == 1.5
+        assert await storage.acquire_lock("lock", expire=1.5) is None
+
+    @pytest.mark.asyncio
+    async def test_release(self):
+        """Проверить, что блокировку освобождает только владелец."""
+        redis = FakeRedis()
+        storage = RedisStorage(redis)
+        token = await storage.acquire_lock("lock", expire=1)
+
+        await storage.release_lock("lock", "other")
+        assert redis.data["lock"] == token
+
+        await storage.release_lock("lock", token)
+        assert "lock" not in redis.data
+        assert await storage.acquire_lock("lock", expire=1) is not None
+
+    @pytest.mark.asyncio
+    async def test_release_after_expire(self):
+        """Проверить, что истекшая блокировка, перехваченная другим
+        инстансом, не освобождается прежним владельцем."""
+        redis = FakeRedis()
+        storage = RedisStorage(redis)
+        token = await storage.acquire_lock("lock", expire=1)
+        del redis.data["lock"]
+        other = await storage.acquire_lock("lock", expire=1)
+
+        await storage.release_lock("lock", token)
+        assert redis.data["lock"] == other
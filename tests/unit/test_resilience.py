@@ -0,0 +1,224 @@
+import asyncio
+
+import pytest
+from elasticsearch.exceptions import ConnectionError, NotFoundError
+
+from src.core.config import elastic_settings
+from src.storages.elastic import ElasticStorage, get_hedge_preference
+from src.storages.resilience import CircuitBreaker, CircuitOpenError, hedge
+
+RESET_TIMEOUT = 0.05
+
+
+def get_breaker(**kwargs) -> CircuitBreaker:
+    """Автомат защиты с маленьким окном для тестов."""
+    params = dict(name="test", window_size=4, min_calls=2, failure_rate=0.5,
+                  slow_call=1, reset_timeout=RESET_TIMEOUT)
+    params.update(kwargs)
+    return CircuitBreaker(**params)
+
+
+async def ok():
+    return "ok"
+
+
+async def fail():
+    raise ConnectionError("N/A", "connection refused", None)
+
+
+async def not_found():
+    raise NotFoundError(404, "not_found", None)
+
+
+async def open_breaker(breaker: CircuitBreaker):
+    """Разомкнуть цепь ошибками соединения."""
+    for _ in range(breaker.min_calls):
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+    assert breaker.state == "open"
+
+
+class TestCircuitBreaker:
+    """Тесты автомата защиты."""
+
+    @pytest.mark.asyncio
+    async def test_opens_on_failures(self):
+        """Проверить, что цепь размыкается и запросы не выполняются."""
+        breaker = get_breaker()
+        await open_breaker(breaker)
+
+        calls = []
+
+        async def func():
+            calls.append(1)
+
+        with pytest.raises(CircuitOpenError) as e:
+            await breaker.call(func)
+        assert 0 < e.value.retry_after <= RESET_TIMEOUT
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_failures(self):
+        """Проверить, что ответы 4xx не размыкают цепь."""
+        breaker = get_breaker()
+        for _ in range(4):
+            with pytest.raises(NotFoundError):
+                await breaker.call(not_found)
+        assert breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_slow_calls_are_failures(self):
+        """Проверить, что медленные запросы размыкают цепь."""
+        breaker = get_breaker(slow_call=0)
+        for _ in range(2):
+            assert await breaker.call(ok) == "ok"
+        assert breaker.state == "open"
+
+    @pytest.mark.asyncio
+    async def test_half_open_probe_closes(self):
+        """Проверить цикл closed -> open -> half_open -> closed."""
+        breaker = get_breaker()
+        await open_breaker(breaker)
+        await asyncio.sleep(RESET_TIMEOUT)
+
+        probe = asyncio.Event()
+        states = []
+
+        async def func():
+            states.append(breaker.state)
+            await probe.wait()
+            return "ok"
+
+        task = asyncio.ensure_future(breaker.call(func))
+        await asyncio.sleep(0)
+        # пока идет пробный запрос, остальные отклоняются
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(ok)
+
+        probe.set()
+        assert await task == "ok"
+        assert states == ["half_open"]
+        assert breaker.state == "closed"
+        assert await breaker.call(ok) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_half_open_probe_fails(self):
+        """Проверить, что ошибка пробного запроса снова размыкает цепь."""
+        breaker = get_breaker()
+        await open_breaker(breaker)
+        await asyncio.sleep(RESET_TIMEOUT)
+
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(ok)
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        """Проверить, что выключенный автомат не размыкает цепь."""
+        breaker = get_breaker(enabled=False)
+        for _ in range(4):
+            with pytest.raises(ConnectionError):
+                await breaker.call(fail)
+        assert breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_latency(self):
+        """Проверить квантиль времени успешных запросов."""
+        breaker = get_breaker()
+        assert breaker.get_latency(0.95) is None
+        for _ in range(breaker.min_calls):
+            await breaker.call(ok)
+        assert breaker.get_latency(0.95) < 1
+
+
+class TestHedge:
+    """Тесты дублирующих запросов."""
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self):
+        """Проверить, что быстрый запрос не дублируется."""
+        attempts = []
+
+        async def func(number):
+            attempts.append(number)
+            return number
+
+        assert await hedge("test", func, delay=1) == 0
+        assert attempts == [0]
+
+    @pytest.mark.asyncio
+    async def test_loser_is_cancelled(self):
+        """Проверить, что медленный запрос отменяется после ответа
+        дубликата."""
+        cancelled = []
+
+        async def func(number):
+            if number == 0:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(number)
+                    raise
+            return number
+
+        assert await hedge("test", func, delay=0.01) == 1
+        await asyncio.sleep(0)
+        assert cancelled == [0]
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_is_ignored(self):
+        """Проверить, что используется успешный ответ, даже если
+        другой запрос завершился ошибкой."""
+        async def func(number):
+            if number == 1:
+                await fail()
+            await asyncio.sleep(0.05)
+            return number
+
+        assert await hedge("test", func, delay=0.01) == 0
+
+    @pytest.mark.asyncio
+    async def test_all_attempts_failed(self):
+        """Проверить, что ошибка пробрасывается, если оба запроса
+        завершились ошибкой."""
+        async def func(number):
+            await asyncio.sleep(0.02)
+            await fail()
+
+        with pytest.raises(ConnectionError):
+            await hedge("test", func, delay=0.01)
+
+    @pytest.mark.parametrize("preference, expected", [
+        (None, "hedge-1"),
+        ("abc", "abc-hedge-1"),
+    ])
+    def test_preference(self, preference, expected):
+        """Проверить, что дубликат получает свой `preference`."""
+        assert get_hedge_preference(preference, 1) == expected
+
+    @pytest.mark.asyncio
+    async def test_storage_request(self, monkeypatch):
+        """Проверить, что дубликат `mget` получает другой `preference`."""
+        monkeypatch.setattr(elastic_settings, "ELASTIC_HEDGE_ENABLED", True)
+        monkeypatch.setattr(elastic_settings,
+                            "ELASTIC_HEDGE_MIN_DELAY_IN_MS", 10)
+        calls = []
+
+        class ES:
+            async def mget(self, body, index=None, **params):
+                calls.append(params.get("preference"))
+                if len(calls) == 1:
+                    await asyncio.sleep(10)
+                return {"docs": [{"_id": "1", "found": True,
+                                  "_source": {"id": "1"}}]}
+
+        storage = ElasticStorage(ES(), "hedge_test")
+        breaker = storage._get_circuit_breaker("mget")
+        for _ in range(breaker.min_calls):
+            await breaker.call(ok)
+        calls.clear()
+
+        assert await storage.get_objs(["1"]) == [{"id": "1"}]
+        assert calls == [None, "hedge-1"]
@@ -0,0 +1,160 @@
+import pytest
+from fastapi import Request, Response
+
+from src.api.v1 import response_cache
+from src.api.v1.response_cache import (REQUEST_PARAM, STORAGE_PARAM,
+                                       CachedResponse, cache_response)
+from src.core.config import redis_settings
+from src.models.genre import Genre
+from tests.unit.fakes import get_cache_storage
+
+
+def get_request(query: str = "", if_none_match: str = None) -> Request:
+    """Получить GET-запрос к списку жанров."""
+    headers = []
+    if if_none_match:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET",
+                    "path": "/api/v1/genres", "query_string": query.encode(),
+                    "headers": headers})
+
+
+class Endpoint:
+    """Эндпоинт списка жанров с учетом вызовов."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self, response: Response) -> list[Genre]:
+        self.calls += 1
+        response.headers["x-next-cursor"] = "abc"
+        return [Genre(id="1", name="name")]
+
+
+class TestCachedResponse:
+    """Тесты закодированного ответа."""
+
+    def test_pack_unpack(self):
+        """Проверить, что ответ распаковывается без изменений."""
+        cached = CachedResponse.from_content([Genre(id="1", name="name")],
+                                             headers={"x-next-cursor": "a"})
+        assert cached.body == b'[{"id":"1","name":"name","description":null}]'
+        assert cached.headers["etag"] == response_cache.get_etag(cached.body)
+        assert CachedResponse.unpack(cached.pack()) == cached
+
+    def test_from_response(self):
+        """Проверить, что готовый ответ эндпоинта сохраняется
+        с заголовками, кроме вычисляемых."""
+        cached = CachedResponse.from_content(
+            Response(content=b"a\nb", status_code=200,
+                     media_type="application/x-ndjson",
+                     headers={"x-test": "1"}))
+        assert cached.body == b"a\nb"
+        assert cached.media_type == "application/x-ndjson"
+        assert cached.headers.keys() == {"x-test", "etag"}
+        assert CachedResponse.unpack(cached.pack()) == cached
+
+    def test_error_has_no_etag(self):
+        """Проверить, что ответ с ошибкой не получает ETag."""
+        cached = CachedResponse.from_content(
+            Response(content=b"{}", status_code=404))
+        assert "etag" not in cached.headers
+
+    @pytest.mark.parametrize("if_none_match, expected", [
+        (None, 200),
+        ('"outdated"', 200),
+        ("*", 304),
+        ("ETAG", 304),
+        ('"outdated", W/ETAG', 304),
+    ])
+    def test_if_none_match(self, if_none_match, expected):
+        """Проверить ответ на условный запрос."""
+        cached = CachedResponse.from_content([Genre(id="1")])
+        etag = cached.headers["etag"]
+        if if_none_match:
+            if_none_match = if_none_match.replace("ETAG", etag)
+        response = cached.to_response(if_none_match, "public, max-age=1")
+        assert response.status_code == expected
+        assert response.headers["etag"] == etag
+        assert response.headers["cache-control"] == "public, max-age=1"
+        assert (response.body == b"") == (expected == 304)
+
+
+class TestCacheResponse:
+    """Тесты кэширования HTTP-ответов целиком."""
+
+    @pytest.fixture(autouse=True)
+    def settings(self, monkeypatch):
+        monkeypatch.setattr(redis_settings, "RESPONSE_CACHE_ENABLED", True)
+
+    async def call(self, endpoint, storage, query="", if_none_match=None,
+                   scope=None):
+        """Вызвать эндпоинт как FastAPI: с параметрами декоратора."""
+        wrapper = cache_response(scope)(endpoint)
+        return await wrapper(response=Response(), **{
+            REQUEST_PARAM: get_request(query, if_none_match),
+            STORAGE_PARAM: storage,
+        })
+
+    @pytest.mark.asyncio
+    async def test_hit(self):
+        """Проверить, что повторный запрос отдается из кэша без вызова
+        эндпоинта и с заголовками эндпоинта."""
+        endpoint, storage = Endpoint(), get_cache_storage()
+        first = await self.call(endpoint, storage, "page[size]=5")
+        second = await self.call(endpoint, storage, "page[size]=5")
+        assert endpoint.calls == 1
+        assert second.body == first.body
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.headers["x-next-cursor"] == "abc"
+
+    @pytest.mark.asyncio
+    async def test_not_modified(self):
+        """Проверить ответ 304 из кэша на запрос с актуальным ETag."""
+        endpoint, storage = Endpoint(), get_cache_storage()
+        etag = (await self.call(endpoint, storage)).headers["etag"]
+        response = await self.call(endpoint, storage, if_none_match=etag)
+        assert response.status_code == 304
+        assert endpoint.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_different_requests(self):
+        """Проверить, что разные параметры и области видимости
+        кэшируются отдельно."""
+        endpoint, storage = Endpoint(), get_cache_storage()
+        await self.call(endpoint, storage, "page[size]=5")
+        await self.call(endpoint, storage, "page[size]=6")
+        await self.call(endpoint, storage, "page[size]=5", scope="admin")
+        assert endpoint.calls == 3
+        response = await self.call(endpoint, storage, "page[size]=5",
+                                   scope="admin")
+        assert response.headers["cache-control"].startswith("private")
+        assert endpoint.calls == 3
+
+
+class TestETag:
+    """Тесты ETag при выключенном кэше ответов."""
+
+    @pytest.fixture(autouse=True)
+    def settings(self, monkeypatch):
+        monkeypatch.setattr(redis_settings, "RESPONSE_CACHE_ENABLED", False)
+
+    @pytest.mark.asyncio
+    async def test_not_modified(self):
+        """Проверить ответ 304 по ETag тела без записи в кэш."""
+        endpoint, storage = Endpoint(), get_cache_storage()
+        wrapper = cache_response()(endpoint)
+
+        response = await wrapper(response=Response(), **{
+            REQUEST_PARAM: get_request(), STORAGE_PARAM: storage})
+        etag = response.headers["etag"]
+        assert response.status_code == 200
+        assert response.headers["cache-control"].startswith("public")
+
+        response = await wrapper(response=Response(), **{
+            REQUEST_PARAM: get_request(if_none_match=etag),
+            STORAGE_PARAM: storage})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert endpoint.calls == 2
+        assert len(storage.cache) == 0
@@ -0,0 +1,133 @@
+from typing import Union
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from src.api.v1 import films, response_cache
+from src.api.v1.models.film import FilmList, FilmListCompound
+from src.api.v1.responses import trusted_response, validate_content
+from src.core.config import project_settings
+from src.models.film import Film, Genre
+from src.services.film import FilmService, get_film_service
+from tests.unit.fakes import FakeDataStorage, get_cache_storage
+
+MODEL = Union[list[FilmList], FilmListCompound]
+"""Модель ответа списка кинопроизведений."""
+
+
+class TestValidateContent:
+    """Тесты проверки ответа по модели."""
+
+    @pytest.mark.parametrize("content", [
+        [{"id": "1", "title": "title", "imdb_rating": 5}],
+        [{"id": "1", "imdb_rating": 5}],
+        {"data": [{"id": "1", "title": "title"}], "included": {}},
+    ])
+    def test_valid(self, content):
+        """Проверить, что полный и разреженный ответы проходят проверку."""
+        validate_content(content, MODEL)
+
+    def test_invalid(self):
+        """Проверить, что ошибка типа поля не пропускается."""
+        with pytest.raises(ValidationError):
+            validate_content([{"id": "1", "imdb_rating": "test"}], MODEL)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("strict", [True, False])
+    async def test_cached_response(self, strict, monkeypatch):
+        """Проверить, что ответ кэшируемого эндпоинта проверяется только
+        при `STRICT_VALIDATION`."""
+        monkeypatch.setattr(project_settings, "STRICT_VALIDATION", strict)
+
+        async def endpoint():
+            return [{"id": "1", "imdb_rating": "test"}]
+
+        if strict:
+            with pytest.raises(ValidationError):
+                await response_cache._call(endpoint, MODEL)
+        else:
+            cached = await response_cache._call(endpoint, MODEL)
+            assert cached.status_code == 200
+
+
+class TestTrustedResponse:
+    """Тесты ответа из доверенных данных."""
+
+    @pytest.mark.parametrize("strict", [True, False])
+    def test_sparse_content(self, strict, monkeypatch):
+        """Проверить, что ответ с разреженными полями отдается
+        и при `STRICT_VALIDATION`."""
+        monkeypatch.setattr(project_settings, "STRICT_VALIDATION", strict)
+        content = [{"id": "1", "imdb_rating": 5.0}]
+        response = trusted_response(content, list[FilmList])
+        assert response.status_code == 200
+        assert orjson.loads(response.body) == content
+
+    @pytest.mark.parametrize("strict", [True, False])
+    def test_invalid_content(self, strict, monkeypatch):
+        """Проверить, что ошибка типа поля обнаруживается только
+        при `STRICT_VALIDATION`."""
+        monkeypatch.setattr(project_settings, "STRICT_VALIDATION", strict)
+        content = [{"id": "1", "imdb_rating": "test"}]
+        if strict:
+            with pytest.raises(ValidationError):
+                trusted_response(content, list[FilmList])
+        else:
+            assert trusted_response(content, list[FilmList]).status_code \
+                == 200
+
+    @pytest.mark.parametrize("strict", [True, False])
+    def test_batch(self, strict, monkeypatch):
+        """Проверить эндпоинт получения по списку ID с разреженными
+        полями."""
+        monkeypatch.setattr(project_settings, "STRICT_VALIDATION", strict)
+        app = FastAPI()
+        app.include_router(films.router, prefix="/films")
+        app.dependency_overrides[get_film_service] = lambda: FilmService(
+            cache_storage=get_cache_storage(),
+            data_storage=FakeDataStorage([
+                {"id": "1", "title": "title", "imdb_rating": 5.0}]))
+
+        response = TestClient(app).post(
+            "/films/batch", json={"ids": ["1", "2"]},
+            params={"fields[film]": "imdb_rating"})
+        assert response.status_code == 200
+        assert response.json() == [{"id": "1", "imdb_rating": 5.0}]
+
+
+class TestConstructTrusted:
+    """Тесты создания моделей из доверенных данных."""
+
+    def test_nested(self):
+        """Проверить, что вложенные модели тоже создаются."""
+        film = Film.construct_trusted({
+            "id": "1", "title": "title",
+            "genres": [{"id": "2", "name": "name"}],
+        })
+        assert isinstance(film.genres[0], Genre)
+        assert film.genres[0].name == "name"
+        assert film == Film.parse_obj(film.dict())
+
+    def test_fields_set(self):
+        """Проверить, что отсутствующие поля не считаются заданными."""
+        film = Film.construct_trusted({"id": "1", "imdb_rating": None})
+        assert film.__fields_set__ == {"id", "imdb_rating"}
+        assert film.dict(exclude_unset=True) == {"id": "1",
+                                                 "imdb_rating": None}
+
+    def test_no_validation(self):
+        """Проверить, что данные не валидируются."""
+        film = Film.construct_trusted({"id": "1", "imdb_rating": "5"})
+        assert film.imdb_rating == "5"
+
+    @pytest.mark.parametrize("strict, expected", [(False, "5"), (True, 5.0)])
+    def test_service_parse(self, strict, expected, monkeypatch):
+        """Проверить, что сервис валидирует доверенные данные только
+        при `STRICT_VALIDATION`."""
+        monkeypatch.setattr(project_settings, "STRICT_VALIDATION", strict)
+        film = FilmService()._parse(
+            {"id": "1", "title": "title", "imdb_rating": "5"}, trusted=True)
+        assert film.imdb_rating == expected
@@ -0,0 +1,279 @@
+import asyncio
+import time
+
+import pytest
+
+from src.api.v1.query_params.base import Cursor, Page, PageResult
+from src.core.config import redis_settings
+from src.services.base import background_refreshes
+from tests.unit.fakes import get_service
+
+GENRE = {"id": "1", "name": "name"}
+GENRES = [{"id": str(number), "name": name}
+          for number, name in enumerate("abcd", start=1)]
+
+
+class TestFillLock:
+    """Тесты заполнения кэша под распределенной блокировкой."""
+
+    @pytest.fixture(autouse=True)
+    def settings(self, monkeypatch):
+        monkeypatch.setattr(redis_settings, "CACHE_FILL_LOCK_ENABLED", True)
+        monkeypatch.setattr(redis_settings,
+                            "CACHE_FILL_LOCK_WAIT_IN_SECONDS", 0.2)
+        monkeypatch.setattr(redis_settings,
+                            "CACHE_FILL_LOCK_POLL_IN_SECONDS", 0.01)
+
+    @pytest.mark.asyncio
+    async def test_owner_loads(self):
+        """Проверить, что владелец блокировки заполняет кэш
+        и освобождает блокировку."""
+        service = get_service([GENRE])
+        key = await service._get_obj_cache_key("1")
+
+        assert (await service.get_by_id("1")).name == "name"
+        assert service.data_storage.calls == [("get", "1")]
+        assert await service.cache_storage.get(f"{key}#lock") is None
+        assert await service._get_entry(key) is not None
+
+    @pytest.mark.asyncio
+    async def test_waiter_gets_filled_cache(self):
+        """Проверить, что без блокировки инстанс дожидается заполнения
+        кэша другим инстансом и не обращается к хранилищу данных."""
+        service = get_service([GENRE])
+        key = await service._get_obj_cache_key("1")
+        await service.cache_storage.acquire_lock(f"{key}#lock", expire=60)
+
+        async def fill():
+            await asyncio.sleep(0.05)
+            entry = service._create_entry(b'{"id": "1", "name": "other"}')
+            await service.cache_storage.put_entry(key, entry, expire=60)
+
+        obj, _ = await asyncio.gather(service.get_by_id("1"), fill())
+        assert obj.name == "other"
+        assert service.data_storage.calls == []
+
+    @pytest.mark.asyncio
+    async def test_waiter_timeout(self):
+        """Проверить, что без заполнения кэша за отведенное время данные
+        получаются из хранилища данных."""
+        service = get_service([GENRE])
+        key = await service._get_obj_cache_key("1")
+        await service.cache_storage.acquire_lock(f"{key}#lock", expire=60)
+
+        assert (await service.get_by_id("1")).name == "name"
+        assert service.data_storage.calls == [("get", "1")]
+
+
+async def put_entry(service, key, value, stale_in, expire_in):
+    """Записать в кэш запись с заданными сроками."""
+    now = time.time()
+    entry = service._create_entry(value)
+    entry.stale_at = now + stale_in
+    entry.expires_at = now + expire_in
+    await service.cache_storage.put_entry(key, entry, expire=60)
+
+
+class TestStaleWhileRevalidate:
+    """Тесты отдачи устаревших записей с обновлением в фоне."""
+
+    @pytest.mark.asyncio
+    async def test_fresh(self):
+        """Проверить, что свежая запись отдается без обновления."""
+        service = get_service([GENRE])
+        key = await service._get_obj_cache_key("1")
+        await put_entry(service, key, b'{"id": "1", "name": "old"}',
+                        stale_in=60, expire_in=120)
+
+        assert (await service.get_by_id("1")).name == "old"
+        assert not background_refreshes
+        assert service.data_storage.calls == []
+
+    @pytest.mark.asyncio
+    async def test_stale(self):
+        """Проверить, что устаревшая запись отдается сразу,
+        а кэш обновляется в фоне."""
+        service = get_service([GENRE], delay=0.01)
+        key = await service._get_obj_cache_key("1")
+        await put_entry(service, key, b'{"id": "1", "name": "old"}',
+                        stale_in=-1, expire_in=60)
+
+        assert (await service.get_by_id("1")).name == "old"
+        assert len(background_refreshes) == 1
+        await asyncio.gather(*background_refreshes)
+
+        assert service.data_storage.calls == [("get", "1")]
+        assert (await service.get_by_id("1")).name == "name"
+
+    @pytest.mark.asyncio
+    async def test_expired(self):
+        """Проверить, что недействительная запись не отдается."""
+        service = get_service([GENRE])
+        key = await service._get_obj_cache_key("1")
+        await put_entry(service, key, b'{"id": "1", "name": "old"}',
+                        stale_in=-2, expire_in=-1)
+
+        assert (await service.get_by_id("1")).name == "name"
+        assert service.data_storage.calls == [("get", "1")]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses(self):
+        """Проверить, что одновременные промахи по ключу заполняют кэш
+        одним запросом в хранилище данных."""
+        service = get_service([GENRE], delay=0.01)
+        objects = await asyncio.gather(
+            *[service.get_by_id("1") for _ in range(5)])
+        assert all(obj.name == "name" for obj in objects)
+        assert service.data_storage.calls == [("get", "1")]
+
+
+class TestNegativeCache:
+    """Тесты кэширования отсутствующих данных."""
+
+    def test_empty_page_is_falsy(self):
+        """Проверить, что пустая страница считается отсутствием данных,
+        а непустая - нет."""
+        assert not PageResult(items=[])
+        assert not PageResult(items=[], after=["a"])
+        assert PageResult(items=[GENRE])
+
+    @pytest.mark.asyncio
+    async def test_missing_obj(self, monkeypatch):
+        """Проверить, что отсутствующий объект кэшируется на
+        `NEGATIVE_CACHE_EXPIRE_IN_SECONDS`."""
+        monkeypatch.setattr(redis_settings,
+                            "NEGATIVE_CACHE_EXPIRE_IN_SECONDS", 7)
+        service = get_service([GENRE])
+        assert await service.get_by_id("2") is None
+        assert await service.get_by_id("2") is None
+        assert service.data_storage.calls == [("get", "2")]
+
+        entry = await service._get_entry(
+            await service._get_obj_cache_key("2"))
+        assert entry.negative
+        assert entry.expires_at - time.time() == pytest.approx(7, abs=1)
+
+    @pytest.mark.asyncio
+    async def test_empty_page(self):
+        """Проверить, что пустая страница кэшируется."""
+        service = get_service([GENRE])
+        page = Page(number=2, size=10)
+        for _ in range(2):
+            result = await service.get(page=page)
+            assert result.items == []
+            assert result.after is None
+        assert service.data_storage.calls == [("search", 2)]
+
+    @pytest.mark.asyncio
+    async def test_missing_ids(self):
+        """Проверить, что отсутствующие объекты пакета кэшируются."""
+        service = get_service([GENRE])
+        for _ in range(2):
+            objects = await service.get_by_ids(["1", "2"])
+            assert [obj.id for obj in objects] == ["1"]
+        assert service.data_storage.calls == [("mget", "1", "2")]
+
+
+class TestIdsOnlyCache:
+    """Тесты кэширования списков в виде ID."""
+
+    @pytest.fixture(autouse=True)
+    def settings(self, monkeypatch):
+        monkeypatch.setattr(redis_settings, "CACHE_LIST_IDS_ONLY", True)
+
+    @pytest.mark.asyncio
+    async def test_list(self):
+        """Проверить, что страница кэшируется как ID, а объекты
+        получаются одним MGET в хранилище данных."""
+        service = get_service(GENRES)
+        page = Page(number=1, size=2)
+
+        result = await service.get(page=page)
+        assert [obj.id for obj in result.items] == ["1", "2"]
+        assert service.data_storage.calls == [("ids", 1), ("mget", "1", "2")]
+
+        service.data_storage.calls.clear()
+        result = await service.get(page=page)
+        assert [obj.name for obj in result.items] == ["a", "b"]
+        assert service.data_storage.calls == []
+
+    @pytest.mark.asyncio
+    async def test_shared_objects(self):
+        """Проверить, что объекты страницы берутся из кэша объектов
+        и из хранилища запрашиваются только отсутствующие."""
+        service = get_service(GENRES)
+        await service.get_by_id("2")
+        service.data_storage.calls.clear()
+
+        result = await service.get(page=Page(number=1, size=3))
+        assert [obj.id for obj in result.items] == ["1", "2", "3"]
+        assert service.data_storage.calls == [("ids", 1), ("mget", "1", "3")]
+
+    @pytest.mark.asyncio
+    async def test_hydrate_mget(self, monkeypatch):
+        """Проверить, что объекты читаются из кэша одним MGET в порядке
+        ID, а удаленные из хранилища пропускаются."""
+        service = get_service(GENRES)
+        await service.get_by_ids(["1", "2", "3"])
+        service.data_storage.calls.clear()
+
+        requests = []
+        get_many = service.cache_storage.get_many
+
+        async def mget(keys):
+            requests.append(keys)
+            return await get_many(keys)
+
+        monkeypatch.setattr(service.cache_storage, "get_many", mget)
+        del service.data_storage.docs["4"]
+        objects = await service._hydrate(["3", "1", "4"])
+        assert [obj.id for obj in objects] == ["3", "1"]
+        assert len(requests) == 1
+        assert service.data_storage.calls == [("mget", "4")]
+
+
+class TestPageByIds:
+    """Тесты страниц объектов из списка ID."""
+
+    @pytest.mark.asyncio
+    async def test_same_ids(self):
+        """Проверить, что один набор ID в любом порядке дает одну
+        страницу из кэша."""
+        service = get_service(GENRES)
+        page = Page(number=1, size=2)
+        first = await service.get_page_by_ids("test", ["3", "1", "2"], page)
+        second = await service.get_page_by_ids("test", ["2", "3", "1", "1"],
+                                               page)
+        assert [obj.id for obj in first] == ["1", "2"]
+        assert first == second
+        assert service.data_storage.calls == [("mget", "1", "2")]
+
+    @pytest.mark.asyncio
+    async def test_changed_ids(self):
+        """Проверить, что после изменения списка ID страница
+        не берется из кэша прежнего списка."""
+        service = get_service(GENRES)
+        page = Page(number=1, size=2)
+        await service.get_page_by_ids("test", ["2", "3"], page)
+        objects = await service.get_page_by_ids("test", ["1", "2", "3"],
+                                                page)
+        assert [obj.id for obj in objects] == ["1", "2"]
+
+    @pytest.mark.asyncio
+    async def test_pages(self):
+        """Проверить нарезку списка ID на страницы."""
+        service = get_service(GENRES)
+        ids = ["4", "3", "2", "1"]
+        pages = [await service.get_page_by_ids("test", ids,
+                                               Page(number=number, size=3))
+                 for number in (1, 2, 3)]
+        assert [[obj.id for obj in objects] for objects in pages] == [
+            ["1", "2", "3"], ["4"], []]
+
+    @pytest.mark.asyncio
+    async def test_cursor(self):
+        """Проверить, что курсор не поддерживается."""
+        service = get_service(GENRES)
+        page = Page(number=1, size=2, cursor=Cursor(after=["1"]))
+        with pytest.raises(ValueError):
+            await service.get_page_by_ids("test", ["1"], page)
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from src.services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Тесты объединения одновременных вызовов."""
+
+    @pytest.mark.asyncio
+    async def test_coalescing(self):
+        """Проверить, что одновременные вызовы по ключу выполняются
+        один раз и получают один результат."""
+        flight = SingleFlight("test")
+        calls = []
+
+        async def func():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return object()
+
+        results = await asyncio.gather(
+            *[flight.do("key", func) for _ in range(5)])
+        assert calls == [1]
+        assert all(result is results[0] for result in results)
+
+    @pytest.mark.asyncio
+    async def test_different_keys(self):
+        """Проверить, что вызовы по разным ключам не объединяются."""
+        flight = SingleFlight("test")
+        calls = []
+
+        async def func(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key
+
+        results = await asyncio.gather(flight.do("a", lambda: func("a")),
+                                       flight.do("b", lambda: func("b")))
+        assert results == ["a", "b"]
+        assert sorted(calls) == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_error(self):
+        """Проверить, что ошибку вызова получают все ожидающие,
+        а следующий вызов выполняется заново."""
+        flight = SingleFlight("test")
+        calls = []
+
+        async def fail():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("test")
+
+        results = await asyncio.gather(
+            *[flight.do("key", fail) for _ in range(3)],
+            return_exceptions=True)
+        assert calls == [1]
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flight._calls == {}
+
+        async def ok():
+            return "ok"
+
+        assert await flight.do("key", ok) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_cleanup(self):
+        """Проверить, что завершенный вызов не переиспользуется."""
+        flight = SingleFlight("test")
+        calls = []
+
+        async def func():
+            calls.append(1)
+            return len(calls)
+
+        assert await flight.do("key", func) == 1
+        assert await flight.do("key", func) == 2
+        assert flight._calls == {}
+
+    @pytest.mark.asyncio
+    async def test_waiter_cancelled(self):
+        """Проверить, что отмена одного ожидающего не прерывает вызов
+        для остальных."""
+        flight = SingleFlight("test")
+
+        async def func():
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        first = asyncio.ensure_future(flight.do("key", func))
+        second = asyncio.ensure_future(flight.do("key", func))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "ok"
+        with pytest.raises(asyncio.CancelledError):
+            await first
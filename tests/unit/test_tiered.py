@@ -0,0 +1,86 @@
+import pytest
+
+from src.storages.memory import MemoryStorage
+from src.storages.tiered import TieredStorage
+
+
+class FakeRemote(MemoryStorage):
+    """Общее хранилище в памяти с учетом запрошенных ключей."""
+
+    def __init__(self) -> None:
+        super().__init__(max_entries=100, max_bytes=10_000, expire=60)
+        self.requested = []
+
+    async def get(self, key):
+        self.requested.append(key)
+        return await super().get(key)
+
+    async def get_many(self, keys):
+        self.requested.extend(keys)
+        return [await MemoryStorage.get(self, key) for key in keys]
+
+
+def get_storage() -> TieredStorage:
+    """Двухуровневый кэш с общим хранилищем в памяти."""
+    local = MemoryStorage(max_entries=100, max_bytes=10_000, expire=60)
+    return TieredStorage(local=local, remote=FakeRemote())
+
+
+class TestTieredStorage:
+    """Тесты двухуровневого кэша."""
+
+    @pytest.mark.asyncio
+    async def test_put(self):
+        """Проверить, что запись попадает на оба уровня в bytes."""
+        storage = get_storage()
+        await storage.put("a", "1")
+        assert await storage.local.get("a") == b"1"
+        assert await storage.remote.get("a") == b"1"
+
+    @pytest.mark.asyncio
+    async def test_local_hit(self):
+        """Проверить, что попадание в L1 не обращается к L2."""
+        storage = get_storage()
+        await storage.put("a", b"1")
+        assert await storage.get("a") == b"1"
+        assert storage.remote.requested == []
+
+    @pytest.mark.asyncio
+    async def test_fallthrough(self):
+        """Проверить, что промах L1 читается из L2 и сохраняется в L1."""
+        storage = get_storage()
+        await storage.remote.put("a", b"1")
+        storage.remote.requested.clear()
+
+        assert await storage.get("a") == b"1"
+        assert await storage.get("a") == b"1"
+        assert storage.remote.requested == ["a"]
+        assert await storage.local.get("a") == b"1"
+
+    @pytest.mark.asyncio
+    async def test_miss(self):
+        """Проверить, что промах обоих уровней не сохраняется в L1."""
+        storage = get_storage()
+        assert await storage.get("a") is None
+        assert len(storage.local.cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_get_many(self):
+        """Проверить, что из L2 запрашиваются только промахи L1,
+        а найденное сохраняется в L1."""
+        storage = get_storage()
+        await storage.put("a", b"1")
+        await storage.remote.put("b", b"2")
+        storage.remote.requested.clear()
+
+        assert await storage.get_many(["a", "b", "c"]) == [b"1", b"2", None]
+        assert storage.remote.requested == ["b", "c"]
+        assert await storage.local.get_many(["b", "c"]) == [b"2", None]
+
+    @pytest.mark.asyncio
+    async def test_put_many(self):
+        """Проверить запись нескольких ключей на оба уровня."""
+        storage = get_storage()
+        await storage.put_many({"a": b"1", "b": "2"})
+        assert await storage.local.get_many(["a", "b"]) == [b"1", b"2"]
+        assert await storage.remote.get_many(["a", "b"]) == [b"1", b"2"]